@@ -0,0 +1,125 @@
+import {
+  clearDiscoverJesusBundleCache,
+  loadBundleManifest,
+  loadDiscoverJesusSummary,
+  prefetchDiscoverJesusSummary,
+} from '../../utils/discoverJesusLoader';
+
+// Laid out like the output of `scrape_discover_jesus.py --bundles`
+const MANIFEST = {
+  version: 1,
+  strategy: 'category',
+  bundles: [
+    { name: 'event', file: 'event.5e6f7a8b9c.json', count: 1, bytes: 60 },
+    { name: 'person', file: 'person.1a2b3c4d5e.json', count: 2, bytes: 120 },
+  ],
+  ids: { 'event/the-wedding-at-cana': 0, 'person/andrew': 1, 'person/peter': 1 },
+};
+
+function serve(): Record<string, unknown> {
+  return {
+    '/discover-jesus/manifest.json': MANIFEST,
+    '/discover-jesus/person.1a2b3c4d5e.json': {
+      'person/andrew': { shortSummary: 'Andrew, the first apostle.', fullSummary: 'Andrew was chosen first.' },
+      'person/peter': { shortSummary: 'Simon Peter.', fullSummary: 'Peter was a fisherman.' },
+    },
+    '/discover-jesus/event.5e6f7a8b9c.json': {
+      'event/the-wedding-at-cana': { shortSummary: 'Water into wine.', fullSummary: 'At Cana.' },
+    },
+  };
+}
+
+function mockFetch(files: Record<string, unknown>): jest.Mock {
+  const fetchMock = jest.fn(async (url: string) => {
+    const body = files[url];
+    return {
+      ok: body !== undefined,
+      status: body !== undefined ? 200 : 404,
+      json: async () => body,
+    };
+  });
+  global.fetch = fetchMock as unknown as typeof fetch;
+  return fetchMock;
+}
+
+function fetched(fetchMock: jest.Mock): string[] {
+  return fetchMock.mock.calls.map(([url]) => url);
+}
+
+describe('discoverJesusLoader', () => {
+  let fetchMock: jest.Mock;
+
+  beforeEach(() => {
+    clearDiscoverJesusBundleCache();
+    fetchMock = mockFetch(serve());
+  });
+
+  test('loads a summary from its bundle only', async () => {
+    expect(await loadDiscoverJesusSummary('person/andrew')).toEqual({
+      id: 'person/andrew',
+      shortSummary: 'Andrew, the first apostle.',
+      fullSummary: 'Andrew was chosen first.',
+    });
+    expect(fetched(fetchMock)).toEqual(['/discover-jesus/manifest.json', '/discover-jesus/person.1a2b3c4d5e.json']);
+  });
+
+  test('returns undefined for an id that is not in the manifest', async () => {
+    expect(await loadDiscoverJesusSummary('person/nobody')).toBeUndefined();
+    expect(fetched(fetchMock)).toEqual(['/discover-jesus/manifest.json']);
+  });
+
+  test('caches the manifest and bundles', async () => {
+    await loadDiscoverJesusSummary('person/andrew');
+    await loadDiscoverJesusSummary('person/peter');
+    await loadDiscoverJesusSummary('event/the-wedding-at-cana');
+    await loadBundleManifest();
+
+    expect(fetched(fetchMock)).toEqual([
+      '/discover-jesus/manifest.json',
+      '/discover-jesus/person.1a2b3c4d5e.json',
+      '/discover-jesus/event.5e6f7a8b9c.json',
+    ]);
+  });
+
+  test('concurrent calls share one request', async () => {
+    const [andrew, peter] = await Promise.all([
+      loadDiscoverJesusSummary('person/andrew'),
+      loadDiscoverJesusSummary('person/peter'),
+      loadBundleManifest(),
+    ]);
+
+    expect(andrew?.id).toBe('person/andrew');
+    expect(peter?.id).toBe('person/peter');
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+  });
+
+  test('prefetching fills the cache without surfacing errors', async () => {
+    prefetchDiscoverJesusSummary('person/peter');
+    prefetchDiscoverJesusSummary('person/peter', '/missing');
+    await loadDiscoverJesusSummary('person/peter');
+
+    expect(fetched(fetchMock).filter((url) => url.startsWith('/discover-jesus/'))).toEqual([
+      '/discover-jesus/manifest.json',
+      '/discover-jesus/person.1a2b3c4d5e.json',
+    ]);
+  });
+
+  test('a failed request is retried on the next call', async () => {
+    const files = serve();
+    const bundle = files['/discover-jesus/person.1a2b3c4d5e.json'];
+    delete files['/discover-jesus/person.1a2b3c4d5e.json'];
+    fetchMock = mockFetch(files);
+
+    await expect(loadDiscoverJesusSummary('person/andrew')).rejects.toThrow(
+      'Failed to load /discover-jesus/person.1a2b3c4d5e.json: 404'
+    );
+    files['/discover-jesus/person.1a2b3c4d5e.json'] = bundle;
+    expect((await loadDiscoverJesusSummary('person/andrew'))?.shortSummary).toBe('Andrew, the first apostle.');
+    // The manifest stayed cached; only the failed bundle was fetched again
+    expect(fetched(fetchMock)).toEqual([
+      '/discover-jesus/manifest.json',
+      '/discover-jesus/person.1a2b3c4d5e.json',
+      '/discover-jesus/person.1a2b3c4d5e.json',
+    ]);
+  });
+});
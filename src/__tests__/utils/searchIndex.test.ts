@@ -0,0 +1,133 @@
+import fs from 'fs';
+import path from 'path';
+import { clearSearchIndexCache, searchSummaries } from '../../utils/searchIndex';
+
+// Written by search_index.SearchIndexWriter from documents.json; expected.json
+// holds what SearchIndex.search in Python returns for each query
+// (src/data/scraper/tests/test_search_index.py keeps both current)
+const FIXTURE_DIR = path.join(__dirname, '..', 'fixtures', 'search-index');
+const expected: Record<string, [string, string, string, number][]> = JSON.parse(
+  fs.readFileSync(path.join(FIXTURE_DIR, 'expected.json'), 'utf-8')
+);
+
+type Files = Record<string, unknown>;
+
+function fixtureFiles(): Files {
+  const files: Files = {};
+  for (const name of fs.readdirSync(FIXTURE_DIR)) {
+    if (name === 'index.json' || name.startsWith('terms-')) {
+      files[`/search/${name}`] = JSON.parse(fs.readFileSync(path.join(FIXTURE_DIR, name), 'utf-8'));
+    }
+  }
+  return files;
+}
+
+function mockFetch(files: Files): jest.Mock {
+  const fetchMock = jest.fn(async (url: string) => {
+    const body = files[url];
+    return {
+      ok: body !== undefined,
+      status: body !== undefined ? 200 : 404,
+      json: async () => body,
+    };
+  });
+  global.fetch = fetchMock as unknown as typeof fetch;
+  return fetchMock;
+}
+
+function ids(results: { id: string }[]): string[] {
+  return results.map((result) => result.id);
+}
+
+describe('searchSummaries', () => {
+  let fetchMock: jest.Mock;
+
+  beforeEach(() => {
+    clearSearchIndexCache();
+    fetchMock = mockFetch(fixtureFiles());
+  });
+
+  test.each(Object.keys(expected))('returns what the Python search does for %p', async (query) => {
+    const results = await searchSummaries(query);
+
+    expect(ids(results)).toEqual(expected[query].map(([id]) => id));
+    results.forEach((result, i) => {
+      const [, title, kind, score] = expected[query][i];
+      expect(result.title).toBe(title);
+      expect(result.kind).toBe(kind);
+      expect(result.score).toBeCloseTo(score, 2);
+    });
+  });
+
+  test('tokenizes like the index: case, accents, stop words and stems', async () => {
+    expect(await searchSummaries('JÉSUS Nazareth')).toEqual(await searchSummaries('jesus nazareth'));
+    expect(await searchSummaries('the of and')).toEqual([]);
+    // "weddings" only matches "wedding" through their shared stem, not as a prefix
+    expect(ids(await searchSummaries('weddings'))).toEqual([
+      'event/the-wedding-at-cana',
+      'person/mary-mother-of-jesus',
+    ]);
+    expect(ids(await searchSummaries('happiness worship'))).toEqual(['topic/prayer-and-worship']);
+  });
+
+  test('every word must match', async () => {
+    expect(ids(await searchSummaries('mother jesus'))).toEqual([
+      'person/mary-mother-of-jesus',
+      'event/the-wedding-at-cana',
+    ]);
+    expect(await searchSummaries('mary wine')).toEqual([]);
+  });
+
+  test('only the last word matches as a prefix', async () => {
+    expect(ids(await searchSummaries('carpenter naz'))).toEqual(['person/joseph-father-of-jesus']);
+    expect(await searchSummaries('naz carpenter')).toEqual([]);
+  });
+
+  test('decodes delta-encoded postings', async () => {
+    mockFetch({
+      '/search/index.json': {
+        version: 1,
+        prefixLength: 1,
+        scale: 0.5,
+        stopwords: [],
+        stemPasses: [],
+        documents: [
+          ['a', 'A', 'k'],
+          ['b', 'B', 'k'],
+          ['c', 'C', 'k'],
+          ['d', 'D', 'k'],
+        ],
+        terms: 1,
+        shards: { z: 'terms-z.json' },
+      },
+      // Documents 1 and 3 (1 + 2), weights 5 and 7
+      '/search/terms-z.json': { zeta: [1, 5, 2, 7] },
+    });
+
+    expect(await searchSummaries('zeta')).toEqual([
+      { id: 'd', title: 'D', kind: 'k', score: 3.5 },
+      { id: 'b', title: 'B', kind: 'k', score: 2.5 },
+    ]);
+  });
+
+  test('fetches the index and each shard once', async () => {
+    await Promise.all([searchSummaries('jesus'), searchSummaries('jesus nazareth'), searchSummaries('je')]);
+    await searchSummaries('nazareth');
+
+    const urls = fetchMock.mock.calls.map(([url]) => url);
+    expect(urls.sort()).toEqual([...new Set(urls)].sort());
+    expect(urls).toContain('/search/index.json');
+  });
+
+  test('retries a failed request on the next search', async () => {
+    const files = fixtureFiles();
+    const index = files['/search/index.json'];
+    delete files['/search/index.json'];
+    fetchMock = mockFetch(files);
+
+    await expect(searchSummaries('jesus')).rejects.toThrow('Failed to load /search/index.json: 404');
+    files['/search/index.json'] = index;
+    expect(ids(await searchSummaries('jesus'))).toEqual(expected.jesus.map(([id]) => id));
+    expect(fetchMock.mock.calls.filter(([url]) => url === '/search/index.json')).toHaveLength(2);
+  });
+});
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from rate_limit import DeferredRetryQueue, TokenBucket
+
+
+class FetchResult:
+    """Outcome of one URL processed by the AsyncFetcher"""
+
+    __slots__ = ('url', 'value', 'error')
+
+    def __init__(self, url, value=None, error=None):
+        self.url = url
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class AsyncFetcher:
+    """
+    Run a blocking per-URL callable (e.g. scrape_summary) under asyncio.
+
+    At most `per_host` calls are in flight for each host and requests are paced
+    by `limiter` (a fixed TokenBucket of `max_rps` unless an adaptive controller
+    is passed, which also narrows the number of calls in flight). A URL whose call
+    fails is handed to `retry_delay(error, attempt)`; if that returns a delay the
+    URL goes to a deferred retry queue and the worker moves on. Results come back
+    in the same order as the input URLs, whatever order they completed in.
+
+    Used as a context manager, the fetcher keeps its worker threads (and with them
+    the per-thread sessions and their open connections) from one run() to the next.
+    """
+
+    def __init__(self, per_host=4, max_rps=None, burst=1, limiter=None, retry_delay=None, max_attempts=3):
+        self.per_host = max(1, per_host)
+        self.limiter = limiter if limiter is not None else TokenBucket(max_rps, burst=burst)
+        self.retry_delay = retry_delay
+        self.max_attempts = max(1, max_attempts)
+        self._persistent = False
+        self._executor = None
+        self._executor_workers = 0
+
+    def __enter__(self):
+        self._persistent = True
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker threads kept between runs"""
+        self._persistent = False
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
+
+    def _shared_executor(self, workers):
+        if self._executor_workers < workers:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        return self._executor
+
+    def run(self, urls, func, on_result=None):
+        """
+        Apply func to every URL and return a list of FetchResult in input order.
+        `on_result`, if given, is called with each FetchResult as soon as it completes.
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        return asyncio.run(self._run_all(urls, func, on_result))
+
+    async def _run_all(self, urls, func, on_result):
+        hosts = {urlparse(url).netloc for url in urls}
+        semaphores = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        results = [None] * len(urls)
+        pending = deque((index, url, 0) for index, url in enumerate(urls))
+        deferred = DeferredRetryQueue()
+        remaining = [len(urls)]
+        workers = self.per_host * len(hosts)
+        # requests is blocking, so the actual I/O happens on a pool sized to the
+        # maximum number of calls that may be in flight at once
+        if self._persistent:
+            await self._gather_workers(self._shared_executor(workers), workers, semaphores, pending, deferred,
+                                       remaining, results, func, on_result)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                await self._gather_workers(executor, workers, semaphores, pending, deferred, remaining, results,
+                                           func, on_result)
+        return results
+
+    async def _gather_workers(self, executor, workers, *args):
+        await asyncio.gather(*(self._worker(executor, *args) for _ in range(workers)))
+
+    async def _worker(self, executor, semaphores, pending, deferred, remaining, results, func, on_result):
+        loop = asyncio.get_running_loop()
+        while remaining[0]:
+            item = deferred.pop_ready()
+            if item is None and pending:
+                item = pending.popleft()
+            if item is None:
+                # Nothing ready: wait for the next deferred retry (or for other workers to finish)
+                await asyncio.sleep(min(deferred.next_ready_in() or 0.05, 0.05))
+                continue
+
+            index, url, attempt = item
+            while not self.limiter.try_acquire_slot():
+                await asyncio.sleep(0.01)
+            try:
+                async with semaphores[urlparse(url).netloc]:
+                    await self.limiter.acquire_async()
+                    try:
+                        result = FetchResult(url, value=await loop.run_in_executor(executor, func, url))
+                    except Exception as e:
+                        result = FetchResult(url, error=e)
+            finally:
+                self.limiter.release_slot()
+
+            if not result.ok and self.retry_delay is not None and attempt + 1 < self.max_attempts:
+                delay = self.retry_delay(result.error, attempt)
+                if delay is not None:
+                    logging.info("Deferring %s for %.1fs after attempt %d: %s", url, delay, attempt + 1, result.error)
+                    deferred.push((index, url, attempt + 1), delay)
+                    continue
+
+            results[index] = result
+            remaining[0] -= 1
+            if on_result is not None:
+                on_result(result)
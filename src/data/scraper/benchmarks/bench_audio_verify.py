@@ -0,0 +1,93 @@
+"""
+Audio verifier: wall-clock time and requests for a full catalogue check.
+
+Every episode of src/data/json/episodes.json is checked against the stand-in
+server (both buckets are served from it, with --missing of the files left out
+so there is something to find), with --latency per request:
+- serial: one HEAD at a time, no listing and no cache, like the shell loop
+- concurrent: --workers HEADs in flight, still no listing or cache
+- listing: files in synch-r2/r2-objects.json settled without a request
+- warm cache: a rerun within --max-age-hours, nothing requested
+- revalidate: a rerun once the cache is stale, conditional HEADs answered 304
+
+    python benchmarks/bench_audio_verify.py --latency 0.05 --workers 16
+"""
+import argparse
+import json
+import os
+import random
+import time
+from urllib.parse import urlparse
+
+from bench_utils import SCRAPER_DIR, scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper
+from standin_server import StandInServer
+from verify_audio import AudioCheckCache, R2Listing, load_assets, verify_assets
+
+DATA_DIR = os.path.dirname(SCRAPER_DIR)
+PROJECT_DIR = os.path.dirname(os.path.dirname(DATA_DIR))
+
+
+def run(name, server, scraper, assets, **kwargs):
+    before = server.requests_served
+    start = time.perf_counter()
+    faulty, _, sources = verify_assets(scraper, assets, **kwargs)
+    return {
+        'run': name,
+        'seconds': round(time.perf_counter() - start, 3),
+        'requests': server.requests_served - before,
+        'issues': len(faulty),
+        'sources': dict(sorted(sources.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every request")
+    parser.add_argument('--workers', type=int, default=16, help="Requests in flight")
+    parser.add_argument('--missing', type=float, default=0.05, help="Fraction of the files not served")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    with scratch_root() as root_dir:
+        server = StandInServer(pages={}, latency=args.latency)
+        with server:
+            assets = load_assets(
+                os.path.join(DATA_DIR, 'json/episodes.json'),
+                os.path.join(DATA_DIR, 'json/cosmic-series-mappings.json'),
+                os.path.join(PROJECT_DIR, 'synch-r2/cosmic-series-urls.json'),
+                jesus_base=f"{server.base_url}/jesus", urantia_base=f"{server.base_url}/urantia",
+            )
+            rng = random.Random(args.seed)
+            for url in sorted({asset.url for asset in assets if asset.url}):
+                if rng.random() >= args.missing:
+                    server.pages[urlparse(url).path] = 'ID3 audio'
+            listing = R2Listing(os.path.join(PROJECT_DIR, 'synch-r2/r2-objects.json'), f"{server.base_url}/jesus")
+            scraper = DiscoverJesusScraper(root_dir=root_dir)
+            cache = AudioCheckCache(os.path.join(root_dir, 'audio_checks.json'))
+
+            results = [
+                run('serial', server, scraper, assets, workers=1),
+                run('concurrent', server, scraper, assets, workers=args.workers),
+                run('listing', server, scraper, assets, listing=listing, cache=cache, workers=args.workers,
+                    max_age=24 * 3600),
+                run('warm cache', server, scraper, assets, listing=listing, cache=cache, workers=args.workers,
+                    max_age=24 * 3600),
+                run('revalidate', server, scraper, assets, listing=listing, cache=cache, workers=args.workers,
+                    max_age=0),
+            ]
+
+    if args.json:
+        print(json.dumps({'episodes': len(assets), 'latency': args.latency, 'runs': results}, indent=2))
+        return
+
+    print(f"{len(assets)} episodes, {args.latency * 1000:.0f} ms per request")
+    print(f"{'run':<12} {'seconds':>8} {'requests':>8} {'issues':>6}  settled by")
+    for result in results:
+        print(f"{result['run']:<12} {result['seconds']:>8.3f} {result['requests']:>8} {result['issues']:>6}  "
+              f"{result['sources']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+What a page that shows one summary has to download and parse: the single
+discoverJesusSummaries.ts module versus the manifest plus the one bundle its id
+lives in, for the per-category and hash-bucketed layouts.
+
+Sizes are raw and gzipped bytes. Parse times are the median of --repeat
+JSON.parse calls under node when it is on the PATH (closest to the browser),
+and of json.loads otherwise. "one page" rows average over every id, weighting
+each bundle by the number of ids that need it. --scale repeats the entries
+under new slugs to see how the layouts grow with the site.
+
+    python benchmarks/bench_bundles.py --scale 1 10
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from bench_utils import SCRAPER_DIR
+from outputs import BUNDLE_MANIFEST, BUNDLE_STRATEGIES, TS_HEADER, BundleWriter, TypeScriptWriter, read_ts_entries
+
+TS_PATH = os.path.join(os.path.dirname(SCRAPER_DIR), 'discoverJesusSummaries.ts')
+
+NODE_PARSE = """
+const fs = require('fs');
+const [repeat, ...paths] = process.argv.slice(1);
+const times = {};
+for (const path of paths) {
+  const text = fs.readFileSync(path, 'utf8');
+  const samples = [];
+  for (let i = 0; i < Number(repeat); i++) {
+    const start = process.hrtime.bigint();
+    JSON.parse(text);
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  times[path] = samples[Math.floor(samples.length / 2)];
+}
+console.log(JSON.stringify(times));
+"""
+
+
+def load_entries(scale):
+    entries = [record for _, record in read_ts_entries(TS_PATH)]
+    scaled = []
+    for copy in range(scale):
+        for record in entries:
+            entry_id = record["id"] if copy == 0 else f"{record['id']}-{copy}"
+            scaled.append(dict(record, id=entry_id))
+    return scaled
+
+
+def parse_times(paths, repeat):
+    """Median parse time in ms of each JSON file"""
+    if shutil.which('node'):
+        output = subprocess.run(['node', '-e', NODE_PARSE, str(repeat), *paths],
+                                check=True, capture_output=True, text=True).stdout
+        return json.loads(output), 'node'
+    times = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            json.loads(text)
+            samples.append((time.perf_counter() - start) * 1000)
+        times[path] = statistics.median(samples)
+    return times, 'python'
+
+
+def file_sizes(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return len(data), len(gzip.compress(data))
+
+
+def measure(entries, work_dir, buckets, repeat):
+    # The single module, and its object literal as JSON so the parse is comparable
+    ts_path = os.path.join(work_dir, 'discoverJesusSummaries.ts')
+    with TypeScriptWriter(ts_path) as ts:
+        for record in entries:
+            ts.write(record)
+    literal_path = os.path.join(work_dir, 'single.json')
+    with open(ts_path, encoding='utf-8') as f:
+        literal = f.read()[len(TS_HEADER):].rstrip().rstrip(';')
+    with open(literal_path, 'w', encoding='utf-8') as f:
+        f.write(literal)
+
+    layouts = {}
+    for strategy in BUNDLE_STRATEGIES:
+        out_dir = os.path.join(work_dir, strategy)
+        with BundleWriter(out_dir, strategy=strategy, buckets=buckets) as bundles:
+            for record in entries:
+                bundles.write(record)
+        layouts[strategy] = (out_dir, bundles.manifest)
+
+    paths = [literal_path] + [
+        os.path.join(out_dir, name)
+        for out_dir, manifest in layouts.values()
+        for name in [BUNDLE_MANIFEST] + [bundle['file'] for bundle in manifest['bundles']]
+    ]
+    times, parser = parse_times(paths, repeat)
+
+    raw, gz = file_sizes(ts_path)
+    rows = [{'layout': 'single file', 'what': 'whole module', 'bytes': raw, 'gzip_bytes': gz,
+             'parse_ms': times[literal_path]}]
+    for strategy, (out_dir, manifest) in layouts.items():
+        manifest_path = os.path.join(out_dir, BUNDLE_MANIFEST)
+        manifest_raw, manifest_gz = file_sizes(manifest_path)
+        per_bundle = []
+        for bundle in manifest['bundles']:
+            path = os.path.join(out_dir, bundle['file'])
+            per_bundle.append((bundle['count'], *file_sizes(path), times[path]))
+        total = sum(count for count, *_ in per_bundle)
+        largest = max(per_bundle, key=lambda item: item[1])
+        rows.append({
+            'layout': strategy, 'what': 'manifest', 'bytes': manifest_raw, 'gzip_bytes': manifest_gz,
+            'parse_ms': times[manifest_path],
+        })
+        rows.append({
+            'layout': strategy, 'what': 'one page (avg)',
+            'bytes': round(manifest_raw + sum(count * b for count, b, _, _ in per_bundle) / total),
+            'gzip_bytes': round(manifest_gz + sum(count * g for count, _, g, _ in per_bundle) / total),
+            'parse_ms': times[manifest_path] + sum(count * t for count, _, _, t in per_bundle) / total,
+        })
+        rows.append({
+            'layout': strategy, 'what': 'one page (worst)',
+            'bytes': manifest_raw + largest[1], 'gzip_bytes': manifest_gz + largest[2],
+            'parse_ms': times[manifest_path] + largest[3],
+        })
+        rows.append({
+            'layout': strategy, 'what': f"all {len(per_bundle)} bundles",
+            'bytes': manifest_raw + sum(b for _, b, _, _ in per_bundle),
+            'gzip_bytes': manifest_gz + sum(g for _, _, g, _ in per_bundle),
+            'parse_ms': times[manifest_path] + sum(t for _, _, _, t in per_bundle),
+        })
+    for row in rows:
+        row['parse_ms'] = round(row['parse_ms'], 3)
+    return rows, parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10],
+                        help="Copies of the committed entries to measure")
+    parser.add_argument('--buckets', type=int, default=16, help="Buckets of the hash layout")
+    parser.add_argument('--repeat', type=int, default=50, help="Parses per file")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scale:
+        entries = load_entries(scale)
+        with tempfile.TemporaryDirectory() as work_dir:
+            rows, parse_engine = measure(entries, work_dir, args.buckets, args.repeat)
+        results.append({'scale': scale, 'entries': len(entries), 'parser': parse_engine, 'rows': rows})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(f"\n{result['entries']} entries (parse times: {result['parser']})")
+        print(f"{'layout':>12}  {'what':<18}  {'bytes':>9}  {'gzip':>8}  {'parse ms':>8}")
+        for row in result['rows']:
+            print(f"{row['layout']:>12}  {row['what']:<18}  {row['bytes']:>9}  {row['gzip_bytes']:>8}  "
+                  f"{row['parse_ms']:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Debug captures: one uncompressed .html file per page (how get_page used to save
+every response) vs the capture archive (capture.py).
+
+--pages synthetic responses are saved the way a scrape saves them. Every slug
+is used by two categories (/person/page-4 and /event/page-4), which the
+one-file-per-slug layout cannot keep apart. Reported:
+- write: time each save takes on the fetching thread (median and p99), with
+  pages arriving at --rate per second, and for the archive the time close()
+  takes to write out what is still queued
+- disk: bytes and files, and how many of the pages can still be read back
+- read: loading every page back (a directory scan vs the indexed reader), a
+  random page, and rebuilding index.jsonl by scanning the archive
+
+    python benchmarks/bench_capture.py --pages 2000
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import time
+
+import requests
+
+from bench_utils import scratch_root
+from capture import INDEX_FILE, CaptureReader, CaptureWriter
+from standin_server import synthetic_page
+
+
+def make_response(url, path):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = url
+    response.encoding = 'utf-8'
+    response._content = synthetic_page(path, boilerplate=300, paragraphs=5).encode('utf-8')
+    response.headers.update({'Content-Type': 'text/html; charset=utf-8', 'ETag': f'"{hash(path)}"',
+                             'Content-Encoding': 'gzip', 'Server': 'stand-in'})
+    return response
+
+
+def paced(responses, rate, save):
+    """Call save(url, response) at `rate` pages/sec; returns the duration of every call"""
+    durations = []
+    next_at = time.perf_counter()
+    for url, response in responses:
+        start = time.perf_counter()
+        save(url, response)
+        durations.append(time.perf_counter() - start)
+        next_at += 1 / rate
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    return durations
+
+
+def write_legacy(debug_dir, url, response):
+    """The old _write_debug_html: <last path segment>.html, uncompressed, on the calling thread"""
+    os.makedirs(debug_dir, exist_ok=True)
+    page_name = url.split('/')[-1] or 'index'
+    with open(os.path.join(debug_dir, f"{page_name}.html"), 'w', encoding='utf-8') as f:
+        f.write(response.text)
+
+
+def write_captures(capture_dir, responses, max_bytes, rate):
+    writer = CaptureWriter(capture_dir, max_bytes=max_bytes)
+    durations = paced(responses, rate, writer.add)
+    start = time.perf_counter()
+    writer.close()
+    return durations, time.perf_counter() - start
+
+
+def latency(durations):
+    ordered = sorted(durations)
+    return {
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+    }
+
+
+def disk_usage(paths):
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def read_file(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def read_legacy(debug_dir):
+    pages = {}
+    for path in glob.glob(os.path.join(debug_dir, '*.html')):
+        with open(path, encoding='utf-8') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=500, help="Pages/sec arriving from the fetchers")
+    parser.add_argument('--max-mb', type=float, default=64, help="Archive file size before rotating")
+    parser.add_argument('--lookups', type=int, default=200, help="Random single-page reads")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    categories = ('person', 'event', 'topic', 'group')
+    paths = [f"/{categories[i % len(categories)]}/page-{i // 2}" for i in range(args.pages)]
+    responses = [(f"https://discoverjesus.com{path}", make_response(f"https://discoverjesus.com{path}", path))
+                 for path in paths]
+    rng = random.Random(args.seed)
+    lookups = [rng.choice(responses)[0] for _ in range(args.lookups)]
+
+    with scratch_root() as root_dir:
+        debug_dir = os.path.join(root_dir, 'debug')
+        capture_dir = os.path.join(root_dir, 'captures')
+        legacy_write = paced(responses, args.rate, lambda url, response: write_legacy(debug_dir, url, response))
+        added, drained = write_captures(capture_dir, responses, int(args.max_mb * 1024 * 1024), args.rate)
+        legacy_files = glob.glob(os.path.join(debug_dir, '*'))
+        capture_files = glob.glob(os.path.join(capture_dir, '*'))
+
+        legacy_read, legacy_pages = timed(lambda: read_legacy(debug_dir))
+        capture_read, capture_pages = timed(lambda: {c.url: c.text for c in CaptureReader(capture_dir)})
+        legacy_lookup, _ = timed(lambda: [read_file(os.path.join(debug_dir, f"{url.split('/')[-1]}.html"))
+                                          for url in lookups])
+        reader = CaptureReader(capture_dir)
+        capture_lookup, _ = timed(lambda: [reader.get(url).text for url in lookups])
+        os.remove(os.path.join(capture_dir, INDEX_FILE))
+        rebuild, rebuilt = timed(lambda: CaptureReader(capture_dir))
+        assert rebuilt.index == reader.index
+        assert all(capture_pages[url] == response.text for url, response in responses)
+
+        report = {
+            'pages': args.pages,
+            'legacy': {
+                'write': latency(legacy_write),
+                'files': len(legacy_files),
+                'bytes': disk_usage(legacy_files),
+                'pages_readable': len(legacy_pages),
+                'read_all_seconds': round(legacy_read, 3),
+                'lookup_ms': round(legacy_lookup / args.lookups * 1000, 3),
+            },
+            'archive': {
+                'write': latency(added),
+                'close_seconds': round(drained, 3),
+                'files': len(capture_files),
+                'bytes': disk_usage(capture_files),
+                'pages_readable': len(capture_pages),
+                'read_all_seconds': round(capture_read, 3),
+                'lookup_ms': round(capture_lookup / args.lookups * 1000, 3),
+                'rebuild_index_seconds': round(rebuild, 3),
+            },
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    legacy, archive = report['legacy'], report['archive']
+    print(f"{args.pages} pages at {args.rate:g}/s, each slug used by two categories")
+    print(f"{'':<22} {'html files':>12} {'archive':>12}")
+    for label, key in (('write median ms', 'median_ms'), ('write p99 ms', 'p99_ms')):
+        print(f"{label:<22} {legacy['write'][key]:>12} {archive['write'][key]:>12}")
+    for label, key in (('files', 'files'), ('bytes on disk', 'bytes'),
+                       ('pages readable', 'pages_readable'), ('read all (s)', 'read_all_seconds'),
+                       ('random page (ms)', 'lookup_ms')):
+        print(f"{label:<22} {legacy[key]:>12} {archive[key]:>12}")
+    print(f"archive close() {archive['close_seconds']}s, index rebuild {archive['rebuild_index_seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
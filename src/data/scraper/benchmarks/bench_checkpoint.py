@@ -0,0 +1,75 @@
+"""
+Checkpoint I/O cost: rewriting progress.json after every URL versus appending
+one JSONL record per URL.
+
+    python benchmarks/bench_checkpoint.py --urls 10000 --rewrite-urls 2000
+"""
+import argparse
+import json
+import os
+import time
+
+from bench_utils import scratch_root
+from checkpoint import Checkpoint
+
+
+def fake_summary(i):
+    return {
+        "id": f"person/example-{i}",
+        "title": f"Example {i}",
+        "shortSummary": "A short summary sentence of typical length for a DiscoverJesus entry." * 2,
+        "fullSummary": "A full summary paragraph of typical length. " * 40,
+        "sourceUrl": f"https://discoverjesus.com/person/example-{i}",
+    }
+
+
+def bench_rewrite(root_dir, n):
+    """The old save_progress(): dump the whole list with indent=2 after every URL"""
+    path = os.path.join(root_dir, 'progress.json')
+    summaries = []
+    start = time.perf_counter()
+    for i in range(n):
+        summaries.append(fake_summary(i))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+    return time.perf_counter() - start
+
+
+def bench_jsonl(root_dir, n):
+    checkpoint = Checkpoint(os.path.join(root_dir, 'checkpoint.jsonl'))
+    start = time.perf_counter()
+    for i in range(n):
+        summary = fake_summary(i)
+        checkpoint.record(summary["sourceUrl"], summary=summary)
+    checkpoint.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=10000, help="Records written through the JSONL checkpoint")
+    parser.add_argument('--rewrite-urls', type=int, default=2000,
+                        help="Records written the old way (quadratic, so keep this smaller)")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    with scratch_root() as root_dir:
+        rewrite = bench_rewrite(root_dir, args.rewrite_urls)
+        jsonl = bench_jsonl(root_dir, args.urls)
+
+    results = {
+        'rewrite_progress_json': {'urls': args.rewrite_urls, 'seconds': round(rewrite, 3),
+                                  'ms_per_url': round(rewrite * 1000 / args.rewrite_urls, 3)},
+        'jsonl_checkpoint': {'urls': args.urls, 'seconds': round(jsonl, 3),
+                             'ms_per_url': round(jsonl * 1000 / args.urls, 3)},
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        print(f"{name:>22}: {result['urls']:>6} URLs in {result['seconds']:>8.3f}s "
+              f"({result['ms_per_url']:.3f} ms/URL)")
+
+
+if __name__ == '__main__':
+    main()
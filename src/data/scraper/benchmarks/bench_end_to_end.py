@@ -0,0 +1,179 @@
+"""
+End-to-end offline benchmark of the scraper against a local DiscoverJesus stand-in.
+
+Serves the pages of the capture archive in scraper/captures/ (or saved .html
+files, or synthetic pages) from
+StandInServer with configurable latency, 429/503 responses and redirects, then
+runs extract_urls_from_tree -> validate -> scrape_all -> save_to_typescript and
+prints a machine-readable JSON report: pages/sec, p50/p95 latency per request,
+status codes, time per phase and peak RSS.
+
+    python benchmarks/bench_end_to_end.py --latency 0.05 --rate-429 0.02 --concurrency 8 --output report.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+
+from bench_utils import SCRAPER_DIR, peak_rss_mb, scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper, validate_urls
+from pipeline import ScrapePipeline
+from standin_server import StandInServer, synthetic_page
+
+CAPTURE_DIR = os.path.join(SCRAPER_DIR, 'captures')
+CATEGORIES = ['Person', 'Event', 'Topic', 'Group', 'Relationship', 'Object']
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_site(args):
+    """Return (slugs, StandInServer kwargs) for captured or synthetic pages"""
+    if args.synthetic:
+        slugs = [f"synthetic-page-{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}" for i in range(args.synthetic)]
+        pages_by_slug = {slug: synthetic_page(f"/x/{slug}", boilerplate=300) for slug in slugs}
+    elif args.html_dir:
+        pages_by_slug = StandInServer.from_directory(args.html_dir).pages_by_slug
+        slugs = sorted(pages_by_slug)
+    else:
+        # The generated tree only knows slugs, so pages are served by their last path segment
+        pages = StandInServer.from_captures(args.captures).pages
+        pages_by_slug = {path.rstrip('/').rsplit('/', 1)[-1]: html for path, html in pages.items()}
+        slugs = sorted(pages_by_slug)
+    return slugs, pages_by_slug
+
+
+def write_tree(root_dir, slugs):
+    """Write a tree-level6.txt listing one MP3 per page, spread over the categories"""
+    lines = ['.', '├── Series']
+    for i, slug in enumerate(slugs):
+        lines.append(f"├── {CATEGORIES[i % len(CATEGORIES)]} - {slug.replace('-', ' ')}.mp3")
+    path = os.path.join(root_dir, 'tree-level6.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return 'tree-level6.txt'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--captures', default=CAPTURE_DIR, help="Capture archive to serve (default: scraper/captures)")
+    parser.add_argument('--html-dir', default=None, help="Serve a directory of saved .html files instead")
+    parser.add_argument('--synthetic', type=int, default=0, help="Serve N synthetic pages instead")
+    parser.add_argument('--latency', type=float, default=0.05, help="Stand-in latency per request (seconds)")
+    parser.add_argument('--jitter', type=float, default=0.02, help="Extra uniform random latency (seconds)")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--rate-503', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--redirect-fraction', type=float, default=0.0,
+                        help="Fraction of pages moved behind a 301 redirect")
+    parser.add_argument('--concurrency', type=int, default=8, help="Fetch concurrency for scrape_all")
+    parser.add_argument('--max-rps', type=float, default=0, help="Requests/sec ceiling for scrape_all (0 = none)")
+    parser.add_argument('--validate-workers', type=int, default=8)
+    parser.add_argument('--validate-rps', type=float, default=0)
+    parser.add_argument('--parse-workers', type=int, default=0, help="Use the process-pool pipeline")
+    parser.add_argument('--parser', default='html.parser', help="Parsing engine")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    slugs, pages_by_slug = build_site(args)
+    if not slugs:
+        parser.error(f"No pages found in {args.html_dir or args.captures}; run the scraper with --capture "
+                     f"first or pass --synthetic N")
+
+    rng = random.Random(args.seed)
+    moved = set(rng.sample(slugs, int(len(slugs) * args.redirect_fraction)))
+    for slug in moved:
+        pages_by_slug[f"{slug}-moved"] = pages_by_slug.pop(slug)
+
+    latencies = []
+    latency_lock = threading.Lock()
+
+    def record_latency(response, *a, **kw):
+        with latency_lock:
+            latencies.append(response.elapsed.total_seconds())
+
+    phases = {}
+    logging.disable(logging.CRITICAL)
+    with scratch_root() as root_dir, StandInServer(
+        pages_by_slug=pages_by_slug, latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+        rate_503=args.rate_503, seed=args.seed,
+    ) as server, contextlib.redirect_stdout(io.StringIO()):
+        scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir, parser_engine=args.parser)
+        scraper.response_hooks.append(record_latency)
+        tree_path = write_tree(root_dir, slugs)
+
+        start = time.perf_counter()
+        urls = scraper.extract_urls_from_tree(tree_path)
+        phases['extract'] = time.perf_counter() - start
+        # Moved pages redirect from the URL the tree generates to the new slug
+        for url in urls:
+            slug = url.rsplit('/', 1)[-1]
+            if slug in moved:
+                path = url[len(server.base_url):]
+                server.redirects[path] = f"{path}-moved"
+
+        start = time.perf_counter()
+        validation_results, valid_urls, invalid_urls = validate_urls(
+            scraper, urls, workers=args.validate_workers, max_rps=args.validate_rps
+        )
+        phases['validate'] = time.perf_counter() - start
+
+        pipeline = None
+        if args.parse_workers:
+            pipeline = ScrapePipeline(scraper, fetchers=args.concurrency, parse_workers=args.parse_workers,
+                                      max_rps=args.max_rps)
+        start = time.perf_counter()
+        summaries = scraper.scrape_all(valid_urls, concurrency=args.concurrency, max_rps=args.max_rps,
+                                       pipeline=pipeline)
+        phases['scrape'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scraper.save_to_typescript(summaries, 'discoverJesusSummaries.ts')
+        phases['save_typescript'] = time.perf_counter() - start
+        status_counts = dict(sorted(server.status_counts.items()))
+    logging.disable(logging.NOTSET)
+
+    total = sum(phases.values())
+    report = {
+        'config': vars(args),
+        'pages': {
+            'urls': len(urls),
+            'valid': len(valid_urls),
+            'redirect': len(validation_results['redirect']),
+            'not_found': len(validation_results['not_found']),
+            'error': len(validation_results['error']),
+            'summaries': len(summaries),
+        },
+        'pages_per_sec': round(len(valid_urls) / phases['scrape'], 2) if phases['scrape'] else None,
+        'end_to_end_pages_per_sec': round(len(urls) / total, 2) if total else None,
+        'latency_ms': {
+            'requests': len(latencies),
+            'p50': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            'p95': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            'mean': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        },
+        'status_codes': {str(code): count for code, count in status_counts.items()},
+        'phase_seconds': {name: round(seconds, 3) for name, seconds in phases.items()},
+        'total_seconds': round(total, 3),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Extraction cost per page as fields are added: the compiled single-pass
+Extractor vs one soup.find() chain per field (how the three original fields
+were read), over synthetic pages shaped like the real ones.
+
+The spec is parsing.SUMMARY_FIELDS plus --extra synthetic fields of two
+selectors each that match nothing, which is the worst case for a find() chain:
+every selector walks the whole document. Parse time is reported separately and
+is the same for both. Also reports re-extraction throughput from a response
+cache of --pages pages (scrape_discover_jesus.py --reextract), which makes no
+requests at all.
+
+    python benchmarks/bench_extraction.py --extra 0 6 18 42
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+
+import requests
+
+from bench_utils import scratch_root
+from extraction import Extractor, Field, Selector
+from http_cache import ResponseCache
+from parsing import SUMMARY_FIELDS, make_soup
+from scrape_discover_jesus import DiscoverJesusScraper, reextract
+from standin_server import synthetic_page
+
+
+def extra_fields(count):
+    return [
+        Field(f"extra{i}", [Selector('div', css_class=f"x-{i}"), Selector(('span', 'p'), class_contains=(f"y{i}",))])
+        for i in range(count)
+    ]
+
+
+def find_chain(soup, fields, url):
+    """One soup.find() per selector until a field has a value, find_all() for list fields"""
+    values = {}
+    for field in fields:
+        def test(selector):
+            return lambda tag: selector.matches(tag.name, tag.attrs)
+
+        if field.many:
+            roots = [node for scope in field.within for node in soup.find_all(test(scope))] or [soup]
+            values[field.name] = [
+                (selector.process or field.process)(node, url)
+                for root in roots for selector in field.selectors for node in root.find_all(test(selector))
+            ]
+            continue
+        values[field.name] = None
+        for selector in field.selectors:
+            node = soup.find(test(selector))
+            value = (selector.process or field.process)(node, url) if node is not None else None
+            if value:
+                values[field.name] = value
+                break
+    return values
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench_cache(pages):
+    """Pages/sec of --reextract over a response cache of `pages` pages"""
+    with scratch_root() as root_dir:
+        cache = ResponseCache(os.path.join(root_dir, 'cache/responses.sqlite'))
+        for i in range(pages):
+            url = f"https://discoverjesus.com/person/page-{i}"
+            response = requests.Response()
+            response.status_code = 200
+            response.url = url
+            response.encoding = 'utf-8'
+            response._content = synthetic_page(f"/person/page-{i}", boilerplate=300).encode('utf-8')
+            cache.store(url, response)
+        cache.close()
+        scraper = DiscoverJesusScraper(root_dir=root_dir)
+        scraper.cache = ResponseCache(os.path.join(root_dir, 'cache/responses.sqlite'), offline=True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summaries = reextract(scraper)
+        elapsed = time.perf_counter() - start
+        scraper.cache.close()
+    return {'pages': len(summaries), 'seconds': round(elapsed, 3), 'pages_per_sec': round(len(summaries) / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--extra', type=int, nargs='+', default=[0, 6, 18, 42],
+                        help="Synthetic fields added to the real ones")
+    parser.add_argument('--boilerplate', type=int, default=300, help="Navigation links per page")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=500, help="Pages in the re-extraction cache")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    url = "https://discoverjesus.com/person/mary-mother-of-jesus"
+    html = synthetic_page('/person/mary-mother-of-jesus', boilerplate=args.boilerplate, paragraphs=5)
+    parse_ms = timed(lambda: make_soup(html), args.repeat)
+    soup = make_soup(html)
+
+    rows = []
+    for extra in args.extra:
+        fields = list(SUMMARY_FIELDS) + extra_fields(extra)
+        extractor = Extractor(fields)
+        single, chained = extractor.extract(soup, url)[0], find_chain(soup, fields, url)
+        assert all(single[field.name] == chained[field.name] for field in fields if not field.many)
+        rows.append({
+            'fields': len(fields),
+            'single_pass_ms': round(timed(lambda: extractor.extract(soup, url), args.repeat), 3),
+            'find_chain_ms': round(timed(lambda: find_chain(soup, fields, url), args.repeat), 3),
+        })
+    report = {'page_bytes': len(html), 'parse_ms': round(parse_ms, 3), 'extraction': rows,
+              'reextract': bench_cache(args.pages)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Page: {report['page_bytes']} bytes, parse {report['parse_ms']:.3f} ms (html.parser)")
+    print(f"{'fields':>6} {'single pass ms':>15} {'find chain ms':>14}")
+    for row in rows:
+        print(f"{row['fields']:>6} {row['single_pass_ms']:>15.3f} {row['find_chain_ms']:>14.3f}")
+    cache = report['reextract']
+    print(f"\n--reextract: {cache['pages']} cached pages in {cache['seconds']}s "
+          f"({cache['pages_per_sec']} pages/s, 0 requests)")
+
+
+if __name__ == '__main__':
+    main()
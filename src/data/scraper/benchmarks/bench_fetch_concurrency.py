@@ -0,0 +1,70 @@
+"""
+Wall-clock benchmark of the asyncio scrape engine against a local stand-in.
+
+Replays the paths from valid_urls.json against StandInServer with a fixed
+per-request latency and reports how long scrape_all takes at each concurrency.
+
+    python benchmarks/bench_fetch_concurrency.py --latency 0.05 --levels 1 4 16
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+from bench_utils import SCRAPER_DIR, scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper
+from standin_server import StandInServer
+
+
+def load_paths(limit=None):
+    with open(os.path.join(SCRAPER_DIR, 'valid_urls.json'), encoding='utf-8') as f:
+        paths = [urlparse(url).path for url in json.load(f)]
+    return paths[:limit] if limit else paths
+
+
+def run_level(base_url, paths, concurrency, max_rps):
+    with scratch_root() as root_dir:
+        scraper = DiscoverJesusScraper(base_url=base_url, root_dir=root_dir)
+        urls = [f"{base_url}{path}" for path in paths]
+        # The scraper is chatty; keep its per-page output out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            summaries = scraper.scrape_all_async(urls, concurrency=concurrency, max_rps=max_rps)
+            elapsed = time.perf_counter() - start
+    return {
+        'concurrency': concurrency,
+        'urls': len(urls),
+        'summaries': len(summaries),
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(urls) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help="Per-request latency of the stand-in (seconds)")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 16], help="Concurrency levels to measure")
+    parser.add_argument('--max-rps', type=float, default=0, help="Global requests/sec ceiling (0 = unlimited)")
+    parser.add_argument('--limit', type=int, default=None, help="Only use the first N URLs")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    paths = load_paths(args.limit)
+    with StandInServer(latency=args.latency) as server:
+        results = [run_level(server.base_url, paths, level, args.max_rps) for level in args.levels]
+
+    if args.json:
+        print(json.dumps({'latency': args.latency, 'results': results}, indent=2))
+        return
+
+    print(f"{len(paths)} URLs, stand-in latency {args.latency * 1000:.0f} ms/request")
+    print(f"{'concurrency':>11}  {'seconds':>8}  {'pages/sec':>9}")
+    for result in results:
+        print(f"{result['concurrency']:>11}  {result['seconds']:>8.2f}  {result['pages_per_sec']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
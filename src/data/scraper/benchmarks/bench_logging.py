@@ -0,0 +1,139 @@
+"""
+Scrape throughput under each way of writing the run's output.
+
+Scrapes --pages synthetic pages from the stand-in server with the asyncio
+engine (--concurrency requests in flight) and logs to a terminal stand-in
+(a file whose every flush takes --terminal-latency seconds, the time a
+terminal spends drawing the text) and to a log file, like main() does:
+- sync debug: every per-URL line (fetch attempts, each extracted field with
+  the full summary text, selector paths) written on the worker threads by a
+  StreamHandler and a FileHandler, i.e. what the prints and basicConfig did
+- sync info: the same handlers, only the run summary
+- queued debug: every per-URL line, written by a QueueListener thread
+- queued info: the default of scrape_discover_jesus.py
+
+"drained" includes waiting for the listener to write out what is still queued.
+
+    python benchmarks/bench_logging.py --pages 400 --terminal-latency 0.0002
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+from bench_utils import scratch_root
+from log_setup import FORMAT, QueuedLogging
+from scrape_discover_jesus import DiscoverJesusScraper
+from standin_server import StandInServer
+
+MODES = ('sync debug', 'sync info', 'queued debug', 'queued info')
+
+
+class SlowStream:
+    """Terminal stand-in: a file whose every flush also takes `latency` seconds"""
+
+    def __init__(self, path, latency):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.latency = latency
+
+    def write(self, text):
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def close(self):
+        self.file.close()
+
+
+class SyncLogging:
+    """The old setup: the handlers write on whichever thread logs"""
+
+    def __init__(self, level, log_file, stream):
+        self.level = logging.getLevelName(level)
+        self.handlers = [logging.StreamHandler(stream), logging.FileHandler(log_file, encoding='utf-8')]
+        for handler in self.handlers:
+            handler.setFormatter(logging.Formatter(FORMAT))
+
+    def __enter__(self):
+        root = logging.getLogger()
+        self._saved = (root.handlers[:], root.level)
+        root.handlers = list(self.handlers)
+        root.setLevel(self.level)
+        return self
+
+    def __exit__(self, *exc):
+        root = logging.getLogger()
+        root.handlers, level = self._saved
+        root.setLevel(level)
+        for handler in self.handlers:
+            handler.close()
+        return False
+
+
+def count_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return sum(1 for _ in f)
+
+
+def run_mode(mode, base_url, pages, concurrency, terminal_latency):
+    queued, level = mode.split()
+    with scratch_root() as root_dir:
+        scraper = DiscoverJesusScraper(base_url=base_url, root_dir=root_dir)
+        urls = [f"{base_url}/person/page-{i}" for i in range(pages)]
+        terminal_path = os.path.join(root_dir, 'terminal.txt')
+        log_file = os.path.join(root_dir, 'run.log')
+        stream = SlowStream(terminal_path, terminal_latency)
+        setup = QueuedLogging if queued == 'queued' else SyncLogging
+        start = time.perf_counter()
+        with setup(level.upper(), log_file, stream):
+            summaries = scraper.scrape_all(urls, concurrency=concurrency)
+            scraped = time.perf_counter() - start
+        drained = time.perf_counter() - start
+        stream.close()
+        lines = count_lines(terminal_path)
+        log_bytes = os.path.getsize(log_file)
+    assert len(summaries) == pages
+    return {
+        'mode': mode,
+        'seconds': round(scraped, 3),
+        'drained_seconds': round(drained, 3),
+        'pages_per_sec': round(pages / scraped, 1),
+        'lines': lines,
+        'log_bytes': log_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight")
+    parser.add_argument('--paragraphs', type=int, default=8, help="Summary paragraphs per page")
+    parser.add_argument('--terminal-latency', type=float, default=0.0002,
+                        help="Seconds every write to the terminal stand-in takes")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    with StandInServer(synthetic_options={'paragraphs': args.paragraphs}) as server:
+        results = [run_mode(mode, server.base_url, args.pages, args.concurrency, args.terminal_latency)
+                   for mode in args.modes]
+
+    if args.json:
+        print(json.dumps({'pages': args.pages, 'terminal_latency': args.terminal_latency, 'results': results},
+                         indent=2))
+        return
+
+    print(f"{args.pages} pages, {args.concurrency} in flight, "
+          f"{args.terminal_latency * 1000:.2f} ms per terminal write")
+    print(f"{'mode':<13} {'seconds':>8} {'drained':>8} {'pages/s':>8} {'lines':>7} {'log bytes':>10}")
+    for result in results:
+        print(f"{result['mode']:<13} {result['seconds']:>8.3f} {result['drained_seconds']:>8.3f} "
+              f"{result['pages_per_sec']:>8.1f} {result['lines']:>7} {result['log_bytes']:>10}")
+
+
+if __name__ == '__main__':
+    main()
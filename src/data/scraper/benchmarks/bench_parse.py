@@ -0,0 +1,117 @@
+"""
+Parse-time micro-benchmark for the summary extraction engines.
+
+Parses every page of the capture archive in scraper/captures/ (written by
+scrape_discover_jesus.py --capture), a directory of saved .html files with
+--html-dir, or synthetic pages with --synthetic N, with each engine and reports the time per page and which
+selector path (primary / fallback / missing) each field came from.
+
+    python benchmarks/bench_parse.py --repeat 3
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import time
+from collections import Counter
+
+from bench_utils import SCRAPER_DIR
+from capture import CaptureReader
+from parsing import PARSER_ENGINES, check_engine, extract_summary, installed_engines
+from standin_server import synthetic_page
+
+CAPTURE_DIR = os.path.join(SCRAPER_DIR, 'captures')
+
+
+def load_pages(capture_dir, html_dir, synthetic):
+    """[(url, html)] from the capture archive, saved pages, or synthetic ones"""
+    if synthetic:
+        return [
+            (f"https://discoverjesus.com/person/page-{i}", synthetic_page(f"/person/page-{i}", boilerplate=300))
+            for i in range(synthetic)
+        ]
+    if not html_dir:
+        return [(capture.url, capture.text) for capture in CaptureReader(capture_dir)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(html_dir, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            slug = os.path.splitext(os.path.basename(path))[0]
+            # The file name only keeps the last path segment
+            pages.append((f"https://discoverjesus.com/page/{slug}", f.read()))
+    return pages
+
+
+def bench_engine(engine, pages, repeat):
+    per_page = []
+    paths = Counter()
+    outputs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for url, html in pages:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                summary, selector_paths = extract_summary(html, url, engine=engine)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            per_page.append(best)
+            paths.update(f"{field}:{path}" for field, path in selector_paths.items())
+            outputs.append(summary)
+    return {
+        'engine': engine,
+        'pages': len(pages),
+        'mean_ms': round(statistics.mean(per_page) * 1000, 3),
+        'median_ms': round(statistics.median(per_page) * 1000, 3),
+        'max_ms': round(max(per_page) * 1000, 3),
+        'selector_paths': dict(sorted(paths.items())),
+    }, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--captures', default=CAPTURE_DIR, help="Capture archive (default: scraper/captures)")
+    parser.add_argument('--html-dir', default=None, help="Parse a directory of saved .html files instead")
+    parser.add_argument('--synthetic', type=int, default=0, help="Use N synthetic pages instead of saved ones")
+    parser.add_argument('--repeat', type=int, default=3, help="Parses per page; the fastest is kept")
+    parser.add_argument('--engines', nargs='+', default=list(installed_engines()), choices=PARSER_ENGINES,
+                        help="Engines to time (default: every installed one)")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    pages = load_pages(args.captures, args.html_dir, args.synthetic)
+    if not pages:
+        parser.error(f"No pages found in {args.html_dir or args.captures}; run the scraper with --capture "
+                     f"first or pass --synthetic N")
+
+    results = []
+    baseline = None
+    for engine in args.engines:
+        try:
+            check_engine(engine)
+        except ValueError as e:
+            results.append({'engine': engine, 'skipped': str(e)})
+            continue
+        result, outputs = bench_engine(engine, pages, args.repeat)
+        # Every engine must extract exactly what the original parser does
+        if baseline is None:
+            baseline = outputs
+        result['mismatches'] = sum(1 for a, b in zip(baseline, outputs) if a != b)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(pages)} pages, best of {args.repeat}")
+    for result in results:
+        if 'skipped' in result:
+            print(f"{result['engine']:>12}: skipped ({result['skipped']})")
+            continue
+        print(f"{result['engine']:>12}: mean {result['mean_ms']:.3f} ms/page, median {result['median_ms']:.3f}, "
+              f"max {result['max_ms']:.3f}, mismatches {result['mismatches']}")
+        print(f"{'':>12}  {result['selector_paths']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Search index size and query latency.
+
+Builds the index from scraper/summaries.json and the Urantia paper summaries,
+then times typical queries against it: cold (index.json and the shards a query
+needs read from disk) and warm (shards already loaded, as in the app after the
+first keystroke). The baseline is what a client-side search without an index
+does on every keystroke: lower-case every title and summary and look for the
+query words in them. Typing rows replay a query one keystroke at a time.
+
+    python benchmarks/bench_search_index.py --repeat 200
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from bench_utils import SCRAPER_DIR
+from search_index import SEARCH_INDEX, SearchIndex, SearchIndexWriter, add_urantia_papers
+
+DATA_DIR = os.path.dirname(SCRAPER_DIR)
+QUERIES = ('jesus', 'baptism of jesus', 'peter', 'apostles', 'resurrection', 'mary mother of jesus',
+           'paradise trinity', 'thought adjuster', 'healing at sundown', 'zebedee')
+
+
+def build(out_dir):
+    writer = SearchIndexWriter(out_dir)
+    with open(os.path.join(SCRAPER_DIR, 'summaries.json'), encoding='utf-8') as f:
+        summaries = json.load(f)
+    for summary in summaries:
+        writer.write(summary)
+    add_urantia_papers(writer, os.path.join(DATA_DIR, 'json/urantia_summaries.json'))
+    start = time.perf_counter()
+    writer.close()
+    return writer, time.perf_counter() - start
+
+
+def documents_text():
+    """Every searchable string, as a client without an index would hold them"""
+    with open(os.path.join(SCRAPER_DIR, 'summaries.json'), encoding='utf-8') as f:
+        texts = [(s["title"], s["shortSummary"], s["fullSummary"]) for s in json.load(f)]
+    with open(os.path.join(DATA_DIR, 'json/urantia_summaries.json'), encoding='utf-8') as f:
+        texts += [(p["title"], p.get("episode_card", ""), p.get("episode_page", "")) for p in json.load(f)]
+    return texts
+
+
+def naive_search(texts, query):
+    needles = query.lower().split()
+    return [i for i, fields in enumerate(texts)
+            if all(any(needle in field.lower() for field in fields) for needle in needles)]
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help="Runs per query")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    texts = documents_text()
+    with tempfile.TemporaryDirectory() as out_dir:
+        writer, build_seconds = build(out_dir)
+        files = sorted(os.listdir(out_dir))
+        sizes = {}
+        for name in files:
+            with open(os.path.join(out_dir, name), 'rb') as f:
+                data = f.read()
+            sizes[name] = (len(data), len(gzip.compress(data)))
+        shard_sizes = [size for name, size in sizes.items() if name != SEARCH_INDEX]
+
+        warm = SearchIndex(out_dir)
+        rows = []
+        for query in QUERIES:
+            typing = [query[:end] for end in range(2, len(query) + 1)]
+            rows.append({
+                'query': query,
+                'results': len(warm.search(query, limit=1000)),
+                'cold_ms': round(timed(lambda: SearchIndex(out_dir).search(query), args.repeat // 10 or 1), 3),
+                'warm_ms': round(timed(lambda: warm.search(query), args.repeat), 3),
+                'scan_ms': round(timed(lambda: naive_search(texts, query), args.repeat // 10 or 1), 3),
+                'typing_warm_ms': round(timed(lambda: [warm.search(prefix) for prefix in typing], 10), 3),
+                'typing_scan_ms': round(timed(lambda: [naive_search(texts, prefix) for prefix in typing], 3), 3),
+            })
+
+    report = {
+        'documents': len(writer.documents),
+        'terms': writer.meta['terms'],
+        'build_seconds': round(build_seconds, 3),
+        'index_json_bytes': sizes[SEARCH_INDEX][0],
+        'index_json_gzip_bytes': sizes[SEARCH_INDEX][1],
+        'shards': len(shard_sizes),
+        'shard_bytes_total': sum(raw for raw, _ in shard_sizes),
+        'shard_gzip_bytes_total': sum(gz for _, gz in shard_sizes),
+        'largest_shard_gzip_bytes': max(gz for _, gz in shard_sizes),
+        'source_text_bytes': sum(len(field.encode('utf-8')) for fields in texts for field in fields),
+        'queries': rows,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['documents']} documents, {report['terms']} terms, built in {report['build_seconds']}s")
+    print(f"index.json: {report['index_json_bytes']} bytes ({report['index_json_gzip_bytes']} gzipped)")
+    print(f"{report['shards']} shards: {report['shard_bytes_total']} bytes "
+          f"({report['shard_gzip_bytes_total']} gzipped, largest {report['largest_shard_gzip_bytes']}); "
+          f"source text {report['source_text_bytes']} bytes")
+    print(f"\n{'query':<22} {'hits':>5} {'cold ms':>8} {'warm ms':>8} {'scan ms':>8} {'typing idx':>10} "
+          f"{'typing scan':>11}")
+    for row in rows:
+        print(f"{row['query']:<22} {row['results']:>5} {row['cold_ms']:>8.3f} {row['warm_ms']:>8.3f} "
+              f"{row['scan_ms']:>8.3f} {row['typing_warm_ms']:>10.3f} {row['typing_scan_ms']:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
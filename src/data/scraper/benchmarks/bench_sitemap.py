@@ -0,0 +1,127 @@
+"""
+Sitemap-driven discovery and lastmod-based incremental crawling, offline.
+
+The stand-in serves --pages synthetic pages and a sitemap listing them. The tree
+lists every page, but --wrong-category of them under the wrong category, plus
+--missing entries for pages the site does not have, like the real tree. Three
+runs are compared:
+
+- guess: URLs generated from the tree alone, validated and scraped
+- sitemap: the same with --sitemap; wrong categories are corrected and missing
+  pages are never requested
+- incremental: a later --incremental run after --changed pages got a new lastmod
+
+    python benchmarks/bench_sitemap.py --pages 500 --changed 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+
+from bench_utils import scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper, save_outputs, validate_urls
+from sitemap import IncrementalPlan, ScrapeState
+from standin_server import StandInServer, synthetic_page
+
+CATEGORIES = ['person', 'event', 'topic', 'group', 'relationship', 'object']
+
+
+def build_site(args):
+    """(page paths, tree lines) of a synthetic site and its imperfect tree"""
+    rng = random.Random(args.seed)
+    paths = []
+    lines = ['.', '├── Series']
+    for i in range(args.pages):
+        slug = f"page-{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{i // 676 or ''}"
+        category = CATEGORIES[i % len(CATEGORIES)]
+        paths.append(f"/{category}/{slug}")
+        listed = category
+        if rng.random() < args.wrong_category:
+            listed = CATEGORIES[(i + 1) % len(CATEGORIES)]
+        lines.append(f"├── {listed.title()} - {slug.replace('-', ' ')}.mp3")
+    for i in range(args.missing):
+        lines.append(f"├── Topic - missing page {i}.mp3")
+    return paths, lines
+
+
+def run_once(server, root_dir, tree_path, args, sitemap=False, incremental=False):
+    """Extract, validate and scrape as run() does; returns the request counts of the run"""
+    scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+    before = server.requests_served
+    before_404 = server.status_counts[404]
+    plan = None
+    if sitemap:
+        index = scraper.discover_sitemap()
+    urls = scraper.extract_urls_from_tree(tree_path, quiet=True)
+    if sitemap:
+        previous = None
+        if incremental:
+            with open(os.path.join(root_dir, 'scraper/summaries.json'), encoding='utf-8') as f:
+                previous = {summary["sourceUrl"]: summary for summary in json.load(f)}
+        state = ScrapeState(os.path.join(root_dir, 'scraper/sitemap_state.json'))
+        plan = IncrementalPlan(urls, index, state, previous)
+        urls = plan.to_scrape
+    _, valid_urls, _ = validate_urls(scraper, urls, workers=args.concurrency, max_rps=0)
+    summaries = scraper.scrape_all(valid_urls, concurrency=args.concurrency)
+    if plan is not None:
+        summaries = list(plan.merge(summaries))
+    save_outputs(scraper, summaries)
+    return {
+        'requests': server.requests_served - before,
+        'not_found': server.status_counts[404] - before_404,
+        'scraped': len(valid_urls),
+        'summaries': len(summaries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500, help="Pages on the stand-in site")
+    parser.add_argument('--wrong-category', type=float, default=0.05,
+                        help="Fraction of tree entries filed under the wrong category")
+    parser.add_argument('--missing', type=int, default=20, help="Tree entries for pages the site does not have")
+    parser.add_argument('--changed', type=int, default=10, help="Pages given a new lastmod before the last run")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    paths, lines = build_site(args)
+    pages = {path: synthetic_page(path) for path in paths}
+    entries = [(path, '2024-01-01T00:00:00+00:00') for path in paths]
+
+    results = {}
+    logging.disable(logging.CRITICAL)
+    with scratch_root() as root_dir, StandInServer(pages=pages, sitemap_entries=entries,
+                                                   sitemap_page_size=200) as server, \
+            contextlib.redirect_stdout(io.StringIO()):
+        os.makedirs('scraper', exist_ok=True)
+        tree_path = 'tree-level6.txt'
+        with open(os.path.join(root_dir, tree_path), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        results['guess'] = run_once(server, root_dir, tree_path, args)
+        results['sitemap'] = run_once(server, root_dir, tree_path, args, sitemap=True)
+        changed = random.Random(args.seed).sample(range(len(entries)), args.changed)
+        for i in changed:
+            entries[i] = (entries[i][0], '2024-06-01T00:00:00+00:00')
+        server.sitemap_entries = entries
+        results['incremental'] = run_once(server, root_dir, tree_path, args, sitemap=True, incremental=True)
+    logging.disable(logging.NOTSET)
+
+    if args.json:
+        print(json.dumps({'pages': args.pages, 'changed': args.changed, 'runs': results}, indent=2))
+        return
+
+    print(f"{args.pages} pages, {len(lines) - 2} tree entries, {args.changed} changed before the incremental run")
+    print(f"{'run':>12}  {'requests':>8}  {'404s':>5}  {'scraped':>7}  {'summaries':>9}")
+    for name, result in results.items():
+        print(f"{name:>12}  {result['requests']:>8}  {result['not_found']:>5}  {result['scraped']:>7}  "
+              f"{result['summaries']:>9}")
+
+
+if __name__ == '__main__':
+    main()
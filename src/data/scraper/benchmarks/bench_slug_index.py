@@ -0,0 +1,109 @@
+"""
+Trigram slug index: build time, lookup latency and how many of the hand-written
+url_corrections it would have found on its own.
+
+The index holds the known-good pages of the last run (scraper/valid_urls.json
+and summaries.json), padded with --extra synthetic slugs to see how lookups
+scale. Each correction in DiscoverJesusScraper.url_corrections is looked up as
+the URL the tree would have generated, and counts as found when the right page
+is the top candidate, and as applied when it is also confident enough to be
+applied automatically.
+
+    python benchmarks/bench_slug_index.py --extra 0 10000
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from bench_utils import SCRAPER_DIR, scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper
+from slug_index import SlugIndex, known_paths
+
+SYLLABLES = ('ab', 'el', 'ja', 'mes', 'jo', 'hn', 'pe', 'ter', 'ma', 'ry', 'gal', 'il', 'ee', 'na', 'za',
+             'reth', 'be', 'th', 'an', 'y', 'ca', 'per', 'um', 'si', 'mon', 'ju', 'das', 'phi', 'lip', 'tho')
+COMMON = ('of', 'the', 'and', 'jesus', 'in')
+
+
+def synthetic_paths(count, seed):
+    """Slugs of made-up words with a sprinkling of the common ones, like the real titles"""
+    rng = random.Random(seed)
+    categories = ('person', 'event', 'topic', 'group')
+
+    def word():
+        if rng.random() < 0.25:
+            return rng.choice(COMMON)
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    return [f"{rng.choice(categories)}/{'-'.join(word() for _ in range(rng.randint(2, 6)))}" for _ in range(count)]
+
+
+def queries(scraper, index):
+    """(generated path, expected path) of each correction whose target is a known page"""
+    by_slug = {path.split('/', 1)[1]: path for path in index.paths}
+    pairs = []
+    for wrong, right in scraper.url_corrections.items():
+        if '/' in wrong:
+            if right in index:
+                pairs.append((wrong, right))
+        elif right in by_slug:
+            pairs.append((f"{by_slug[right].split('/', 1)[0]}/{wrong}", by_slug[right]))
+    return pairs
+
+
+def measure(paths, scraper, extra, seed, repeat):
+    start = time.perf_counter()
+    index = SlugIndex(paths + synthetic_paths(extra, seed))
+    build_ms = (time.perf_counter() - start) * 1000
+    pairs = queries(scraper, index)
+
+    latencies = []
+    found = applied = 0
+    for wrong, right in pairs:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            candidates = index.search(wrong, k=5)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        found += bool(candidates) and candidates[0][0] == right
+        applied += SlugIndex.confident(candidates) == right
+    latencies.sort()
+    return {
+        'slugs': len(index),
+        'build_ms': round(build_ms, 2),
+        'queries': len(pairs),
+        'p50_us': round(latencies[len(latencies) // 2], 1) if latencies else None,
+        'p99_us': round(latencies[int(len(latencies) * 0.99)], 1) if latencies else None,
+        'top1_correct': found,
+        'auto_applied': applied,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--extra', type=int, nargs='+', default=[0, 10000],
+                        help="Synthetic slugs added to the known pages")
+    parser.add_argument('--repeat', type=int, default=50, help="Lookups per query")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    with scratch_root():
+        scraper = DiscoverJesusScraper(root_dir=os.path.dirname(SCRAPER_DIR))
+        paths = known_paths(scraper.root_dir)
+        if not paths:
+            parser.error("No known pages: scraper/valid_urls.json and summaries.json are missing")
+        results = [measure(paths, scraper, extra, args.seed, args.repeat) for extra in args.extra]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'slugs':>7}  {'build ms':>8}  {'queries':>7}  {'p50 us':>7}  {'p99 us':>7}  {'top-1':>5}  {'auto':>5}")
+    for result in results:
+        print(f"{result['slugs']:>7}  {result['build_ms']:>8.2f}  {result['queries']:>7}  {result['p50_us']:>7}  "
+              f"{result['p99_us']:>7}  {result['top1_correct']:>5}  {result['auto_applied']:>5}")
+
+
+if __name__ == '__main__':
+    main()
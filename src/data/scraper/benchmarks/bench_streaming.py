@@ -0,0 +1,107 @@
+"""
+Peak memory of a full scrape: scrape_all + save_outputs vs the streaming mode
+(scrape_stream + save_outputs_streaming), at several crawl sizes.
+
+The stand-in serves synthetic pages with a long full summary. Every (mode, size)
+pair runs in its own child process so each peak RSS is measured in isolation;
+the stand-in server runs in this process and is not counted. Pages are not
+captured (--capture archives go to disk through a bounded queue, not memory).
+
+    python benchmarks/bench_streaming.py --sizes 200 50000
+"""
+import argparse
+import contextlib
+import json
+import logging
+import subprocess
+import sys
+import time
+
+from bench_utils import peak_rss_mb, scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper, save_outputs, save_outputs_streaming
+from standin_server import StandInServer
+
+MODES = ('collect', 'stream')
+
+
+class _Discard:
+    """
+    stdout replacement that drops anything printed during a run (the scraper itself
+    logs, which is disabled here). A StringIO would grow with the crawl, so it
+    would not measure the scraper itself
+    """
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def run_child(mode, size, base_url, concurrency, chunk_size):
+    """Scrape `size` pages in this process and return the measurements"""
+    logging.disable(logging.CRITICAL)
+    urls = (f"{base_url}/person/page-{i}" for i in range(size))
+    with scratch_root() as root_dir, contextlib.redirect_stdout(_Discard()):
+        scraper = DiscoverJesusScraper(base_url=base_url, root_dir=root_dir)
+        start = time.perf_counter()
+        if mode == 'stream':
+            summaries = scraper.scrape_stream(urls, concurrency=concurrency, chunk_size=chunk_size)
+            save_outputs_streaming(scraper, summaries)
+        else:
+            summaries = scraper.scrape_all(urls, concurrency=concurrency)
+            save_outputs(scraper, summaries)
+        elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'pages': size,
+        'seconds': round(elapsed, 2),
+        'pages_per_sec': round(size / elapsed, 1),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure(mode, size, base_url, args):
+    command = [
+        sys.executable, __file__, '--child', mode, str(size), base_url,
+        '--concurrency', str(args.concurrency), '--chunk-size', str(args.chunk_size),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 50000], help="Crawl sizes to measure")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--paragraphs', type=int, default=20, help="Extra paragraphs in each full summary")
+    parser.add_argument('--concurrency', type=int, default=16, help="Fetch concurrency")
+    parser.add_argument('--chunk-size', type=int, default=256, help="URLs per chunk in streaming mode")
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'SIZE', 'BASE_URL'), help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size, base_url = args.child
+        print(json.dumps(run_child(mode, int(size), base_url, args.concurrency, args.chunk_size)))
+        return
+
+    with StandInServer(synthetic_options={'boilerplate': 50, 'paragraphs': args.paragraphs}) as server:
+        results = [
+            measure(mode, size, server.base_url, args)
+            for size in args.sizes
+            for mode in args.modes
+        ]
+
+    if args.json:
+        print(json.dumps({'paragraphs': args.paragraphs, 'results': results}, indent=2))
+        return
+
+    print(f"{'mode':>8}  {'pages':>7}  {'seconds':>8}  {'pages/sec':>9}  {'peak RSS MB':>11}")
+    for result in results:
+        print(f"{result['mode']:>8}  {result['pages']:>7}  {result['seconds']:>8.2f}  "
+              f"{result['pages_per_sec']:>9.1f}  {result['peak_rss_mb']:>11}")
+
+
+if __name__ == '__main__':
+    main()
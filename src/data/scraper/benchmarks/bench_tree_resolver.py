@@ -0,0 +1,173 @@
+"""
+Benchmark of extract_urls_from_tree on a synthetic tree file.
+
+Compares the original line-by-line implementation (reproduced below as the
+baseline, printing to a discarded stream) with the compiled TreeResolver in
+verbose and quiet mode, and checks both produce the same URLs apart from the
+de-duplication.
+
+    python benchmarks/bench_tree_resolver.py --lines 100000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import time
+
+from bench_utils import scratch_root
+from scrape_discover_jesus import DiscoverJesusScraper
+
+CATEGORIES = ['Person', 'Event', 'Topic', 'Group', 'Relationship', 'Object', 'Place']
+WORDS = ['jesus', 'mary', 'the', 'kingdom', 'of', "peter's", 'baptism', 'women_s', 'corps', 'apostle',
+         'journey', 'to', 'jerusalem', 'bethany', 'second', 'coming', 'divine', 'human', 'nature']
+
+
+def synthetic_tree(n, seed=0):
+    """Tree lines mixing directories, MP3 variants, docx/txt files and unusual names"""
+    rng = random.Random(seed)
+    lines = ['.']
+    while len(lines) < n:
+        kind = rng.random()
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+        if kind < 0.05:
+            lines.append(f"│   Series {rng.randint(1, 20)}")
+        elif kind < 0.15:
+            lines.append(f"├── {rng.choice(CATEGORIES)} - {title}.{rng.choice(['docx', 'txt'])}")
+        elif kind < 0.2:
+            lines.append(f"└── {title} Reflections.mp3")
+        else:
+            separator = rng.choice([' - ', ' – '])
+            # Several recordings of the same page differ only by a trailing number
+            variant = rng.choice(['', '', '1', '2', '3'])
+            lines.append(f"├── {rng.choice(CATEGORIES)}{separator}{title}{variant}.mp3")
+    return lines
+
+
+def legacy_extract(scraper, abs_path):
+    """The original extract_urls_from_tree, kept as the benchmark baseline"""
+    urls = []
+    total_files = 0
+    skipped_files = {'not_entry': 0, 'docx_txt': 0, 'no_hyphen': 0, 'unknown_category': 0}
+    with open(abs_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('├── ') or line.startswith('└── '):
+                total_files += 1
+                filename = line[4:].strip()
+                print(f"\nProcessing: {filename}")
+                if filename.endswith(('.docx', '.txt')):
+                    print(f"Skipping docx/txt file: {filename}")
+                    skipped_files['docx_txt'] += 1
+                    continue
+                filename = filename.replace('.mp3', '')
+                filename = re.sub(r'\d+$', '', filename)
+                category = None
+                title = None
+                if ' - ' in filename:
+                    category, title = filename.split(' - ', 1)
+                elif ' – ' in filename:
+                    category, title = filename.split(' – ', 1)
+                if "Martha of Bethany" in filename:
+                    category, title = "Person", "martha-of-bethany"
+                elif "Mary of Bethany" in filename:
+                    category, title = "Person", "mary-of-bethany"
+                elif not category:
+                    for cat in ['Person', 'Event', 'Topic', 'Group', 'Relationship', 'Object']:
+                        if filename.startswith(cat):
+                            category = cat
+                            title = filename[len(cat):].strip()
+                            break
+                if not category:
+                    if any(word in filename for word in ['Jesus', 'Mary', 'Joseph', 'John', 'Peter', 'Paul']):
+                        category, title = 'Person', filename
+                    elif any(word in filename for word in ['Baptism', 'Birth', 'Death', 'Resurrection']):
+                        category, title = 'Event', filename
+                    elif any(word in filename for word in ['Establishing', 'Concepts', 'History', 'Philosophy']):
+                        category, title = 'Topic', filename
+                    else:
+                        print(f"No category found in: {filename}")
+                        skipped_files['no_hyphen'] += 1
+                        continue
+                category = category.strip().lower()
+                mapped = None
+                for slug in ['person', 'event', 'topic', 'group', 'relationship', 'object']:
+                    if category.startswith(slug):
+                        mapped = slug
+                        break
+                if mapped is None:
+                    print(f"Unknown category '{category}' in: {filename}")
+                    skipped_files['unknown_category'] += 1
+                    continue
+                text = title.lower().replace("'", "").replace('"', '')
+                text = text.replace('–', '-').replace('—', '-').replace('_', '-')
+                text = re.sub(r'[^\w\-]', '-', text)
+                text = re.sub(r'-+', '-', text).strip('-')
+                url_title = scraper.url_corrections.get(text, text)
+                url = f"{scraper.base_url}/{mapped}/{url_title}"
+                if f"{mapped}/{url_title}" in scraper.url_corrections:
+                    url = f"{scraper.base_url}/{scraper.url_corrections[f'{mapped}/{url_title}']}"
+                print(f"✓ Category: {mapped}")
+                print(f"✓ Original title: {title}")
+                print(f"✓ Sanitized title: {url_title}")
+                print(f"✓ Generated URL: {url}")
+                print("---")
+                urls.append(url)
+            else:
+                skipped_files['not_entry'] += 1
+    return urls
+
+
+def timed(func, repeat):
+    """(result, best wall-clock time of `repeat` runs), with stdout discarded"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=100000, help="Lines in the synthetic tree")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per implementation; the fastest is kept")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    with scratch_root() as root_dir:
+        with open(os.path.join(root_dir, 'tree.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(synthetic_tree(args.lines)) + '\n')
+        scraper = DiscoverJesusScraper(root_dir=root_dir)
+
+        legacy, legacy_time = timed(lambda: legacy_extract(scraper, os.path.join(root_dir, 'tree.txt')), args.repeat)
+        verbose, verbose_time = timed(lambda: scraper.extract_urls_from_tree('tree.txt'), args.repeat)
+        quiet, quiet_time = timed(lambda: list(scraper.iter_tree_urls('tree.txt')), args.repeat)
+        skipped = dict(scraper.resolver.counts)
+
+    # The resolver only drops repeats; order of first occurrence is unchanged
+    matches = list(dict.fromkeys(legacy)) == verbose == quiet
+    results = {
+        'lines': args.lines,
+        'legacy': {'seconds': round(legacy_time, 3), 'urls': len(legacy)},
+        'resolver_verbose': {'seconds': round(verbose_time, 3), 'urls': len(verbose)},
+        'resolver_quiet': {'seconds': round(quiet_time, 3), 'urls': len(quiet)},
+        'counts': skipped,
+        'same_urls_after_dedup': matches,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.lines} lines")
+    for name in ('legacy', 'resolver_verbose', 'resolver_quiet'):
+        print(f"{name:>17}: {results[name]['seconds']:>7.3f}s, {results[name]['urls']} URLs")
+    print(f"{'counts':>17}: {skipped}")
+    print(f"{'same URLs':>17}: {matches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Shared helpers for the scraper benchmarks"""
+import contextlib
+import os
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarks run as scripts, so make the scraper modules importable
+if SCRAPER_DIR not in sys.path:
+    sys.path.insert(0, SCRAPER_DIR)
+
+
+@contextlib.contextmanager
+def scratch_root():
+    """Temporary root_dir (and cwd) so a benchmark run never touches the real scraper output"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.chdir(root_dir)
+        try:
+            yield root_dir
+        finally:
+            os.chdir(previous)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
@@ -0,0 +1,396 @@
+"""
+Capture archive of the pages a run fetched, for debugging and offline replay.
+
+Responses are stored as WARC/1.1 `response` records (WARC headers, then the HTTP
+status line, headers and body). Each record is its own gzip member, so an
+archive file is also a plain multi-member .warc.gz that WARC tools can read.
+Records are keyed by the full requested URL, so pages of different categories
+that share a slug no longer overwrite each other.
+
+- CaptureWriter: add() only queues a response. A writer thread compresses the
+  queued ones and appends them to captures-<n>.warc.gz in batches, then appends
+  their (url, file, offset, length) lines to index.jsonl. A new archive file is
+  started by every run and whenever the current one reaches max_bytes.
+- CaptureReader: loads index.jsonl (rebuilt by scanning the archives when it is
+  missing) and reads any page with one seek and one gzip member. It has the
+  urls() / get(url).to_response() interface of http_cache.ResponseCache, so
+  --reextract can replay an archive instead of the response cache.
+
+Bodies are stored decoded (requests has already undone any Content-Encoding),
+so Content-Encoding and Transfer-Encoding are dropped from the stored headers
+and Content-Length is set to the stored body.
+
+    python capture.py list
+    python capture.py show https://discoverjesus.com/person/mary-mother-of-jesus
+    python capture.py export /tmp/captured-pages
+    python capture.py --dir /path/to/captures list
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import uuid
+import zlib
+from urllib.parse import urlparse
+
+import requests
+
+INDEX_FILE = 'index.jsonl'
+ARCHIVE_PATTERN = 'captures-{:05d}.warc.gz'
+ARCHIVE_RE = re.compile(r'^captures-(\d{5})\.warc\.gz$')
+# Stored bodies are decoded, so these no longer describe them
+DROPPED_HEADERS = frozenset(('content-encoding', 'transfer-encoding', 'content-length'))
+
+_CLOSE = object()
+
+
+class Capture:
+    """One captured response"""
+
+    def __init__(self, url, final_url, status, reason, headers, body, date):
+        self.url = url
+        self.final_url = final_url
+        self.status = status
+        self.reason = reason
+        # [(name, value)] in the order the server sent them
+        self.headers = headers
+        self.body = body
+        self.date = date
+
+    @classmethod
+    def from_response(cls, url, response):
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name.lower() not in DROPPED_HEADERS]
+        headers.append(('Content-Length', str(len(response.content))))
+        return cls(url, response.url or url, response.status_code, response.reason or '', headers,
+                   response.content, datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+
+    def header(self, name, default=None):
+        name = name.lower()
+        return next((value for key, value in self.headers if key.lower() == name), default)
+
+    @property
+    def encoding(self):
+        match = re.search(r'charset=([\w.-]+)', self.header('Content-Type', ''), re.I)
+        return match.group(1) if match else 'utf-8'
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding, errors='replace')
+
+    def to_response(self):
+        """Rebuild a requests.Response, like a ResponseCache entry does"""
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = self.reason
+        response.url = self.final_url
+        response._content = self.body
+        response.encoding = self.encoding
+        response.headers.update(self.headers)
+        response.from_cache = True
+        return response
+
+    def to_record(self):
+        """The uncompressed WARC record"""
+        http = [f"HTTP/1.1 {self.status} {self.reason}".rstrip()]
+        http += [f"{name}: {value}" for name, value in self.headers]
+        block = ('\r\n'.join(http) + '\r\n\r\n').encode('utf-8') + self.body
+        warc = [
+            'WARC/1.1',
+            'WARC-Type: response',
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {self.date}",
+            f"WARC-Target-URI: {self.url}",
+        ]
+        if self.final_url != self.url:
+            # Extension field: where redirects ended up
+            warc.append(f"WARC-X-Final-URI: {self.final_url}")
+        warc += ['Content-Type: application/http;msgtype=response', f"Content-Length: {len(block)}"]
+        return ('\r\n'.join(warc) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+    @classmethod
+    def from_record(cls, data):
+        """Parse an uncompressed WARC response record"""
+        head, _, rest = data.partition(b'\r\n\r\n')
+        fields = _parse_headers(head.decode('utf-8').split('\r\n')[1:])
+        block = rest[:int(fields['content-length'])]
+        http_head, _, body = block.partition(b'\r\n\r\n')
+        lines = http_head.decode('utf-8', errors='replace').split('\r\n')
+        _, status, *reason = lines[0].split(' ', 2)
+        headers = [tuple(part.strip() for part in line.split(':', 1)) for line in lines[1:] if ':' in line]
+        url = fields['warc-target-uri']
+        return cls(url, fields.get('warc-x-final-uri', url), int(status), reason[0] if reason else '',
+                   headers, body, fields.get('warc-date'))
+
+
+def _parse_headers(lines):
+    fields = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        fields[name.strip().lower()] = value.strip()
+    return fields
+
+
+def read_members(data):
+    """(offset, length, uncompressed bytes) of each complete gzip member of an archive file"""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        parts = []
+        position = offset
+        # Fed in chunks so only the last one is copied into unused_data
+        while not decompressor.eof and position < len(data):
+            chunk = view[position:position + 65536]
+            parts.append(decompressor.decompress(chunk))
+            position += len(chunk)
+        if not decompressor.eof:
+            # A record cut short by a crash
+            return
+        end = position - len(decompressor.unused_data)
+        yield offset, end - offset, b''.join(parts)
+        offset = end
+
+
+def archive_files(capture_dir):
+    """The archive file names in a capture directory, oldest first"""
+    if not os.path.isdir(capture_dir):
+        return []
+    return sorted(name for name in os.listdir(capture_dir) if ARCHIVE_RE.match(name))
+
+
+def index_entry(capture, name, offset, length):
+    return {'url': capture.url, 'file': name, 'offset': offset, 'length': length,
+            'status': capture.status, 'date': capture.date}
+
+
+class CaptureWriter:
+    """
+    Appends responses to the archive from a writer thread. add() blocks only
+    when `queue_size` responses are already waiting; `batch_size` records at
+    most go out per write. Use as a context manager, or close() it: that
+    writes whatever is queued and raises the writer thread's error, if any.
+    """
+
+    def __init__(self, capture_dir, max_bytes=64 * 1024 * 1024, batch_size=32, queue_size=256, compresslevel=6):
+        self.capture_dir = capture_dir
+        self.max_bytes = max_bytes
+        self.batch_size = max(1, batch_size)
+        self.compresslevel = compresslevel
+        os.makedirs(capture_dir, exist_ok=True)
+        existing = archive_files(capture_dir)
+        # Every run starts a file of its own, so a run that died mid-write never shares one
+        self._number = int(ARCHIVE_RE.match(existing[-1]).group(1)) + 1 if existing else 0
+        self._archive = None
+        self._index = open(os.path.join(capture_dir, INDEX_FILE), 'a', encoding='utf-8')
+        self.records = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.files = []
+        self.error = None
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, url, response):
+        """Queue a response fetched for `url`"""
+        self._queue.put(Capture.from_response(url, response))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not _CLOSE:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch and self.error is None:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Keep draining the queue so add() never blocks; close() raises this
+                    self.error = e
+            if item is _CLOSE:
+                return
+
+    def _open_archive(self):
+        name = ARCHIVE_PATTERN.format(self._number)
+        self._number += 1
+        self._archive = open(os.path.join(self.capture_dir, name), 'ab')
+        self.files.append(name)
+        return name
+
+    def _write(self, batch):
+        if self._archive is None or self._archive.tell() >= self.max_bytes:
+            if self._archive is not None:
+                self._archive.close()
+            self._open_archive()
+        name = self.files[-1]
+        offset = self._archive.tell()
+        chunks = []
+        lines = []
+        for capture in batch:
+            record = capture.to_record()
+            member = gzip.compress(record, compresslevel=self.compresslevel)
+            chunks.append(member)
+            lines.append(json.dumps(index_entry(capture, name, offset, len(member))))
+            offset += len(member)
+            self.raw_bytes += len(record)
+            self.stored_bytes += len(member)
+        self._archive.write(b''.join(chunks))
+        self._archive.flush()
+        # The index only ever points at records already written
+        self._index.write('\n'.join(lines) + '\n')
+        self._index.flush()
+        self.records += len(batch)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        if self._archive is not None:
+            self._archive.close()
+        self._index.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __str__(self):
+        ratio = self.raw_bytes / self.stored_bytes if self.stored_bytes else 0
+        return (f"{self.records} pages in {len(self.files)} archive file(s), "
+                f"{self.stored_bytes / 1e6:.1f} MB ({ratio:.1f}x compressed)")
+
+
+class CaptureReader:
+    """URL -> latest capture of it, read on demand from the archive files"""
+
+    def __init__(self, capture_dir):
+        self.capture_dir = capture_dir
+        # url -> index.jsonl entry of its latest capture (file, offset, length, status, date)
+        self.index = {}
+        index_path = os.path.join(capture_dir, INDEX_FILE)
+        if os.path.exists(index_path):
+            self._load_index(index_path)
+        else:
+            self.rebuild()
+
+    def _load_index(self, index_path):
+        sizes = {}
+        with open(index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                if entry['file'] not in sizes:
+                    path = os.path.join(self.capture_dir, entry['file'])
+                    sizes[entry['file']] = os.path.getsize(path) if os.path.exists(path) else 0
+                if entry['offset'] + entry['length'] > sizes[entry['file']]:
+                    # Indexed, but the archive lost the record (it was not synced before a crash)
+                    continue
+                self.index[entry['url']] = entry
+
+    def rebuild(self):
+        """Scan every archive file for its records and write index.jsonl again"""
+        self.index = {}
+        lines = []
+        for name in archive_files(self.capture_dir):
+            with open(os.path.join(self.capture_dir, name), 'rb') as f:
+                data = f.read()
+            try:
+                for offset, length, record in read_members(data):
+                    entry = index_entry(Capture.from_record(record), name, offset, length)
+                    self.index[entry['url']] = entry
+                    lines.append(json.dumps(entry))
+            except zlib.error:
+                # Damaged from here on: keep the records before it
+                pass
+        if os.path.isdir(self.capture_dir):
+            with open(os.path.join(self.capture_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+                f.write(''.join(line + '\n' for line in lines))
+
+    def urls(self):
+        """Every captured URL, sorted"""
+        return sorted(self.index)
+
+    def get(self, url):
+        """Return the latest Capture of a URL, or None"""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        with open(os.path.join(self.capture_dir, entry['file']), 'rb') as f:
+            f.seek(entry['offset'])
+            return Capture.from_record(gzip.decompress(f.read(entry['length'])))
+
+    def __iter__(self):
+        """Captures in URL order"""
+        for url in self.urls():
+            yield self.get(url)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+
+def export(reader, out_dir):
+    """Write every capture to out_dir as <category>/<slug>.html; returns how many were written"""
+    count = 0
+    for capture in reader:
+        path = '/'.join(part for part in urlparse(capture.url).path.split('/') if part) or 'index'
+        target = os.path.join(out_dir, f"{path}.html")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(capture.text)
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'captures'),
+                        help="Capture directory (default: scraper/captures)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Print every captured URL with its status and date")
+    show = commands.add_parser('show', help="Print the body of a captured URL")
+    show.add_argument('url')
+    out = commands.add_parser('export', help="Write every capture as <category>/<slug>.html")
+    out.add_argument('out_dir')
+    commands.add_parser('reindex', help="Rebuild index.jsonl by scanning the archive files")
+    args = parser.parse_args(argv)
+
+    reader = CaptureReader(args.dir)
+    if args.command == 'list':
+        for url in reader.urls():
+            entry = reader.index[url]
+            print(f"{entry['status']} {entry['date']} {url}")
+    elif args.command == 'show':
+        capture = reader.get(args.url)
+        if capture is None:
+            parser.exit(1, f"{args.url} is not in {args.dir}\n")
+        print(capture.text)
+    elif args.command == 'export':
+        print(f"Exported {export(reader, args.out_dir)} pages to {args.out_dir}")
+    else:
+        reader.rebuild()
+        print(f"Indexed {len(reader)} pages in {len(archive_files(args.dir))} archive file(s)")
+
+
+if __name__ == '__main__':
+    main()
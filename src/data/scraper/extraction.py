@@ -0,0 +1,234 @@
+"""
+Declarative field extraction: a page's fields are described as data (ordered
+selectors and post-processors per field), compiled once, and all of them are
+read in a single traversal of the parsed document, however many there are.
+
+- Selector: matches an element by tag name, exact class, class substring and
+  attributes. It can carry its own post-processor, e.g. a fallback selector that
+  joins the first paragraphs of a content area where the primary one reads text.
+- Field: ordered selectors. A single-valued field takes the value of the first
+  selector (in spec order) whose first match (in document order) gives a
+  non-empty value, which is exactly what a chain of soup.find() fallbacks
+  returns. A `many` field collects every match of every selector in document
+  order, optionally only inside `within` elements.
+
+Post-processors are called as process(node, url) with the page URL, so links
+can be resolved against it.
+"""
+import re
+from collections import defaultdict
+from urllib.parse import urljoin, urlparse
+
+from bs4 import SoupStrainer, Tag
+
+PRIMARY = 'primary'
+FALLBACK = 'fallback'
+FOUND = 'found'
+MISSING = 'missing'
+
+
+def text(node, url=None):
+    return node.text.strip()
+
+
+def paragraphs(limit):
+    """Post-processor joining the text of the first `limit` paragraphs of a node"""
+    def process(node, url=None):
+        return '\n'.join(p.text.strip() for p in node.find_all('p', limit=limit))
+    return process
+
+
+def attr(name, absolute=False):
+    """Post-processor reading an attribute, optionally resolved against the page URL"""
+    def process(node, url=None):
+        value = (node.get(name) or '').strip()
+        return urljoin(url, value) if value and absolute and url else value
+    return process
+
+
+class Selector:
+    """
+    Element test: `tags` (a name or a tuple of names, None for any), an exact
+    `css_class`, `class_contains` words (case-insensitive substrings of any
+    class) and `attrs` ({name: True for presence, a string for equality, or a
+    compiled regex searched in the value})
+    """
+
+    def __init__(self, tags=None, css_class=None, class_contains=(), attrs=None, process=None):
+        self.tags = (tags,) if isinstance(tags, str) else tags
+        self.css_class = css_class
+        self.class_contains = tuple(word.lower() for word in class_contains)
+        self.attrs = dict(attrs or {})
+        self.process = process
+
+    def matches(self, name, attributes):
+        if self.tags is not None and name not in self.tags:
+            return False
+        if self.css_class is not None or self.class_contains:
+            classes = attributes.get('class') or ()
+            if isinstance(classes, str):
+                classes = classes.split()
+            if self.css_class is not None and self.css_class not in classes:
+                return False
+            if self.class_contains and not any(
+                    word in css_class.lower() for css_class in classes for word in self.class_contains):
+                return False
+        for key, expected in self.attrs.items():
+            value = attributes.get(key)
+            if value is None:
+                return False
+            if isinstance(value, list):
+                value = ' '.join(value)
+            if expected is True:
+                continue
+            if isinstance(expected, str):
+                if value != expected:
+                    return False
+            elif not expected.search(value):
+                return False
+        return True
+
+
+class Field:
+    """
+    One output field: ordered `selectors`, the default post-processor `process`
+    (a selector's own one wins), `many` to collect every match (deduplicated,
+    at most `limit`), `within` selectors restricting matches to their
+    descendants, and `required` for the fields a page is not complete without
+    """
+
+    def __init__(self, name, selectors, process=text, many=False, within=(), limit=None, required=False):
+        self.name = name
+        self.selectors = tuple(selectors)
+        self.process = process
+        self.many = many
+        self.within = tuple(within)
+        self.limit = limit
+        self.required = required
+
+
+class Extractor:
+    """A compiled list of Fields"""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        names = [field.name for field in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate field names in extraction spec: {names}")
+        # tag name -> [(field number, selector number, selector)]; None holds the any-tag selectors
+        self._by_tag = defaultdict(list)
+        # [(field number, selector)] of the `within` selectors
+        self._scopes = []
+        # Selectors a SoupStrainer keeps: the primary selector of each required
+        # field, every selector of the other fields without a scope, and the scopes.
+        # A required field's fallbacks are left out: they tend to match large
+        # containers, and a page that needs them is parsed again in full
+        self._strained = []
+        for number, field in enumerate(self.fields):
+            for position, selector in enumerate(field.selectors):
+                for tag in selector.tags or (None,):
+                    self._by_tag[tag].append((number, position, selector))
+                if (position == 0 or not field.required) and not field.within:
+                    self._strained.append(selector)
+            for selector in field.within:
+                self._scopes.append((number, selector))
+                self._strained.append(selector)
+        self.strainer = SoupStrainer(self._keep)
+
+    def _keep(self, name, attrs):
+        return any(selector.matches(name, attrs) for selector in self._strained)
+
+    def _candidates(self, name):
+        named = self._by_tag.get(name, ())
+        unnamed = self._by_tag.get(None, ())
+        return (*named, *unnamed) if unnamed else named
+
+    def extract(self, soup, url=None, primary_only=False):
+        """
+        Read every field in one traversal of `soup`. Returns (values, paths):
+        field name -> value, and field name -> PRIMARY / FALLBACK / MISSING
+        (FOUND / MISSING for `many` fields). With `primary_only`, required fields
+        only use their first selector, for a document parsed with the strainer,
+        which lacks the nodes their fallbacks would search.
+        """
+        count = len(self.fields)
+        # Per single-valued field: selector number -> value of its first match
+        firsts = [{} for _ in range(count)]
+        collected = [[] for _ in range(count)]
+        stack = [(child, frozenset()) for child in reversed(soup.contents)]
+        while stack:
+            node, scopes = stack.pop()
+            if not isinstance(node, Tag):
+                continue
+            name = node.name
+            attributes = node.attrs
+            for number, position, selector in self._candidates(name):
+                field = self.fields[number]
+                if field.within and number not in scopes:
+                    continue
+                if field.many:
+                    if selector.matches(name, attributes):
+                        value = (selector.process or field.process)(node, url)
+                        if isinstance(value, (list, tuple)):
+                            collected[number].extend(value)
+                        elif value:
+                            collected[number].append(value)
+                    continue
+                if position in firsts[number] or (primary_only and position and field.required):
+                    continue
+                if selector.matches(name, attributes):
+                    firsts[number][position] = (selector.process or field.process)(node, url)
+            for number, selector in self._scopes:
+                if number not in scopes and selector.matches(name, attributes):
+                    scopes = scopes | {number}
+            if node.contents:
+                stack.extend((child, scopes) for child in reversed(node.contents))
+
+        values = {}
+        paths = {}
+        for number, field in enumerate(self.fields):
+            if field.many:
+                unique = list(dict.fromkeys(collected[number]))
+                values[field.name] = unique[:field.limit] if field.limit else unique
+                paths[field.name] = FOUND if unique else MISSING
+                continue
+            values[field.name] = None
+            paths[field.name] = MISSING
+            for position in sorted(firsts[number]):
+                if firsts[number][position]:
+                    values[field.name] = firsts[number][position]
+                    paths[field.name] = PRIMARY if position == 0 else FALLBACK
+                    break
+            else:
+                # An element was there but empty: '' rather than None, as soup.find().text gives
+                if firsts[number]:
+                    values[field.name] = ''
+        return values, paths
+
+    def complete(self, paths):
+        """Whether every required field was found by its primary selector"""
+        return all(paths[field.name] == PRIMARY for field in self.fields if field.required)
+
+
+def entry_link(categories, exclude_self=True):
+    """
+    Post-processor turning an <a href> to an entry of the same site into
+    'category/slug' (None for any other link)
+    """
+    pattern = re.compile(rf"^/({'|'.join(categories)})/([a-z0-9-]+)/?$")
+
+    def process(node, url=None):
+        href = (node.get('href') or '').strip()
+        if not href:
+            return None
+        target = urlparse(urljoin(url or '', href))
+        if url and target.netloc and target.netloc != urlparse(url).netloc:
+            return None
+        match = pattern.match(target.path)
+        if not match:
+            return None
+        path = f"{match.group(1)}/{match.group(2)}"
+        if exclude_self and url and urlparse(url).path.strip('/') == path:
+            return None
+        return path
+    return process
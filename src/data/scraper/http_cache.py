@@ -0,0 +1,206 @@
+"""
+Persistent HTTP response cache for the scraper.
+
+Bodies are stored zlib-compressed in a single SQLite file together with the
+ETag / Last-Modified validators the server sent, so later runs can revalidate
+with If-None-Match / If-Modified-Since and reuse the cached copy on a 304.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+import requests
+
+
+class CacheMiss(requests.RequestException):
+    """Raised in offline mode when a URL has never been cached"""
+
+
+class CachedResponse:
+    """A cache row, decompressed on demand"""
+
+    def __init__(self, url, final_url, body, etag, last_modified, encoding, stored_at):
+        self.url = url
+        self.final_url = final_url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.encoding = encoding
+        self.stored_at = stored_at
+
+    @property
+    def content(self):
+        return zlib.decompress(self.body)
+
+    def to_response(self):
+        """Rebuild a requests.Response so callers can treat a cache hit like a fresh 200"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK (cached)'
+        response.url = self.final_url
+        response._content = self.content
+        response.encoding = self.encoding or 'utf-8'
+        if self.etag:
+            response.headers['ETag'] = self.etag
+        if self.last_modified:
+            response.headers['Last-Modified'] = self.last_modified
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """
+    URL-keyed on-disk response cache with conditional revalidation.
+
+    Entries not stored or revalidated within `max_age` seconds are evicted, and
+    once the compressed bodies exceed `max_bytes` the least recently used
+    entries go first. In offline mode only cached responses are served.
+    """
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, max_age=30 * 24 * 3600, offline=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Scraper workers share the connection, so every access goes through the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                encoding TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+        if not offline:
+            self.prune()
+
+    def get(self, url):
+        """Return the CachedResponse for a URL, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, final_url, body, etag, last_modified, encoding, stored_at "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return CachedResponse(*row)
+
+    @staticmethod
+    def conditional_headers(entry):
+        """If-None-Match / If-Modified-Since headers for revalidating a cached entry"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url, response):
+        """Store a 200 response for a URL"""
+        body = zlib.compress(response.content)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, final_url, body, size, etag, last_modified, encoding, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.url, body, len(body), response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), response.encoding, now, now),
+            )
+            self._db.commit()
+
+    def touch(self, url):
+        """Mark a cached entry as revalidated (the server answered 304)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._db.commit()
+
+    def fetch(self, session, url, **kwargs):
+        """
+        GET a URL through the cache. Returns a requests.Response; cache hits and
+        304 revalidations come back as a rebuilt 200 with `from_cache` set.
+        """
+        entry = self.get(url)
+        if self.offline:
+            if entry is None:
+                self._count('miss')
+                raise CacheMiss(f"{url} is not in the response cache (offline mode)")
+            self._count('hit')
+            return entry.to_response()
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            self.touch(url)
+            return entry.to_response()
+
+        self._count('miss')
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def urls(self):
+        """Every cached URL, sorted"""
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT url FROM responses ORDER BY url")]
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def prune(self):
+        """Evict expired entries, then least recently used ones until under max_bytes"""
+        evicted = 0
+        with self._lock:
+            if self.max_age:
+                cursor = self._db.execute(
+                    "DELETE FROM responses WHERE stored_at < ?", (time.time() - self.max_age,)
+                )
+                evicted += cursor.rowcount
+            if self.max_bytes:
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    rows = self._db.execute(
+                        "SELECT url, size FROM responses ORDER BY accessed_at ASC"
+                    ).fetchall()
+                    for url, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                        total -= size
+                        evicted += 1
+            self._db.commit()
+        self._count('evicted', evicted)
+        return evicted
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def close(self):
+        if not self.offline:
+            self.prune()
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,70 @@
+"""
+Logging for scraper runs. The scraper's threads only put records on a queue; a
+QueueListener thread formats them and writes them to the terminal and the run's
+log file, so terminal and disk I/O never hold up a fetch or a parse.
+
+Levels:
+- INFO (the default): what a run did, i.e. counts, files written, redirects,
+  retries and anything that went wrong
+- DEBUG: per-URL detail, i.e. every fetch attempt, tree entry, selector path
+  and extracted field (including the full summary text)
+
+Hot-path calls pass %-style arguments rather than f-strings, so a DEBUG line
+that is switched off costs a level check and nothing else.
+"""
+import logging
+import logging.handlers
+import queue
+
+FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+
+class QueuedLogging:
+    """
+    Context manager routing the root logger through a queue to a StreamHandler
+    (and a FileHandler for `log_file`) served by a QueueListener thread.
+    Whatever is still queued is written out on exit.
+    """
+
+    def __init__(self, level=logging.INFO, log_file=None, stream=None):
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+        self.handlers = [logging.StreamHandler(stream)]
+        if log_file:
+            self.handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+        formatter = logging.Formatter(FORMAT)
+        for handler in self.handlers:
+            handler.setFormatter(formatter)
+        self.records = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.records, *self.handlers, respect_handler_level=True)
+        self._saved = None
+
+    def __enter__(self):
+        root = logging.getLogger()
+        self._saved = (root.handlers[:], root.level)
+        root.handlers = [logging.handlers.QueueHandler(self.records)]
+        root.setLevel(self.level)
+        self.listener.start()
+        return self
+
+    def __exit__(self, *exc):
+        root = logging.getLogger()
+        root.handlers, level = self._saved
+        root.setLevel(level)
+        # Drains the queue before the handlers are closed
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+        return False
+
+
+def worker_logging(level):
+    """
+    Process-pool initializer: a forked worker inherits the parent's QueueHandler,
+    whose queue nobody reads in the child, so log straight to stderr instead
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
@@ -0,0 +1,395 @@
+"""
+Output files of a scrape: the raw summaries JSON and the TypeScript module read
+by the React app.
+
+The writers take one summary at a time, so a streaming scrape never holds more
+than the summary it is writing. Each file is written next to its final path and
+renamed into place when the writer closes without an error, so a run that dies
+half way leaves the previous output untouched.
+
+The TypeScript module is emitted with its entries sorted by id, so its bytes
+only depend on the summaries themselves. When the new content hashes the same
+as the existing file, the file is left alone (its mtime does not change, so
+Vite has nothing to rebuild), and every write produces a ChangeReport listing
+the ids that were added, removed or modified.
+
+For pages that only need a few summaries, BundleWriter also splits them into
+compact per-category (or hash-bucketed) JSON bundles with a manifest mapping
+each id to its bundle, which the app's discoverJesusLoader fetches lazily.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+
+from sharding import shard_of
+
+TS_HEADER = """// Auto-generated from Python scraper
+export interface DiscoverJesusSummary {
+  id: string;
+  shortSummary: string;
+  fullSummary: string;
+}
+
+export const discoverJesusSummaries: Record<string, DiscoverJesusSummary> = """
+
+
+def has_content(summary):
+    """Only entries with a summary make it into the TypeScript module"""
+    return bool(summary["shortSummary"] or summary["fullSummary"])
+
+
+def ts_record(summary):
+    """The fields of a summary the React app reads"""
+    return {
+        "id": summary["id"],
+        "shortSummary": summary["shortSummary"],
+        "fullSummary": summary["fullSummary"]
+    }
+
+
+def _dumps_nested(value):
+    """json.dumps(value, indent=2) as it appears one level deep inside a container"""
+    return json.dumps(value, indent=2).replace('\n', '\n  ')
+
+
+def _file_digest(path):
+    """SHA-256 of a file, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _entry_digest(text):
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def read_ts_entries(path):
+    """
+    Yield (id, record) for each entry of an existing discoverJesusSummaries.ts,
+    one entry at a time. Yields nothing if the file does not exist.
+    """
+    try:
+        f = open(path, encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        key = None
+        body = []
+        for line in f:
+            line = line.rstrip('\n')
+            if key is None:
+                # Entries open at two spaces of indentation: `  "category/slug": {`
+                if line.startswith('  "') and line.endswith(': {'):
+                    key = json.loads(line[2:-3])
+                    body = ['{']
+            elif line in ('  }', '  },'):
+                body.append('}')
+                yield key, json.loads('\n'.join(body))
+                key = None
+            else:
+                body.append(line)
+
+
+class ChangeReport:
+    """Entry ids added, removed and modified by a TypeScript write"""
+
+    def __init__(self, added=(), removed=(), modified=(), unchanged=0, written=False):
+        self.added = sorted(added)
+        self.removed = sorted(removed)
+        self.modified = sorted(modified)
+        self.unchanged = unchanged
+        # False when the new content was identical and the file was left alone
+        self.written = written
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def to_dict(self):
+        return {
+            'written': self.written,
+            'added': self.added,
+            'removed': self.removed,
+            'modified': self.modified,
+            'unchanged': self.unchanged,
+        }
+
+    def __str__(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.modified)} modified, "
+                f"{self.unchanged} unchanged")
+
+
+class _StreamWriter(ABC):
+    """Writes to `path`.tmp and renames it over `path` on a clean close"""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self.count = 0
+
+    @abstractmethod
+    def _finish(self):
+        """Write whatever closes the file (the end of the array or module)"""
+
+    def close(self):
+        self._finish()
+        self._file.close()
+        self._install()
+
+    def _install(self):
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class JsonArrayWriter(_StreamWriter):
+    """A JSON array written one element at a time, formatted like json.dump(items, f, indent=2)"""
+
+    def write(self, item):
+        self._file.write('[\n  ' if self.count == 0 else ',\n  ')
+        self._file.write(_dumps_nested(item))
+        self.count += 1
+
+    def _finish(self):
+        self._file.write('\n]' if self.count else '[]')
+
+
+class TypeScriptWriter(_StreamWriter):
+    """
+    The discoverJesusSummaries.ts module, fed one summary at a time. Summaries
+    without content are skipped and a repeated id keeps its last summary, like
+    building the dict in one go. Serialized entries are spooled to a temporary
+    file and only their ids and offsets stay in memory until close() writes
+    them out in id order, compares the result with the existing file and sets
+    `report`.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._spool = tempfile.TemporaryFile()
+        # id -> (offset, length) of its serialized entry in the spool
+        self._entries = {}
+        self.report = None
+
+    def write(self, summary):
+        if not has_content(summary):
+            return
+        data = _dumps_nested(ts_record(summary)).encode('utf-8')
+        self._spool.seek(0, os.SEEK_END)
+        self._entries[summary["id"]] = (self._spool.tell(), len(data))
+        self._spool.write(data)
+
+    def _finish(self):
+        old_digests = self._old_digests()
+        added, modified = [], []
+        unchanged = 0
+        self._file.write(TS_HEADER)
+        for entry_id in sorted(self._entries):
+            offset, length = self._entries[entry_id]
+            self._spool.seek(offset)
+            text = self._spool.read(length).decode('utf-8')
+            self._file.write('{\n  ' if self.count == 0 else ',\n  ')
+            self._file.write(f'{json.dumps(entry_id)}: {text}')
+            self.count += 1
+
+            old = old_digests.pop(entry_id, None)
+            if old is None:
+                added.append(entry_id)
+            elif old != _entry_digest(text):
+                modified.append(entry_id)
+            else:
+                unchanged += 1
+        self._file.write('\n}' if self.count else '{}')
+        self._file.write(";\n")
+        self._spool.close()
+        self.report = ChangeReport(added, old_digests, modified, unchanged)
+
+    def _old_digests(self):
+        """id -> digest of each entry of the existing file, re-serialized the way this writer would"""
+        try:
+            return {
+                entry_id: _entry_digest(_dumps_nested(record))
+                for entry_id, record in read_ts_entries(self.path)
+            }
+        except ValueError:
+            # Not in the generated layout (edited by hand?): report every entry as added
+            return {}
+
+    def _install(self):
+        if _file_digest(self._tmp_path) == _file_digest(self.path):
+            os.remove(self._tmp_path)
+            return
+        super()._install()
+        self.report.written = True
+
+    def discard(self):
+        self._spool.close()
+        super().discard()
+
+
+BUNDLE_STRATEGIES = ('category', 'hash')
+BUNDLE_MANIFEST = 'manifest.json'
+# <name>.<content hash>.json: the name changes whenever the content does, so
+# bundles (and search index shards) can be served with a long cache lifetime
+_BUNDLE_FILE = re.compile(r'^[a-z0-9-]+\.[0-9a-f]{10}\.json$')
+
+
+def bundle_of(entry_id, strategy='category', buckets=16):
+    """Name of the bundle an id goes to: its category, or a stable hash bucket"""
+    if strategy == 'hash':
+        return f"bucket-{shard_of(entry_id, buckets):02d}"
+    category, _, slug = entry_id.partition('/')
+    return category if slug and category else 'misc'
+
+
+def compact_json(value):
+    """Minified JSON, non-ASCII characters kept as UTF-8"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _write_bytes(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_content_addressed(out_dir, name, data):
+    """
+    Write bytes to out_dir as <name>.<content hash>.json, unless that file is
+    already there; returns (file name, whether it was written)
+    """
+    file_name = f"{name}.{hashlib.sha256(data).hexdigest()[:10]}.json"
+    path = os.path.join(out_dir, file_name)
+    if os.path.exists(path):
+        return file_name, False
+    _write_bytes(path, data)
+    return file_name, True
+
+
+def write_if_changed(path, data):
+    """Write bytes to path atomically unless it already holds them; returns whether it was written"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    _write_bytes(path, data)
+    return True
+
+
+def remove_stale(out_dir, keep):
+    """Remove the content-addressed files of out_dir not in `keep`; returns their names"""
+    removed = []
+    for path in sorted(glob.glob(os.path.join(out_dir, '*.json'))):
+        file_name = os.path.basename(path)
+        if _BUNDLE_FILE.match(file_name) and file_name not in keep:
+            os.remove(path)
+            removed.append(file_name)
+    return removed
+
+
+class BundleWriter:
+    """
+    Lazy-loading bundles of the summaries, fed one summary at a time like
+    TypeScriptWriter (same filtering, last duplicate wins, entries spooled to a
+    temporary file). close() writes one compact JSON object per bundle, keyed by
+    id in id order without the redundant id field, then manifest.json, then
+    removes bundle files the new manifest no longer names. Bundles whose content
+    did not change keep their file name and are not rewritten.
+    """
+
+    def __init__(self, out_dir, strategy='category', buckets=16):
+        if strategy not in BUNDLE_STRATEGIES:
+            raise ValueError(f"Unknown bundle strategy '{strategy}' (expected one of {', '.join(BUNDLE_STRATEGIES)})")
+        self.out_dir = out_dir
+        self.strategy = strategy
+        self.buckets = max(1, buckets)
+        self._spool = tempfile.TemporaryFile()
+        # id -> (offset, length) of its serialized record in the spool
+        self._entries = {}
+        self.manifest = None
+        # Bundle files written by close(); the others were already up to date
+        self.written = []
+        self.removed = []
+
+    def write(self, summary):
+        if not has_content(summary):
+            return
+        record = ts_record(summary)
+        del record["id"]
+        data = compact_json(record).encode('utf-8')
+        self._spool.seek(0, os.SEEK_END)
+        self._entries[summary["id"]] = (self._spool.tell(), len(data))
+        self._spool.write(data)
+
+    def close(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        groups = {}
+        for entry_id in sorted(self._entries):
+            groups.setdefault(bundle_of(entry_id, self.strategy, self.buckets), []).append(entry_id)
+
+        bundles = []
+        ids = {}
+        for position, name in enumerate(sorted(groups)):
+            data = self._bundle_bytes(groups[name])
+            file_name, written = write_content_addressed(self.out_dir, name, data)
+            if written:
+                self.written.append(file_name)
+            bundles.append({'name': name, 'file': file_name, 'count': len(groups[name]), 'bytes': len(data)})
+            for entry_id in groups[name]:
+                ids[entry_id] = position
+        self._spool.close()
+
+        self.manifest = {'version': 1, 'strategy': self.strategy, 'bundles': bundles, 'ids': ids}
+        write_if_changed(os.path.join(self.out_dir, BUNDLE_MANIFEST), compact_json(self.manifest).encode('utf-8'))
+        # Only once the new manifest is in place, so a reader never sees a manifest
+        # pointing at a missing bundle
+        self.removed = remove_stale(self.out_dir, {bundle['file'] for bundle in bundles})
+
+    def _bundle_bytes(self, entry_ids):
+        parts = []
+        for entry_id in entry_ids:
+            offset, length = self._entries[entry_id]
+            self._spool.seek(offset)
+            parts.append(f'{compact_json(entry_id)}:{self._spool.read(length).decode("utf-8")}')
+        return ('{' + ','.join(parts) + '}').encode('utf-8')
+
+    def discard(self):
+        self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __str__(self):
+        return (f"{len(self.manifest['bundles'])} bundles ({self.strategy}), {len(self.manifest['ids'])} entries, "
+                f"{len(self.written)} written, {len(self.removed)} removed")
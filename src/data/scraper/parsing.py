@@ -0,0 +1,153 @@
+"""
+Summary extraction from DiscoverJesus page HTML.
+
+The fields of a page are declared in SUMMARY_FIELDS (see extraction.py) and
+compiled once into SUMMARY_EXTRACTOR, which reads all of them in one traversal
+of the document. A new field is one more entry there; re-running extraction on
+the pages in the response cache (scrape_discover_jesus.py --reextract) fills it
+in without any request.
+
+Three parsing engines are available:
+- 'html.parser': full parse with Python's built-in parser (the original behaviour)
+- 'lxml':        full parse with lxml (needs `pip install lxml`)
+- 'strainer':    html.parser limited by a SoupStrainer to the nodes the fields
+                 read (for title and summaries, only their primary selectors)
+
+The fallback selectors need the whole document, so with 'strainer' a full
+parse only happens for pages where a primary selector missed.
+"""
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+from extraction import FALLBACK, Extractor, Field, Selector, attr, entry_link, paragraphs
+
+PARSER_ENGINES = ('html.parser', 'lxml', 'strainer')
+
+# Entry categories of the site, as in tree_resolver
+ENTRY_CATEGORIES = ('person', 'event', 'topic', 'group', 'relationship', 'object')
+
+# Urantia Book citations: "139:2.1" (paper:section.paragraph) and "Paper 139"
+_UB_CITATION = re.compile(r'\b(\d{1,3}):(\d{1,2})\.(\d{1,3})\b')
+_UB_PAPER = re.compile(r'\bPapers?\s+(\d{1,3})\b')
+_UB_PAPER_LINK = re.compile(r'paper-(\d{1,3})\b')
+_UB_PAPERS = 196
+
+
+def urantia_references(node, url=None):
+    """Urantia Book citations in the text of a node, as '139:2.1' or '139' (a whole paper)"""
+    text = node.text
+    references = [f"{paper}:{section}.{paragraph}" for paper, section, paragraph in _UB_CITATION.findall(text)
+                  if int(paper) <= _UB_PAPERS]
+    references += [paper for paper in _UB_PAPER.findall(text) if int(paper) <= _UB_PAPERS]
+    return references
+
+
+def urantia_link(node, url=None):
+    """The paper number of a link into an online Urantia Book, as '139'"""
+    match = _UB_PAPER_LINK.search(node.get('href') or '')
+    if match and int(match.group(1)) <= _UB_PAPERS:
+        return match.group(1)
+    return None
+
+
+# Ordered selectors per field. The first three are the original lookups and
+# their fallbacks, which every page needs.
+SUMMARY_FIELDS = (
+    Field('title', [
+        Selector('h1', css_class='entry-title'),
+        Selector('h1'),  # Try any h1
+    ], required=True),
+    Field('shortSummary', [
+        Selector('div', css_class='entry-subtitle'),
+        # A subtitle-like element
+        Selector(('h2', 'div', 'p'), class_contains=('subtitle', 'summary')),
+    ], required=True),
+    Field('fullSummary', [
+        Selector('div', css_class='summary-section'),
+        # The first 3 paragraphs of a main content area
+        Selector(('article', 'main', 'div'), class_contains=('content', 'entry'), process=paragraphs(3)),
+    ], required=True),
+    Field('imageUrl', [
+        Selector('meta', attrs={'property': 'og:image', 'content': True}, process=attr('content', absolute=True)),
+        Selector('img', class_contains=('wp-post-image',), process=attr('src', absolute=True)),
+    ]),
+    Field('urantiaReferences', [
+        Selector('div', css_class='summary-section', process=urantia_references),
+        Selector('a', attrs={'href': re.compile(r'urantia', re.I)}, process=urantia_link),
+    ], many=True),
+    Field('related', [
+        Selector('a', attrs={'href': True}, process=entry_link(ENTRY_CATEGORIES)),
+    ], many=True, within=[
+        Selector('div', css_class='summary-section'),
+        Selector(class_contains=('related',)),
+    ]),
+)
+
+SUMMARY_EXTRACTOR = Extractor(SUMMARY_FIELDS)
+
+
+def check_engine(engine):
+    """Raise ValueError if a parsing engine is unknown or its parser is not installed"""
+    if engine not in PARSER_ENGINES:
+        raise ValueError(f"Unknown parser engine '{engine}' (choose from {', '.join(PARSER_ENGINES)})")
+    if engine == 'lxml':
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise ValueError("The 'lxml' parser engine needs lxml: pip install lxml")
+
+
+def installed_engines():
+    """The engines of PARSER_ENGINES whose parser is installed (lxml is optional)"""
+    engines = []
+    for engine in PARSER_ENGINES:
+        try:
+            check_engine(engine)
+        except ValueError:
+            continue
+        engines.append(engine)
+    return tuple(engines)
+
+
+def make_soup(html, engine='html.parser', extractor=SUMMARY_EXTRACTOR):
+    """Parse HTML with the given engine"""
+    if engine == 'strainer':
+        return BeautifulSoup(html, 'html.parser', parse_only=extractor.strainer)
+    return BeautifulSoup(html, engine)
+
+
+def extract_summary(html, url, engine='html.parser', extractor=SUMMARY_EXTRACTOR):
+    """
+    Extract the summary fields of one page.
+    Returns (summary, selector_paths) where selector_paths maps each field to
+    'primary', 'fallback' or 'missing' ('found' or 'missing' for list fields).
+    """
+    # Get the ID from the URL
+    path_parts = url.split('/')
+    page_id = '/'.join(path_parts[-2:])  # Include category (person/event/etc)
+
+    soup = make_soup(html, engine, extractor)
+    strained = engine == 'strainer'
+    fields, paths = extractor.extract(soup, url, primary_only=strained)
+    # Break the tree's parent/sibling reference cycles now rather than waiting for the cyclic GC
+    soup.decompose()
+    if strained and not extractor.complete(paths):
+        # A primary selector missed: the fallbacks need the whole document
+        soup = make_soup(html, 'html.parser')
+        fields, paths = extractor.extract(soup, url)
+        soup.decompose()
+
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for field in extractor.fields:
+            label = ' (alternative)' if paths[field.name] == FALLBACK else ''
+            logging.debug("%s: found %s%s: %s", page_id, field.name, label, fields[field.name])
+    return _summary(page_id, url, fields), paths
+
+
+def _summary(page_id, url, fields):
+    summary = {"id": page_id}
+    summary.update(fields)
+    summary["sourceUrl"] = url
+    return summary
@@ -0,0 +1,165 @@
+"""
+Staged fetch -> parse -> emit pipeline for large crawls.
+
+- fetch:  a pool of threads download pages (network bound) under a shared rate limit;
+          a retryable failure goes to a deferred retry queue instead of
+          holding the fetcher while it backs off
+- parse:  a ProcessPoolExecutor turns raw HTML bytes into summaries (CPU bound)
+- emit:   a single writer thread checkpoints every outcome, records the parse
+          times measured in the parser processes and collects the summaries
+          that end up in save_to_typescript
+
+Stages are connected by bounded queues, so a slow stage pushes back on the one
+before it instead of letting downloaded pages pile up in memory.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from log_setup import worker_logging
+from parsing import extract_summary
+from rate_limit import DeferredRetryQueue, TokenBucket
+
+_DONE = object()
+
+
+def parse_page(content, url, engine):
+    """Parser-process entry point: (summary, selector paths, parse seconds) for raw HTML bytes"""
+    start = time.perf_counter()
+    summary, paths = extract_summary(content, url, engine=engine)
+    return summary, paths, time.perf_counter() - start
+
+
+class ScrapePipeline:
+    """
+    Backpressure settings:
+    - fetch_queue:   downloaded pages waiting for a parser
+    - parse_backlog: pages submitted to the parser pool but not yet written
+    """
+
+    def __init__(self, scraper, fetchers=4, parse_workers=None, max_rps=None,
+                 fetch_queue=32, parse_backlog=64):
+        self.scraper = scraper
+        self.fetchers = max(1, fetchers)
+        self.parse_workers = parse_workers
+        # The scraper's adaptive controller when it has one, a fixed ceiling otherwise
+        self.limiter = scraper.rate_controller or TokenBucket(max_rps, burst=self.fetchers)
+        self.fetch_queue_size = max(1, fetch_queue)
+        self.parse_backlog = max(1, parse_backlog)
+
+    def run(self, urls):
+        """Scrape `urls`; returns {url: summary with content, or None}"""
+        urls = list(urls)
+        if not urls:
+            return {}
+
+        todo = queue.Queue()
+        for url in urls:
+            todo.put((url, 0))
+        deferred = DeferredRetryQueue()
+        # URLs taken by a fetcher that may still end up in the deferred queue
+        self._in_hand = 0
+        self._in_hand_lock = threading.Lock()
+        fetched = queue.Queue(maxsize=self.fetch_queue_size)
+        written = queue.Queue()
+        parse_slots = threading.BoundedSemaphore(self.parse_backlog)
+        scraped = {}
+
+        fetch_threads = [
+            threading.Thread(target=self._fetch_stage, args=(todo, deferred, fetched, written), daemon=True)
+            for _ in range(self.fetchers)
+        ]
+        writer = threading.Thread(target=self._write_stage, args=(written, parse_slots, scraped, len(urls)),
+                                  daemon=True)
+        for thread in fetch_threads:
+            thread.start()
+        writer.start()
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=worker_logging,
+                                 initargs=(logging.getLogger().level,)) as pool:
+            # If the parse stage fails the daemon fetch/write threads are abandoned
+            # rather than joined, since they may be blocked on a full queue
+            self._parse_stage(pool, fetched, written, parse_slots)
+            for thread in fetch_threads:
+                thread.join()
+            writer.join()
+        return scraped
+
+    def _fetch_stage(self, todo, deferred, fetched, written):
+        while True:
+            item = deferred.pop_ready()
+            if item is None:
+                try:
+                    item = todo.get_nowait()
+                except queue.Empty:
+                    with self._in_hand_lock:
+                        finished = self._in_hand == 0 and not len(deferred)
+                    if finished:
+                        fetched.put(_DONE)
+                        return
+                    time.sleep(min(deferred.next_ready_in() or 0.05, 0.05))
+                    continue
+            with self._in_hand_lock:
+                self._in_hand += 1
+            try:
+                self._fetch_one(item, deferred, fetched, written)
+            finally:
+                with self._in_hand_lock:
+                    self._in_hand -= 1
+
+    def _fetch_one(self, item, deferred, fetched, written):
+        url, attempt = item
+        self.limiter.acquire_slot()
+        try:
+            self.limiter.acquire()
+            content = self.scraper.get_response(url, retries=1).content
+        except Exception as e:
+            delay = None
+            if attempt + 1 < self.scraper.max_attempts:
+                delay = self.scraper.retry_delay(e, attempt)
+            if delay is not None:
+                logging.info("Deferring %s for %.1fs after attempt %d: %s", url, delay, attempt + 1, e)
+                deferred.push((url, attempt + 1), delay)
+            else:
+                # Nothing to parse: go straight to the writer
+                written.put((url, None, None, None, e, False))
+            return
+        finally:
+            self.limiter.release_slot()
+        # Blocks while the parsers are behind
+        fetched.put((url, content))
+
+    def _parse_stage(self, pool, fetched, written, parse_slots):
+        """Feed fetched pages to the parser pool until every fetcher has finished"""
+        finished_fetchers = 0
+        while finished_fetchers < self.fetchers:
+            item = fetched.get()
+            if item is _DONE:
+                finished_fetchers += 1
+                continue
+            url, content = item
+            # Released by the writer, so parsed-but-unwritten pages count against the backlog too
+            parse_slots.acquire()
+            future = pool.submit(parse_page, content, url, self.scraper.parser_engine)
+            future.add_done_callback(lambda f, url=url: written.put(self._parsed(url, f)))
+
+    @staticmethod
+    def _parsed(url, future):
+        try:
+            summary, paths, seconds = future.result()
+        except Exception as e:
+            return url, None, None, None, e, True
+        return url, summary, paths, seconds, None, True
+
+    def _write_stage(self, written, parse_slots, scraped, total):
+        for _ in range(total):
+            url, summary, paths, seconds, error, from_parser = written.get()
+            if seconds is not None:
+                self.scraper.metrics.observe('scraper_parse_seconds', seconds, engine=self.scraper.parser_engine)
+            if paths is not None:
+                self.scraper.count_selector_paths(paths)
+            scraped[url] = self.scraper.record_result(url, summary=summary, error=error)
+            if from_parser:
+                parse_slots.release()
@@ -0,0 +1,238 @@
+import asyncio
+import email.utils
+import heapq
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class _Limiter(ABC):
+    """
+    Pacing interface shared by the fixed and adaptive limiters: reserve() says how
+    long to wait before the next request, plus optional concurrency slots and
+    response feedback (no-ops here).
+    """
+
+    @abstractmethod
+    def reserve(self, tokens=1):
+        """Take `tokens` and return how many seconds the caller must wait before using them"""
+
+    def acquire(self, tokens=1):
+        """Block the current thread until the tokens are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens=1):
+        """Suspend the current task until the tokens are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def try_acquire_slot(self):
+        return True
+
+    def acquire_slot(self):
+        pass
+
+    def release_slot(self):
+        pass
+
+    def on_response(self, status, latency, retry_after=None):
+        pass
+
+    def on_error(self):
+        pass
+
+
+class TokenBucket(_Limiter):
+    """Thread-safe token bucket shared by every worker that talks to the site"""
+
+    def __init__(self, rate, burst=1):
+        # rate is in requests per second; None or 0 disables limiting
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens from the bucket and return how long the caller must wait before using them"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # The balance may go negative: later callers queue up behind earlier reservations
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate):
+        with self._lock:
+            now = time.monotonic()
+            if self.rate:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+class AdaptiveRateController(_Limiter):
+    """
+    AIMD control of the request rate and the number of requests in flight.
+
+    While responses are successful and latency stays near the best seen so far,
+    the rate grows by about `increase` requests/sec every second and concurrency
+    by about one slot per window of responses. A 429/503 (or any 5xx), a network
+    error or latency rising past `latency_factor` times its floor cuts both by
+    `decrease`, at most once per `cooldown` seconds so one burst of errors counts
+    once. A Retry-After header pauses every new request until it has passed.
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.2, max_rate=8.0, initial_concurrency=2,
+                 max_concurrency=16, increase=0.5, decrease=0.5, latency_factor=3.0, cooldown=2.0):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self._bucket = TokenBucket(min(max(initial_rate, min_rate), max_rate))
+        self._concurrency = float(min(max(1, initial_concurrency), self.max_concurrency))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._latency_ewma = None
+        self._latency_floor = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._slots = threading.Condition()
+
+    @property
+    def rate(self):
+        return self._bucket.rate
+
+    @property
+    def concurrency(self):
+        return max(1, int(self._concurrency))
+
+    def snapshot(self):
+        return {
+            'rate': round(self.rate, 3),
+            'concurrency': self.concurrency,
+            'latency_ewma': round(self._latency_ewma, 4) if self._latency_ewma is not None else None,
+        }
+
+    def reserve(self, tokens=1):
+        delay = self._bucket.reserve(tokens)
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        return max(delay, pause)
+
+    def try_acquire_slot(self):
+        with self._slots:
+            if self._in_flight < self.concurrency:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire_slot(self):
+        with self._slots:
+            while self._in_flight >= self.concurrency:
+                # The limit can grow without anyone releasing a slot, so wake up periodically
+                self._slots.wait(0.1)
+            self._in_flight += 1
+
+    def release_slot(self):
+        with self._slots:
+            self._in_flight -= 1
+            self._slots.notify()
+
+    def on_response(self, status, latency, retry_after=None):
+        """Feed back one response: status code and wall-clock latency in seconds"""
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if status == 429 or status >= 500:
+                self._decrease(now)
+                return
+            alpha = 0.2
+            self._latency_ewma = latency if self._latency_ewma is None else (
+                alpha * latency + (1 - alpha) * self._latency_ewma
+            )
+            if self._latency_floor is None or self._latency_ewma < self._latency_floor:
+                self._latency_floor = self._latency_ewma
+            if self._latency_ewma > self.latency_factor * self._latency_floor:
+                self._decrease(now)
+                return
+            self._increase()
+
+    def on_error(self):
+        """Feed back a request that failed without a response"""
+        with self._lock:
+            self._decrease(time.monotonic())
+
+    def _increase(self):
+        rate = self.rate
+        self._bucket.set_rate(min(self.max_rate, rate + self.increase / max(rate, 1.0)))
+        self._concurrency = min(self.max_concurrency, self._concurrency + 1.0 / self._concurrency)
+
+    def _decrease(self, now):
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._bucket.set_rate(max(self.min_rate, self.rate * self.decrease))
+        self._concurrency = max(1.0, self._concurrency * self.decrease)
+        # Latency that caused the cut should not immediately cause another one
+        self._latency_ewma = self._latency_floor
+
+
+class DeferredRetryQueue:
+    """Thread-safe queue of work items that must not be retried before a given time"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, item, delay):
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+
+    def pop_ready(self):
+        """Return the earliest item whose time has come, or None"""
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def next_ready_in(self):
+        """Seconds until the earliest item is ready, or None if the queue is empty"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
@@ -1,31 +1,87 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
-from pathlib import Path
 import os
-import re
 import logging
 import datetime
+import argparse
+import threading
+import contextlib
+from collections import Counter
+from itertools import islice
+
+from async_fetch import AsyncFetcher
+from capture import CaptureReader, CaptureWriter
+from checkpoint import COMPLETED as CHECKPOINT_COMPLETED, Checkpoint
+from http_cache import CacheMiss, ResponseCache
+from log_setup import LEVELS, QueuedLogging
+from metrics import NULL_METRICS, Metrics
+from outputs import BUNDLE_STRATEGIES, BundleWriter, JsonArrayWriter, TypeScriptWriter
+from parsing import PARSER_ENGINES, check_engine, extract_summary
+from pipeline import ScrapePipeline
+from rate_limit import AdaptiveRateController, DeferredRetryQueue, TokenBucket, parse_retry_after
+from search_index import SearchIndexWriter, add_urantia_papers
+from sharding import merge_shards, parse_shard, select_shard, shard_path, write_shard
+from sitemap import IncrementalPlan, ScrapeState, fetch_sitemaps
+from slug_index import AUTO_MIN_SCORE, SlugIndex, apply_corrections, known_paths, url_path
+from tree_resolver import (
+    DOCX_TXT, DUPLICATE, NO_HYPHEN, NOT_ENTRY, NOT_IN_SITEMAP, UNKNOWN_CATEGORY, TreeResolver,
+)
+
+# src/data: the tree file, the JSON inputs and the scraper/ output live under it
+DEFAULT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Statuses that mean "come back later" rather than "this page is wrong"
+RETRYABLE_STATUSES = frozenset((408, 425, 429, 500, 502, 503, 504))
+
+class RetryableResponse(requests.HTTPError):
+    """A response whose status asks us to retry later (429, 503, ...)"""
 
 class DiscoverJesusScraper:
-    def __init__(self):
-        self.base_url = "https://discoverjesus.com"
-        self.session = requests.Session()
-        # Add headers to mimic a browser
-        self.session.headers.update({
+    def __init__(self, base_url="https://discoverjesus.com", root_dir=None, cache=None, parser_engine='html.parser'):
+        self.base_url = base_url
+        # BeautifulSoup engine used by parse_summary (see parsing.PARSER_ENGINES)
+        check_engine(parser_engine)
+        self.parser_engine = parser_engine
+        # How often each field was found by its primary selector, a fallback, or not at all
+        self.selector_stats = Counter()
+        self._stats_lock = threading.Lock()
+        # Optional ResponseCache used by every GET
+        self.cache = cache
+        # Optional CaptureWriter that archives every page downloaded (see capture.py)
+        self.capture = None
+        # Optional Checkpoint that records the outcome of every scraped URL
+        self.checkpoint = None
+        # Run metrics; NULL_METRICS makes every instrumentation call a no-op
+        self.metrics = NULL_METRICS
+        # Optional AdaptiveRateController fed by every response; when set it paces
+        # every engine instead of the fixed limits and the sequential 2 second sleep
+        self.rate_controller = None
+        # Attempts per URL, counting the first request
+        self.max_attempts = 3
+        # Directory for the lazy-loading JSON bundles (see outputs.BundleWriter); None skips them
+        self.bundle_dir = None
+        self.bundle_strategy = 'category'
+        self.bundle_buckets = 16
+        # Directory for the full-text search index (see search_index.py); None skips it
+        self.search_dir = None
+        # Headers to mimic a browser, applied to every per-thread session
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
-        })
-        
-        # Create necessary directories
-        os.makedirs('scraper', exist_ok=True)
-        os.makedirs('src/data', exist_ok=True)
+        }
+        self._local = threading.local()
+        # requests response hooks attached to every new per-thread session
+        self.response_hooks = []
         
         # Store the root directory (one level up from scraper)
-        self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.root_dir = root_dir or DEFAULT_ROOT_DIR
+        
+        # Create necessary directories under the root, wherever the script is run from
+        # (the output writers create their own parent directories)
+        os.makedirs(os.path.join(self.root_dir, 'scraper'), exist_ok=True)
         
         # URL corrections map
         self.url_corrections = {
@@ -63,323 +119,763 @@ class DiscoverJesusScraper:
             # Category corrections
             "person/establishing-jesus-ancestry": "topic/establishing-jesus-ancestry"
         }
+        
+        # Compiled tree-entry -> URL rules, built once from the corrections above
+        self.resolver = TreeResolver(self.base_url, self.url_corrections)
+
+    @property
+    def session(self):
+        """requests.Session for the calling thread (sessions are not safe to share between threads)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.hooks['response'].extend(self.response_hooks)
+            self._local.session = session
+        return session
 
     def sanitize_url_part(self, text):
         """
         Sanitize text to match the website's URL pattern with corrections
         """
-        # First apply the basic sanitization
-        text = text.lower()
-        text = text.replace("'", "").replace('"', '')
-        text = text.replace('–', '-').replace('—', '-').replace('_', '-')
-        text = re.sub(r'[^\w\-]', '-', text)
-        text = re.sub(r'-+', '-', text)
-        text = text.strip('-')
-        
-        # Check if this URL part needs correction
-        if text in self.url_corrections:
-            return self.url_corrections[text]
-            
-        # Special handling for "of-bethany" to differentiate between Martha and Mary
-        if text == "of-bethany":
-            # You'll need to check the context to determine if it's Martha or Mary
-            # This will need to be handled in the URL generation logic
-            pass
-            
-        return text
+        return self.resolver.sanitize(text)
 
-    def get_page(self, url):
+    def get_page(self, url, retries=None):
         """Fetch a page with error handling and retries"""
-        max_retries = 3
+        return self.get_response(url, retries=retries).text
+
+    def get_response(self, url, retries=None):
+        """
+        Fetch a page with error handling and retries and return the successful response.
+        `retries` is the number of attempts (default: max_attempts); callers that keep
+        their own deferred retry queue pass 1.
+        """
+        max_retries = retries or self.max_attempts
         for attempt in range(max_retries):
             try:
-                print(f"\nAttempting to fetch {url} (attempt {attempt + 1}/{max_retries})")
-                response = self.session.get(url)
+                logging.debug("Attempting to fetch %s (attempt %d/%d)", url, attempt + 1, max_retries)
+                response = self.http_get(url)
                 response.raise_for_status()
                 
-                # Save the HTML response for debugging
-                debug_path = os.path.join(self.root_dir, 'scraper/debug')
-                os.makedirs(debug_path, exist_ok=True)
-                page_name = url.split('/')[-1] or 'index'
-                with open(os.path.join(debug_path, f"{page_name}.html"), 'w', encoding='utf-8') as f:
-                    f.write(response.text)
+                if getattr(response, 'from_cache', False):
+                    logging.debug("Served %s from cache", url)
+                    return response
+                
+                self.capture_response(url, response)
                 
-                print(f"Successfully fetched {url}")
-                print(f"Response status: {response.status_code}")
-                print(f"Response length: {len(response.text)} bytes")
-                return response.text
+                logging.debug("Fetched %s: status %d, %d bytes", url, response.status_code, len(response.content))
+                return response
             except requests.RequestException as e:
-                print(f"Error fetching {url} (attempt {attempt + 1}): {str(e)}")
-                if attempt == max_retries - 1:
+                logging.warning("Error fetching %s (attempt %d): %s", url, attempt + 1, e)
+                delay = self.retry_delay(e, attempt) if attempt < max_retries - 1 else None
+                if delay is None:
                     raise
-                time.sleep(2 ** attempt)  # Exponential backoff
+                self.backoff(delay)
 
-    def extract_urls_from_tree(self, tree_file_path):
-        """Extract URLs from the tree-level6.txt file"""
+    def retry_delay(self, error, attempt):
+        """
+        Seconds to wait before retrying a request that failed on its `attempt`
+        (0-based), or None when retrying cannot help: an offline cache miss, a
+        4xx other than 408/425/429, or an error that is not a request error.
+        A Retry-After header wins over the exponential backoff.
+        """
+        if isinstance(error, CacheMiss) or not isinstance(error, requests.RequestException):
+            return None
+        response = getattr(error, 'response', None)
+        delay = 2 ** attempt  # Exponential backoff
+        if response is not None:
+            if response.status_code not in RETRYABLE_STATUSES:
+                return None
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = retry_after
+        self.metrics.inc('scraper_retries_total')
+        return delay
+
+    def backoff(self, seconds):
+        """Sleep before a retry"""
+        with self.metrics.timer('scraper_backoff_sleep_seconds'):
+            time.sleep(seconds)
+
+    def http_get(self, url):
+        """GET a URL, through the response cache when one is configured"""
+        start = time.perf_counter()
+        try:
+            if self.cache is None:
+                response = self.session.get(url)
+            else:
+                response = self.cache.fetch(self.session, url)
+        except requests.RequestException as e:
+            if self.rate_controller is not None and not isinstance(e, CacheMiss):
+                self.rate_controller.on_error()
+            raise
+        elapsed = time.perf_counter() - start
+        self.adapt_rate(response, elapsed)
+        if self.metrics.enabled:
+            self._observe_response(response, elapsed)
+        return response
+
+    def adapt_rate(self, response, latency):
+        """Feed one response back to the adaptive rate controller, if there is one"""
+        if self.rate_controller is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.rate_controller.on_response(response.status_code, latency, retry_after)
+
+    def _observe_response(self, response, total):
+        """Record status, bytes and time to first byte / download time of one GET"""
+        self.metrics.inc('scraper_responses_total', method='GET', status=response.status_code)
+        if getattr(response, 'from_cache', False):
+            self.metrics.observe('scraper_request_seconds', total, source='cache')
+            return
+        # requests measures `elapsed` up to the parsed response headers, which
+        # includes connecting; the rest of the wall time is reading the body
+        ttfb = response.elapsed.total_seconds()
+        self.metrics.observe('scraper_request_seconds', total, source='network')
+        self.metrics.observe('scraper_ttfb_seconds', ttfb)
+        self.metrics.observe('scraper_download_seconds', max(0.0, total - ttfb))
+        self.metrics.inc('scraper_response_bytes_total', len(response.content))
+
+    def fetch(self, url, retries=None):
+        """
+        GET a URL following redirects and return the final response without raising
+        on HTTP error statuses. Only network errors are retried.
+        """
+        max_retries = retries or self.max_attempts
+        for attempt in range(max_retries):
+            try:
+                return self.http_get(url)
+            except requests.RequestException as e:
+                logging.warning("Error fetching %s (attempt %d): %s", url, attempt + 1, e)
+                delay = self.retry_delay(e, attempt) if attempt < max_retries - 1 else None
+                if delay is None:
+                    raise
+                self.backoff(delay)
+
+    def capture_response(self, url, response):
+        """Queue a downloaded page for the capture archive, if one is enabled"""
+        if self.capture is not None:
+            with self.metrics.timer('scraper_capture_seconds'):
+                self.capture.add(url, response)
+
+    def iter_tree_entries(self, tree_file_path, quiet=True):
+        """Stream TreeEntry records (URL or skip reason) from a tree file, one line at a time"""
         # Use absolute path
         abs_path = os.path.join(self.root_dir, tree_file_path)
-        print(f"Reading tree file from: {abs_path}")
-        
-        urls = []
-        total_files = 0
-        skipped_files = {
-            'not_entry': 0,
-            'docx_txt': 0,
-            'no_hyphen': 0,
-            'unknown_category': 0
-        }
+        # Per-entry lines are DEBUG; skip building them when nobody would see them
+        quiet = quiet or not logging.getLogger().isEnabledFor(logging.DEBUG)
+        if not quiet:
+            logging.debug("Reading tree file from: %s", abs_path)
         
         with open(abs_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                
-                # Count total potential files
-                if line.startswith('├── ') or line.startswith('└── '):
-                    total_files += 1
-                    # Remove the tree symbols
-                    filename = line[4:].strip()
-                    
-                    # Debug print
-                    print(f"\nProcessing: {filename}")
-                    
-                    # Skip the .docx and .txt files
-                    if filename.endswith(('.docx', '.txt')):
-                        print(f"Skipping docx/txt file: {filename}")
-                        skipped_files['docx_txt'] += 1
-                        continue
-                    
-                    # Remove the .mp3 extension and number suffix
-                    filename = filename.replace('.mp3', '')
-                    filename = re.sub(r'\d+$', '', filename)  # Remove trailing numbers
-                    
-                    # Try to extract category and title
-                    category = None
-                    title = None
-                    
-                    # First try splitting on both regular hyphen and em dash with spaces
-                    if ' - ' in filename:
-                        parts = filename.split(' - ', 1)
-                        category, title = parts
-                    elif ' – ' in filename:
-                        parts = filename.split(' – ', 1)
-                        category, title = parts
-                    
-                    # Special handling for Bethany cases
-                    if "Martha of Bethany" in filename:
-                        category = "Person"
-                        title = "martha-of-bethany"
-                    elif "Mary of Bethany" in filename:
-                        category = "Person"
-                        title = "mary-of-bethany"
-                    elif not category:
-                        # Try to extract category from the start of the filename
-                        for cat in ['Person', 'Event', 'Topic', 'Group', 'Relationship', 'Object']:
-                            if filename.startswith(cat):
-                                category = cat
-                                title = filename[len(cat):].strip()
-                                # Handle both types of dashes after category
-                                if title.startswith(' - '):
-                                    title = title[3:]
-                                elif title.startswith(' – '):
-                                    title = title[3:]
-                                break
-                    
-                    # If still no category found, try to infer from content
-                    if not category:
-                        if any(word in filename for word in ['Jesus', 'Mary', 'Joseph', 'John', 'Peter', 'Paul']):
-                            category = 'Person'
-                            title = filename
-                        elif any(word in filename for word in ['Baptism', 'Birth', 'Death', 'Resurrection']):
-                            category = 'Event'
-                            title = filename
-                        elif any(word in filename for word in ['Establishing', 'Concepts', 'History', 'Philosophy']):
-                            category = 'Topic'
-                            title = filename
-                        else:
-                            print(f"No category found in: {filename}")
-                            skipped_files['no_hyphen'] += 1
-                            continue
-                    
-                    # Clean up the category
-                    category = category.strip().lower()
-                    original_category = category
-                    
-                    # Map category
-                    if category.startswith('person'):
-                        category = 'person'
-                    elif category.startswith('event'):
-                        category = 'event'
-                    elif category.startswith('topic'):
-                        category = 'topic'
-                    elif category.startswith('group'):
-                        category = 'group'
-                    elif category.startswith('relationship'):
-                        category = 'relationship'
-                    elif category.startswith('object'):
-                        category = 'object'
-                    else:
-                        print(f"Unknown category '{original_category}' in: {filename}")
-                        skipped_files['unknown_category'] += 1
-                        continue
-                    
-                    # Clean up the title and apply corrections
-                    url_title = self.sanitize_url_part(title)
-                    
-                    # Create the URL
-                    url = f"{self.base_url}/{category}/{url_title}"
-                    
-                    # Check if this specific URL needs category correction
-                    category_specific_url = f"{category}/{url_title}"
-                    if category_specific_url in self.url_corrections:
-                        corrected_path = self.url_corrections[category_specific_url]
-                        url = f"{self.base_url}/{corrected_path}"
-                    
-                    # Print debug info
-                    print(f"✓ Category: {category}")
-                    print(f"✓ Original title: {title}")
-                    print(f"✓ Sanitized title: {url_title}")
-                    print(f"✓ Generated URL: {url}")
-                    print("---")
-                    
-                    urls.append(url)
-                else:
-                    skipped_files['not_entry'] += 1
+            for entry in self.resolver.iter_entries(f):
+                if not quiet and entry.skip_reason != NOT_ENTRY:
+                    self._log_tree_entry(entry)
+                yield entry
+
+    def iter_tree_urls(self, tree_file_path, quiet=True):
+        """Lazily yield each unique URL generated from a tree file"""
+        for entry in self.iter_tree_entries(tree_file_path, quiet=quiet):
+            if entry.url is not None:
+                yield entry.url
+
+    def _log_tree_entry(self, entry):
+        if entry.skip_reason == DOCX_TXT:
+            logging.debug("Skipping docx/txt file: %s", entry.filename)
+        elif entry.skip_reason == NO_HYPHEN:
+            logging.debug("No category found in: %s", entry.filename)
+        elif entry.skip_reason == UNKNOWN_CATEGORY:
+            logging.debug("Unknown category '%s' in: %s", entry.category.strip().lower(), entry.filename)
+        elif entry.skip_reason == DUPLICATE:
+            logging.debug("Duplicate of an earlier entry: %s", entry.filename)
+        elif entry.skip_reason == NOT_IN_SITEMAP:
+            logging.debug("Not listed in the sitemap: %s", entry.filename)
+        else:
+            logging.debug("✓ %s: category %s, title %r (sanitized %r) -> %s", entry.filename, entry.category,
+                          entry.title, self.sanitize_url_part(entry.title), entry.url)
+
+    def extract_urls_from_tree(self, tree_file_path, quiet=False):
+        """Extract URLs from the tree-level6.txt file"""
+        urls = list(self.iter_tree_urls(tree_file_path, quiet=quiet))
+        counts = self.resolver.counts
         
-        # Print summary
-        print("\nFile Processing Summary:")
-        print(f"Total lines in file: {total_files}")
-        print(f"Generated URLs: {len(urls)}")
-        print("\nSkipped files breakdown:")
-        print(f"- Not file entries: {skipped_files['not_entry']}")
-        print(f"- Docx/txt files: {skipped_files['docx_txt']}")
-        print(f"- No hyphen separator: {skipped_files['no_hyphen']}")
-        print(f"- Unknown categories: {skipped_files['unknown_category']}")
+        # Log summary
+        logging.info("File Processing Summary:")
+        logging.info(f"Total lines in file: {sum(counts.values()) - counts[NOT_ENTRY]}")
+        logging.info(f"Generated URLs: {len(urls)}")
+        logging.info("Skipped files breakdown:")
+        logging.info(f"- Not file entries: {counts[NOT_ENTRY]}")
+        logging.info(f"- Docx/txt files: {counts[DOCX_TXT]}")
+        logging.info(f"- No hyphen separator: {counts[NO_HYPHEN]}")
+        logging.info(f"- Unknown categories: {counts[UNKNOWN_CATEGORY]}")
+        logging.info(f"- Duplicate URLs: {counts[DUPLICATE]}")
+        if self.resolver.sitemap is not None:
+            logging.info(f"- Not in sitemap: {counts[NOT_IN_SITEMAP]}")
         
         return urls
 
-    def scrape_summary(self, url):
-        """Scrape summary data from a single page"""
-        html = self.get_page(url)
-        soup = BeautifulSoup(html, 'html.parser')
+    def discover_sitemap(self, sitemap_url=None):
+        """
+        Fetch the sitemaps into a SitemapIndex, save it to scraper/sitemap_index.json
+        and resolve the URLs generated from the tree against it
+        """
+        sitemap_url = sitemap_url or f"{self.base_url}/sitemap.xml"
         
-        # Get the ID from the URL
-        path_parts = url.split('/')
-        page_id = '/'.join(path_parts[-2:])  # Include category (person/event/etc)
+        def fetch(url):
+            response = self.fetch(url)
+            response.raise_for_status()
+            return response.content
         
-        print(f"\nScraping content for {page_id}:")
+        with self.metrics.timer('scraper_sitemap_seconds'):
+            index = fetch_sitemaps(fetch, sitemap_url)
+        index.save(os.path.join(self.root_dir, 'scraper/sitemap_index.json'))
+        logging.info(f"Sitemap: {len(index)} pages in {len(index.sources)} sitemap(s) from {sitemap_url}")
+        self.resolver.sitemap = index
+        return index
+
+    def scrape_summary(self, url, retries=None):
+        """Scrape summary data from a single page"""
+        html = self.get_page(url, retries=retries)
+        return self.parse_summary(html, url)
+
+    def parse_summary(self, html, url):
+        """Extract summary data from the HTML of a single page"""
+        with self.metrics.timer('scraper_parse_seconds', engine=self.parser_engine):
+            summary, paths = extract_summary(html, url, engine=self.parser_engine)
+        self.count_selector_paths(paths)
+        return summary
+
+    def count_selector_paths(self, paths):
+        """Report and tally which selector path produced each field of a page"""
+        with self._stats_lock:
+            self.selector_stats.update(f"{field}:{path}" for field, path in paths.items())
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Selector paths: %s", ', '.join(f'{field}={path}' for field, path in paths.items()))
+
+    def save_to_typescript(self, summaries, output_path):
+        """
+        Save the summaries as a TypeScript file, leaving it untouched when nothing
+        changed; returns the ChangeReport
+        """
+        with self.metrics.timer('scraper_save_typescript_seconds'):
+            return self._write_typescript(summaries, output_path)
+
+    def _write_typescript(self, summaries, output_path):
+        # Use absolute path for output
+        abs_output_path = os.path.join(self.root_dir, output_path)
         
-        # Find the title
-        title = soup.find('h1', class_='entry-title')
-        title_text = title.text.strip() if title else None
-        print(f"Found title: {title_text}")
+        # Entries are written in id order, only entries with content are included
+        with TypeScriptWriter(abs_output_path) as ts:
+            for summary in summaries:
+                ts.write(summary)
+        return ts.report
+
+    def save_change_report(self, report):
+        """Log what a TypeScript write changed and save the ids to scraper/ts_changes.json"""
+        if report.written:
+            logging.info(f"TypeScript module updated: {report}")
+        else:
+            logging.info(f"TypeScript module unchanged ({report.unchanged} entries); not rewritten")
+        with open(os.path.join(self.root_dir, 'scraper/ts_changes.json'), 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+    def export_writers(self):
+        """
+        Writers of the optional exports enabled for this run: the lazy-loading
+        bundles and the search index (which also covers the Urantia paper summaries)
+        """
+        writers = []
+        if self.bundle_dir:
+            writers.append(BundleWriter(self.bundle_dir, strategy=self.bundle_strategy, buckets=self.bundle_buckets))
+        if self.search_dir:
+            search = SearchIndexWriter(self.search_dir)
+            papers_path = os.path.join(self.root_dir, 'json/urantia_summaries.json')
+            if os.path.exists(papers_path):
+                add_urantia_papers(search, papers_path)
+            writers.append(search)
+        return writers
+
+    def save_exports(self, summaries):
+        """Write the optional exports, if any are enabled"""
+        writers = self.export_writers()
+        if not writers:
+            return
+        with self.metrics.timer('scraper_save_exports_seconds'), contextlib.ExitStack() as stack:
+            for writer in writers:
+                stack.enter_context(writer)
+            for summary in summaries:
+                for writer in writers:
+                    writer.write(summary)
+        self.report_exports(writers)
+
+    def report_exports(self, writers):
+        for writer in writers:
+            logging.info(f"Saved {writer.out_dir}: {writer}")
+
+    def scrape_all(self, urls, concurrency=None, max_rps=None, resume=False, pipeline=None):
+        """
+        Scrape all provided URLs: one at a time, with the asyncio engine when
+        `concurrency` is set, or through a staged ScrapePipeline when one is given.
+        """
+        urls = list(urls)
         
-        # Find the short summary (subtitle)
-        short_summary = soup.find('div', class_='entry-subtitle')
-        short_summary_text = short_summary.text.strip() if short_summary else None
-        print(f"Found short summary: {short_summary_text}")
+        # url -> summary with content, or None for pages that were empty or failed
+        scraped = {}
+        if resume and self.checkpoint is not None:
+            scraped = self.completed_summaries()
+            logging.info(f"Resuming: {sum(1 for url in urls if url in scraped)} of {len(urls)} URLs already scraped")
+        pending = [url for url in urls if url not in scraped]
         
-        # Find the full summary
-        summary_section = soup.find('div', class_='summary-section')
-        full_summary_text = summary_section.text.strip() if summary_section else None
-        print(f"Found full summary: {full_summary_text}")
+        if pipeline is not None:
+            scraped.update(pipeline.run(pending))
+        elif concurrency:
+            scraped.update(self._scrape_concurrent(pending, concurrency, max_rps))
+        else:
+            scraped.update(self._scrape_sequential(pending))
         
-        # If we didn't find the elements with the expected classes, try alternative selectors
-        if not title_text:
-            title = soup.find('h1')  # Try any h1
-            title_text = title.text.strip() if title else None
-            print(f"Found title (alternative): {title_text}")
+        summaries = [scraped[url] for url in urls if scraped.get(url)]
+        self.save_progress(summaries)
+        return summaries
+
+    def scrape_stream(self, urls, concurrency=None, max_rps=None, resume=False, pipeline=None, chunk_size=256):
+        """
+        Bounded-memory version of scrape_all: URLs are read lazily and scraped
+        `chunk_size` at a time with the same engines, and each summary with
+        content is yielded in input order as soon as its chunk is done.
+        Nothing is kept between chunks and progress.json is not written (the
+        checkpoint records every URL).
+        """
+        done = {}
+        if resume and self.checkpoint is not None:
+            done = self.completed_summaries()
+            logging.info(f"Resuming: {len(done)} URLs already scraped")
         
-        if not short_summary_text:
-            # Try to find a subtitle-like element
-            candidates = soup.find_all(['h2', 'div', 'p'], class_=lambda x: x and ('subtitle' in x.lower() or 'summary' in x.lower()))
-            if candidates:
-                short_summary_text = candidates[0].text.strip()
-                print(f"Found short summary (alternative): {short_summary_text}")
+        urls = iter(urls)
+        # One fetcher for every chunk, so threads, sessions and connections are reused
+        with self._fetcher(concurrency or 1, max_rps) as fetcher:
+            while True:
+                chunk = list(islice(urls, chunk_size))
+                if not chunk:
+                    return
+                pending = [url for url in chunk if url not in done]
+                if not pending:
+                    scraped = {}
+                elif pipeline is not None:
+                    scraped = pipeline.run(pending)
+                elif concurrency:
+                    scraped = self._scrape_concurrent(pending, concurrency, max_rps, fetcher=fetcher)
+                else:
+                    scraped = self._scrape_sequential(pending)
+                for url in chunk:
+                    # Restored summaries are dropped once yielded too
+                    summary = done.pop(url) if url in done else scraped.get(url)
+                    if summary:
+                        yield summary
+
+    def scrape_all_async(self, urls, concurrency=4, max_rps=None, resume=False):
+        """Scrape all provided URLs with up to `concurrency` requests in flight per host"""
+        return self.scrape_all(urls, concurrency=concurrency, max_rps=max_rps, resume=resume)
+
+    def _scrape_sequential(self, urls):
+        scraped = {}
+        pending = list(reversed(urls))
+        # (url, attempt) of failed URLs waiting out their backoff while the rest go ahead
+        deferred = DeferredRetryQueue()
+        while pending or len(deferred):
+            item = deferred.pop_ready()
+            if item is None:
+                if not pending:
+                    time.sleep(deferred.next_ready_in())
+                    continue
+                item = (pending.pop(), 0)
+            url, attempt = item
+            
+            if self.rate_controller is not None:
+                with self.metrics.timer('scraper_politeness_sleep_seconds'):
+                    self.rate_controller.acquire()
+            try:
+                logging.debug("Scraping %s...", url)
+                summary = self.scrape_summary(url, retries=1)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt) if attempt + 1 < self.max_attempts else None
+                if delay is not None:
+                    logging.info("Deferring %s for %.1fs after attempt %d", url, delay, attempt + 1)
+                    deferred.push((url, attempt + 1), delay)
+                else:
+                    scraped[url] = self.record_result(url, error=e)
+                continue
+            scraped[url] = self.record_result(url, summary=summary)
+            
+            if self.rate_controller is None:
+                # Be nice to the server
+                with self.metrics.timer('scraper_politeness_sleep_seconds'):
+                    time.sleep(2)  # Increased delay to be more conservative
+        return scraped
+
+    def _fetcher(self, concurrency, max_rps):
+        return AsyncFetcher(
+            per_host=concurrency, max_rps=max_rps, limiter=self.rate_controller,
+            retry_delay=self.retry_delay, max_attempts=self.max_attempts,
+        )
+
+    def _scrape_concurrent(self, urls, concurrency, max_rps, fetcher=None):
+        fetcher = fetcher or self._fetcher(concurrency, max_rps)
+        scraped = {}
         
-        if not full_summary_text:
-            # Try to find a main content area
-            content = soup.find(['article', 'main', 'div'], class_=lambda x: x and ('content' in x.lower() or 'entry' in x.lower()))
-            if content:
-                paragraphs = content.find_all('p')
-                full_summary_text = '\n'.join(p.text.strip() for p in paragraphs[:3])  # Take first 3 paragraphs
-                print(f"Found full summary (alternative): {full_summary_text}")
+        # Checkpoint each URL as soon as it completes rather than when the whole batch is done
+        def on_result(result):
+            scraped[result.url] = self.record_result(result.url, summary=result.value, error=result.error)
         
+        # One attempt per call: retries go through the fetcher's deferred queue
+        fetcher.run(urls, lambda url: self.scrape_summary(url, retries=1), on_result=on_result)
+        return scraped
+
+    def record_result(self, url, summary=None, error=None):
+        """Report and checkpoint the outcome for one URL; returns the summary if it has content"""
+        if self.checkpoint is not None:
+            with self.metrics.timer('scraper_checkpoint_seconds'):
+                self.checkpoint.record(url, summary=summary, error=error)
+        if error is not None:
+            self.metrics.inc('scraper_pages_total', outcome='error')
+            logging.error("Error scraping %s: %s", url, error)
+            self.log_error(url, error)
+            return None
+        if summary["shortSummary"] or summary["fullSummary"]:
+            self.metrics.inc('scraper_pages_total', outcome='ok')
+            logging.debug("Successfully scraped content for %s", url)
+            return summary
+        self.metrics.inc('scraper_pages_total', outcome='empty')
+        logging.warning("No content found for %s", url)
+        return None
+
+    def completed_summaries(self):
+        """url -> summary (or None for empty pages) for every URL the checkpoint marks as done"""
+        records = Checkpoint.load(self.checkpoint.path)
         return {
-            "id": page_id,
-            "title": title_text,
-            "shortSummary": short_summary_text,
-            "fullSummary": full_summary_text,
-            "sourceUrl": url
+            url: record["summary"]
+            for url, record in records.items()
+            if record["status"] in CHECKPOINT_COMPLETED
         }
 
-    def save_to_typescript(self, summaries, output_path):
-        """Save the summaries as a TypeScript file"""
-        # Convert to the format expected by the React app
-        ts_data = {
-            summary["id"]: {
-                "id": summary["id"],
-                "shortSummary": summary["shortSummary"],
-                "fullSummary": summary["fullSummary"]
-            }
-            for summary in summaries
-            if summary["shortSummary"] or summary["fullSummary"]  # Only include entries with content
-        }
-        
-        # Create TypeScript content
-        ts_content = """// Auto-generated from Python scraper
-export interface DiscoverJesusSummary {
-  id: string;
-  shortSummary: string;
-  fullSummary: string;
-}
-
-export const discoverJesusSummaries: Record<string, DiscoverJesusSummary> = """
-        
-        # Add the data as JSON
-        ts_content += json.dumps(ts_data, indent=2)
-        ts_content += ";\n"
-        
-        # Use absolute path for output
-        abs_output_path = os.path.join(self.root_dir, output_path)
-        
-        # Write the file
-        with open(abs_output_path, 'w', encoding='utf-8') as f:
-            f.write(ts_content)
-
-    def scrape_all(self, urls):
-        """Scrape all provided URLs"""
-        summaries = []
-        for url in urls:
-            try:
-                print(f"\nScraping {url}...")
-                summary = self.scrape_summary(url)
-                if summary["shortSummary"] or summary["fullSummary"]:
-                    summaries.append(summary)
-                    print(f"Successfully scraped content for {url}")
-                else:
-                    print(f"No content found for {url}")
-                
-                # Save progress after each successful scrape
-                self.save_progress(summaries)
-                
-                # Be nice to the server
-                time.sleep(2)  # Increased delay to be more conservative
-            except Exception as e:
-                print(f"Error scraping {url}: {str(e)}")
-                # Save the error for debugging
-                with open(os.path.join(self.root_dir, 'scraper/errors.log'), 'a') as f:
-                    f.write(f"{url}: {str(e)}\n")
-        return summaries
+    def log_error(self, url, error):
+        """Save a scraping error for debugging"""
+        with open(os.path.join(self.root_dir, 'scraper/errors.log'), 'a') as f:
+            f.write(f"{url}: {str(error)}\n")
 
     def save_progress(self, summaries):
-        """Save progress to a JSON file"""
+        """Save the final summaries of a run to a JSON file (per-URL progress lives in the checkpoint)"""
+        with self.metrics.timer('scraper_save_progress_seconds'):
+            self._write_progress(summaries)
+
+    def _write_progress(self, summaries):
         progress_path = os.path.join(self.root_dir, 'scraper/progress.json')
         with open(progress_path, 'w', encoding='utf-8') as f:
             json.dump(summaries, f, indent=2)
 
-def save_summary_log(validation_results, timestamp):
+def invalid_url_entry(url, **details):
+    """Build the invalid_urls.json entry for a URL that failed validation"""
+    # Extract category and title from URL
+    parts = url.split('/')
+    entry = {
+        "category": parts[-2],
+        "title": parts[-1],
+    }
+    entry.update(details)
+    entry["correct_url"] = ""  # To be filled out manually
+    return entry
+
+def classify_response(url, response):
+    """
+    Classify a redirect-following response for `url`.
+    Returns (bucket, validation entry, invalid_urls entry or None).
+    """
+    if response.status_code == 200:
+        if response.url == url:
+            logging.debug("✓ Valid URL: %s", url)
+            return 'success', url, None
+        hops = len(response.history)
+        logging.warning(f"⚠ URL redirects: {url} -> {response.url} ({hops} hop{'s' if hops != 1 else ''})")
+        return 'redirect', (url, response.url), None
+    
+    logging.error(f"✗ Invalid URL (status {response.status_code}): {url}")
+    return 'not_found', url, invalid_url_entry(url, status_code=response.status_code)
+
+def classify_error(url, error):
+    """Classify a request that failed before any response arrived"""
+    logging.error(f"✗ Error checking URL: {url}: {str(error)}")
+    # Also add failed requests to invalid URLs
+    return 'error', (url, str(error)), invalid_url_entry(url, error=str(error))
+
+def raise_if_retryable(url, response):
+    """Raise RetryableResponse for a status that asks us to come back later"""
+    if response.status_code in RETRYABLE_STATUSES:
+        raise RetryableResponse(f"{response.status_code} for {url}", response=response)
+
+def classify_failure(url, error):
+    """Classify a URL whose last attempt failed (error or retryable status)"""
+    if isinstance(error, RetryableResponse):
+        return classify_response(url, error.response)
+    return classify_error(url, error)
+
+def check_url(scraper, url):
+    """
+    HEAD a single URL and classify it.
+    Returns (bucket, validation entry, invalid_urls entry or None).
+    Network errors and retryable statuses are raised so the caller can retry later.
+    """
+    logging.debug("Checking URL: %s", url)
+    start = time.perf_counter()
+    try:
+        response = scraper.session.head(url, allow_redirects=True)
+    except requests.RequestException:
+        if scraper.rate_controller is not None:
+            scraper.rate_controller.on_error()
+        raise
+    elapsed = time.perf_counter() - start
+    scraper.adapt_rate(response, elapsed)
+    scraper.metrics.observe('scraper_request_seconds', elapsed, source='head')
+    scraper.metrics.inc('scraper_responses_total', method='HEAD', status=response.status_code)
+    raise_if_retryable(url, response)
+    return classify_response(url, response)
+
+def check_and_scrape_url(scraper, url):
+    """
+    GET a single URL once, classify it like check_url and parse it straight away if it is valid.
+    Returns (bucket, validation entry, invalid_urls entry or None, summary or None).
+    Network errors and retryable statuses are raised so the caller can retry later.
+    """
+    logging.debug("Checking and scraping URL: %s", url)
+    response = scraper.fetch(url, retries=1)
+    raise_if_retryable(url, response)
+    
+    bucket, entry, invalid = classify_response(url, response)
+    if bucket != 'success':
+        return bucket, entry, invalid, None
+    
+    try:
+        if not getattr(response, 'from_cache', False):
+            scraper.capture_response(url, response)
+        summary = scraper.parse_summary(response.text, url)
+    except Exception as e:
+        logging.error(f"Error scraping {url}: {str(e)}")
+        scraper.log_error(url, e)
+        if scraper.checkpoint is not None:
+            scraper.checkpoint.record(url, error=e)
+        return bucket, entry, invalid, None
+    if scraper.checkpoint is not None:
+        scraper.checkpoint.record(url, summary=summary)
+    return bucket, entry, invalid, summary
+
+def collect_validation(urls, outcomes):
+    """
+    Fold per-URL (bucket, entry, invalid) outcomes, in input order, into
+    (validation_results, valid_urls, invalid_urls).
+    """
+    valid_urls = []
+    invalid_urls = {}
+    validation_results = {
+        'success': [],
+        'redirect': [],
+        'not_found': [],
+        'error': []
+    }
+    for url, (bucket, entry, invalid) in zip(urls, outcomes):
+        validation_results[bucket].append(entry)
+        if bucket == 'success':
+            valid_urls.append(url)
+        if invalid is not None:
+            invalid_urls[url] = invalid
+    
+    return validation_results, valid_urls, invalid_urls
+
+def validation_fetcher(scraper, workers, max_rps):
+    """
+    AsyncFetcher for the validation passes: paced by the scraper's adaptive
+    controller, or by a fixed token bucket of `max_rps` without one
+    """
+    return AsyncFetcher(
+        per_host=workers, limiter=scraper.rate_controller or TokenBucket(max_rps, burst=workers),
+        retry_delay=scraper.retry_delay, max_attempts=scraper.max_attempts,
+    )
+
+def validate_urls(scraper, urls, workers=8, max_rps=5.0):
+    """
+    Check every URL with up to `workers` HEAD requests in flight.
+    Returns (validation_results, valid_urls, invalid_urls).
+    """
+    urls = list(urls)
+    results = validation_fetcher(scraper, workers, max_rps).run(urls, lambda url: check_url(scraper, url))
+    
+    # Results come back in input order, so the buckets (and every file written
+    # from them) come out exactly as they would from a one-at-a-time pass
+    outcomes = [result.value if result.ok else classify_failure(result.url, result.error) for result in results]
+    return collect_validation(urls, outcomes)
+
+def validate_and_scrape(scraper, urls, workers=8, max_rps=5.0, resume=False):
+    """
+    Validate and scrape in one pass with a single GET per URL. With `resume`, the
+    URLs the checkpoint marks as done count as valid and keep their summary
+    without a request.
+    Returns (validation_results, valid_urls, invalid_urls, summaries).
+    """
+    urls = list(urls)
+    done = {}
+    if resume and scraper.checkpoint is not None:
+        done = scraper.completed_summaries()
+        logging.info(f"Resuming: {sum(1 for url in urls if url in done)} of {len(urls)} URLs already scraped")
+    pending = [url for url in urls if url not in done]
+    results = validation_fetcher(scraper, workers, max_rps).run(
+        pending, lambda url: check_and_scrape_url(scraper, url)
+    )
+    fetched = {
+        result.url: result.value if result.ok else classify_failure(result.url, result.error) + (None,)
+        for result in results
+    }
+    outcomes = [('success', url, None, done[url]) if url in done else fetched[url] for url in urls]
+    
+    summaries = [
+        summary for _, _, _, summary in outcomes
+        if summary and (summary["shortSummary"] or summary["fullSummary"])  # Only keep entries with content
+    ]
+    scraper.save_progress(summaries)
+    validation_results, valid_urls, invalid_urls = collect_validation(
+        urls, [outcome[:3] for outcome in outcomes]
+    )
+    return validation_results, valid_urls, invalid_urls, summaries
+
+def suggest_corrections(scraper, invalid_urls, known, k=5, min_score=AUTO_MIN_SCORE, unverified=frozenset(),
+                        verify=None):
+    """
+    Add the top-k most similar known pages (with their trigram scores) to the
+    invalid_urls entry of every URL that was not found, and return
+    {url: corrected url} for the ones with a confident match.
+    
+    The paths of `known` in `unverified` are only offered once verify(paths),
+    which returns the ones that exist, has confirmed them. Only the unverified
+    paths that could make a URL's top k are checked.
+    """
+    not_found = [url for url, entry in invalid_urls.items() if entry.get("status_code") in (404, 410)]
+    # Every candidate, best first; the one being corrected may be in the index itself
+    ranked = {url: [candidate for candidate in known.search(url_path(url), len(known))
+                    if candidate[0] != url_path(url)]
+              for url in not_found}
+    checked = set()
+    exists = set()
+    while True:
+        to_check = set()
+        for candidates in ranked.values():
+            # Count the unchecked paths as found until they are checked
+            offered = [path for path, _ in candidates if path not in unverified or path in exists
+                       or path not in checked][:k]
+            to_check.update(path for path in offered if path in unverified and path not in checked)
+        if not to_check:
+            break
+        exists.update(verify(sorted(to_check)))
+        checked.update(to_check)
+    
+    corrections = {}
+    for url in not_found:
+        candidates = [candidate for candidate in ranked[url]
+                      if candidate[0] not in unverified or candidate[0] in exists][:k]
+        invalid_urls[url]["candidates"] = [{"url": f"{scraper.base_url}/{path}", "score": score}
+                                           for path, score in candidates]
+        best = SlugIndex.confident(candidates, min_score=min_score)
+        if best is not None:
+            corrections[url] = f"{scraper.base_url}/{best}"
+    return corrections
+
+def auto_correct(args, scraper, urls, all_urls, validation_results, valid_urls, invalid_urls):
+    """
+    Suggest corrections for the URLs of `urls` that were not found and apply the
+    confident ones in the same run: the corrected URLs are validated (and scraped,
+    in a fused run), and the ones that check out take the place of the URL they
+    correct in valid_urls and leave invalid_urls and the not_found list. The
+    correction is saved to scraper/auto_corrections.json so the next run generates
+    the right URL straight away.
+    
+    Candidates are pages known to exist: the last run's valid_urls.json and
+    summaries.json, the sitemap and the URLs this run found valid, never a
+    generated URL nobody has checked. The URLs of `all_urls` (the run's whole URL
+    list) that another shard validates are checked here when they could be a
+    candidate, so every shard makes the corrections an unsharded run would, and a
+    corrected page keeps the position of the URL it corrects in every output.
+    Returns ({url: corrected url} of the applied corrections, the summaries of the
+    corrected pages scraped in a fused run).
+    """
+    known = SlugIndex(known_paths(scraper.root_dir, scraper.resolver.sitemap))
+    for url in valid_urls:
+        known.add(url_path(url))
+    checked_here = set(urls)
+    unverified = set()
+    for url in all_urls:
+        if url not in checked_here and url_path(url) not in known:
+            unverified.add(url_path(url))
+            known.add(url_path(url))
+    if not len(known):
+        return {}, []
+    
+    def verify(paths):
+        logging.info(f"Checking {len(paths)} correction candidate(s) from other shards...")
+        _, found, _ = validate_urls(scraper, [f"{scraper.base_url}/{path}" for path in paths],
+                                    workers=args.validate_workers, max_rps=args.validate_rps)
+        return {url_path(url) for url in found}
+    
+    corrections = suggest_corrections(scraper, invalid_urls, known, min_score=args.auto_correct_score,
+                                      unverified=unverified, verify=verify)
+    if not corrections or args.no_auto_correct:
+        return {}, []
+    
+    targets = sorted(set(corrections.values()) - set(valid_urls))
+    logging.info(f"\nRe-validating {len(targets)} automatically corrected URL(s)...")
+    summaries = []
+    if args.fused:
+        results, fixed, _, summaries = validate_and_scrape(
+            scraper, targets, workers=args.validate_workers, max_rps=args.validate_rps, resume=args.resume
+        )
+    else:
+        results, fixed, _ = validate_urls(scraper, targets, workers=args.validate_workers, max_rps=args.validate_rps)
+    # Only the targets that checked out are reported; the others are not applied
+    validation_results['success'].extend(results['success'])
+    fixed = set(fixed) | set(valid_urls)
+    
+    applied = {}
+    corrected = {}
+    for url, target in corrections.items():
+        if target not in fixed:
+            continue
+        score = invalid_urls.pop(url)["candidates"][0]["score"]
+        logging.info(f"✓ Corrected {url} -> {target} (score {score})")
+        applied[url_path(url)] = {"to": url_path(target), "score": score}
+        corrected[url] = target
+    validation_results['not_found'][:] = [url for url in validation_results['not_found'] if url not in corrected]
+    valid = set(valid_urls)
+    valid_urls[:] = apply_corrections([url for url in urls if url in valid or url in corrected], corrected)
+    save_auto_corrections(scraper, applied)
+    return corrected, summaries
+
+def save_auto_corrections(scraper, applied):
+    """Merge the corrections applied by this run into scraper/auto_corrections.json"""
+    if not applied:
+        return
+    path = os.path.join(scraper.root_dir, 'scraper/auto_corrections.json')
+    corrections = load_auto_corrections(path)
+    corrections.update(applied)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(corrections, f, indent=2, sort_keys=True)
+    logging.info(f"Saved {len(applied)} automatic correction(s) to scraper/auto_corrections.json")
+
+def load_auto_corrections(path):
+    """'category/slug' -> {"to": 'category/slug', "score": ...} of the corrections applied so far"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_summary_log(scraper, validation_results, timestamp):
     """Create a summary log file with valid and invalid URLs"""
-    summary_log_file = f'scraper/logs/url_summary_{timestamp}.log'
+    log_dir = os.path.join(scraper.root_dir, 'scraper/logs')
+    os.makedirs(log_dir, exist_ok=True)
+    summary_log_file = os.path.join(log_dir, f'url_summary_{timestamp}.log')
     
     with open(summary_log_file, 'w') as f:
         f.write("=== URL VALIDATION SUMMARY ===\n\n")
@@ -417,87 +913,10 @@ def save_summary_log(validation_results, timestamp):
     
     return summary_log_file
 
-def main():
-    # Set up logging
-    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_file = f'scraper/logs/url_validation_{timestamp}.log'
-    os.makedirs('scraper/logs', exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    
-    tree_file_path = "docs/New Series/tree-level6.txt"
-    logging.info(f"Starting URL validation from {tree_file_path}")
-    
-    scraper = DiscoverJesusScraper()
-    
-    logging.info("Extracting URLs from tree file...")
-    urls = scraper.extract_urls_from_tree(tree_file_path)
-    logging.info(f"Found {len(urls)} URLs to validate")
-    
-    # First, validate all URLs without scraping
-    logging.info("\nValidating URLs...")
-    valid_urls = []
-    invalid_urls = {}
-    validation_results = {
-        'success': [],
-        'redirect': [],
-        'not_found': [],
-        'error': []
-    }
-    
-    for url in urls:
-        try:
-            logging.info(f"\nChecking URL: {url}")
-            response = scraper.session.head(url, allow_redirects=True)
-            
-            if response.status_code == 200:
-                if response.url == url:
-                    logging.info(f"✓ Valid URL: {url}")
-                    validation_results['success'].append(url)
-                    valid_urls.append(url)
-                else:
-                    logging.warning(f"⚠ URL redirects: {url} -> {response.url}")
-                    validation_results['redirect'].append((url, response.url))
-            else:
-                logging.error(f"✗ Invalid URL (status {response.status_code}): {url}")
-                validation_results['not_found'].append(url)
-                # Extract category and title from URL
-                parts = url.split('/')
-                category = parts[-2]
-                title = parts[-1]
-                invalid_urls[url] = {
-                    "category": category,
-                    "title": title,
-                    "status_code": response.status_code,
-                    "correct_url": ""  # To be filled out manually
-                }
-        except requests.RequestException as e:
-            logging.error(f"✗ Error checking URL: {url}")
-            logging.error(f"  Error: {str(e)}")
-            validation_results['error'].append((url, str(e)))
-            # Also add failed requests to invalid URLs
-            parts = url.split('/')
-            category = parts[-2]
-            title = parts[-1]
-            invalid_urls[url] = {
-                "category": category,
-                "title": title,
-                "error": str(e),
-                "correct_url": ""  # To be filled out manually
-            }
-        
-        # Small delay between checks
-        time.sleep(0.5)
-    
+def write_validation_reports(scraper, urls, validation_results, valid_urls, invalid_urls, timestamp, log_file):
+    """Log the validation summary and write the summary log, valid_urls.json and invalid_urls.json"""
     # Create summary log file
-    summary_log_file = save_summary_log(validation_results, timestamp)
+    summary_log_file = save_summary_log(scraper, validation_results, timestamp)
     
     # Write validation summary to log
     logging.info("\nURL Validation Summary:")
@@ -535,34 +954,502 @@ def main():
     logging.info(f"- Detailed log: {log_file}")
     logging.info(f"- Summary log: {summary_log_file}")
     logging.info("Invalid URLs have been saved to 'scraper/invalid_urls.json'")
+
+def save_outputs(scraper, summaries):
+    """Write the scraped summaries to the TypeScript module and the raw JSON file"""
+    # Save as TypeScript file
+    output_path = "src/data/discoverJesusSummaries.ts"
+    report = scraper.save_to_typescript(summaries, output_path)
+    logging.info(f"Saved {len(summaries)} summaries to {output_path}")
+    scraper.save_change_report(report)
+    scraper.save_exports(summaries)
     
-    if len(valid_urls) == 0:
-        logging.error("\nNo valid URLs found. Please check the URL generation logic.")
+    # Save raw data as JSON
+    summaries_path = os.path.join(scraper.root_dir, 'scraper/summaries.json')
+    with open(summaries_path, 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2)
+    logging.info("Saved raw data to scraper/summaries.json")
+
+def reextract(scraper, source=None):
+    """
+    Run extraction again over every entry page in the response cache (or in
+    `source`, e.g. a capture.CaptureReader), without a request, so fields added
+    to parsing.SUMMARY_FIELDS are filled in for pages scraped before they
+    existed. Returns the summaries in URL order.
+    """
+    if source is None:
+        source = scraper.cache
+    summaries = []
+    for url in source.urls():
+        if not url.startswith(scraper.base_url) or len(url_path(url).split('/')) != 2 or url.endswith('.xml'):
+            continue
+        try:
+            summaries.append(scraper.parse_summary(source.get(url).to_response().text, url))
+        except Exception as e:
+            logging.error(f"Error re-extracting {url}: {str(e)}")
+            scraper.log_error(url, e)
+    origin = 'the response cache' if source is scraper.cache else 'the capture archive'
+    logging.info(f"Re-extracted {len(summaries)} pages from {origin}")
+    return summaries
+
+def save_outputs_streaming(scraper, summaries):
+    """
+    Like save_outputs, for a stream of summaries: the TypeScript module, summaries.json
+    and progress.json are fed one summary at a time and come out with the same bytes
+    """
+    output_path = "src/data/discoverJesusSummaries.ts"
+    with TypeScriptWriter(os.path.join(scraper.root_dir, output_path)) as ts, \
+            JsonArrayWriter(os.path.join(scraper.root_dir, 'scraper/summaries.json')) as raw, \
+            JsonArrayWriter(os.path.join(scraper.root_dir, 'scraper/progress.json')) as progress, \
+            contextlib.ExitStack() as stack:
+        exports = [stack.enter_context(writer) for writer in scraper.export_writers()]
+        for summary in summaries:
+            ts.write(summary)
+            raw.write(summary)
+            progress.write(summary)
+            for writer in exports:
+                writer.write(summary)
+    logging.info(f"Saved {raw.count} summaries to {output_path}")
+    scraper.save_change_report(ts.report)
+    scraper.report_exports(exports)
+    logging.info("Saved raw data to scraper/summaries.json")
+
+def save_shard(args, scraper, indexed_urls, total, summaries):
+    """Write this shard's partial result for a later --merge"""
+    index, count = args.shard
+    path = shard_path(args.shard_dir or os.path.join(scraper.root_dir, 'scraper/shards'), index, count)
+    write_shard(path, index, count, total, indexed_urls, summaries)
+    logging.info(f"Saved shard {index}/{count} ({len(summaries)} summaries) to {path}")
+
+def merge_outputs(scraper, shard_dir):
+    """Merge the shard files in shard_dir into summaries.json and the TypeScript module"""
+    try:
+        summaries = merge_shards(shard_dir)
+    except ValueError as e:
+        logging.error(str(e))
         return
+    logging.info(f"Merged shards from {shard_dir}")
+    save_outputs(scraper, summaries)
+
+def load_urls(args, scraper, tree_file_path):
+    """The URL list of a run: a JSON list given with --urls, or the URLs generated from the tree file"""
+    if args.urls:
+        with open(args.urls, encoding='utf-8') as f:
+            urls = json.load(f)
+        logging.info(f"Loaded {len(urls)} URLs from {args.urls}")
+        return urls
+    logging.info("Extracting URLs from tree file...")
+    return scraper.extract_urls_from_tree(tree_file_path, quiet=args.quiet_tree)
+
+def write_metrics(metrics, metrics_dir):
+    """Write the run metrics as JSON and Prometheus text"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    json_path = os.path.join(metrics_dir, 'metrics.json')
+    prometheus_path = os.path.join(metrics_dir, 'metrics.prom')
+    metrics.write(json_path, prometheus_path)
+    logging.info(f"Metrics saved to {json_path} and {prometheus_path}")
+
+def shard_arg(text):
+    """argparse type for --shard"""
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and scrape DiscoverJesus.com summaries")
+    parser.add_argument('--batch', action='store_true',
+                        help="Non-interactive: scrape the valid URLs without the confirmation prompt, "
+                             "skipping invalid ones")
+    parser.add_argument('--shard', type=shard_arg, default=None, metavar='I/N',
+                        help="Only process shard I of N (0-based, stable hash of the URL) and write a partial "
+                             "result for --merge instead of the output files (implies --batch)")
+    parser.add_argument('--shard-dir', default=None,
+                        help="Directory of the shard files (default: scraper/shards)")
+    parser.add_argument('--merge', nargs='?', const='', default=None, metavar='SHARD_DIR',
+                        help="Merge the shard files (default directory: scraper/shards) into summaries.json "
+                             "and the TypeScript module, then exit")
+    parser.add_argument('--sitemap', nargs='?', const='', default=None, metavar='URL',
+                        help="Resolve the generated URLs against the site's sitemaps "
+                             "(default URL: <base>/sitemap.xml) and record their lastmod")
+    parser.add_argument('--incremental', action='store_true',
+                        help="With --sitemap, only re-scrape pages whose lastmod moved since the last run")
+    parser.add_argument('--urls', default=None,
+                        help="Read the URL list from a JSON file (e.g. scraper/valid_urls.json) instead of "
+                             "the tree file")
+    parser.add_argument('--quiet-tree', action='store_true',
+                        help="Only log the summary of the tree file, not every entry (entries are logged at DEBUG)")
+    parser.add_argument('--log-level', choices=LEVELS, default='INFO',
+                        help="INFO logs what the run did; DEBUG adds every request, tree entry and extracted "
+                             "field (to the terminal and scraper/logs)")
+    parser.add_argument('--concurrency', type=int, default=0,
+                        help="Scrape with the asyncio engine, keeping this many requests in flight per host "
+                             "(default: 0, one URL at a time)")
+    parser.add_argument('--max-rps', type=float, default=None,
+                        help="Requests/sec ceiling for scraping: the most the adaptive controller may reach "
+                             "(default 10), or a fixed limit with --fixed-rate (default 2, 0 disables it)")
+    parser.add_argument('--initial-rps', type=float, default=None,
+                        help="Requests/sec the adaptive controller starts from "
+                             "(default: --validate-rps, or --max-rps when that is 0)")
+    parser.add_argument('--fixed-rate', action='store_true',
+                        help="Use fixed limits (--max-rps, --validate-rps, 2s between sequential pages) "
+                             "instead of adapting to 429/503 responses and latency")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Scrape through the fetch -> parse -> emit pipeline with this many parser processes "
+                             "(fetchers: --concurrency, default 4)")
+    parser.add_argument('--fetch-queue', type=int, default=32,
+                        help="Pipeline backpressure: downloaded pages allowed to wait for a parser")
+    parser.add_argument('--parse-backlog', type=int, default=64,
+                        help="Pipeline backpressure: pages allowed in the parser pool or waiting for the writer")
+    parser.add_argument('--stream', action='store_true',
+                        help="Bounded-memory scrape: summaries stream to the output files in chunks instead of "
+                             "being collected first (not with --fused or --shard)")
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help="URLs scraped per chunk with --stream")
+    parser.add_argument('--fused', action='store_true',
+                        help="Validate and scrape with a single GET per URL and skip the confirmation prompt")
+    parser.add_argument('--bundles', nargs='?', const='', default=None, metavar='DIR',
+                        help="Also write per-category JSON bundles and a manifest for lazy loading "
+                             "(default DIR: public/discover-jesus)")
+    parser.add_argument('--bundle-strategy', choices=BUNDLE_STRATEGIES, default='category',
+                        help="Group bundles by id category or into --bundle-buckets hash buckets")
+    parser.add_argument('--bundle-buckets', type=int, default=16,
+                        help="Number of bundles with --bundle-strategy hash")
+    parser.add_argument('--search-index', nargs='?', const='', default=None, metavar='DIR',
+                        help="Also write the full-text search index of the summaries and Urantia papers "
+                             "(default DIR: public/search)")
+    parser.add_argument('--validate-workers', type=int, default=8,
+                        help="Number of concurrent URL validation workers")
+    parser.add_argument('--validate-rps', type=float, default=5.0,
+                        help="With --fixed-rate: requests/sec ceiling shared by all validation workers "
+                             "(0 disables the limit); otherwise the rate the adaptive controller starts from")
+    parser.add_argument('--no-auto-correct', action='store_true',
+                        help="Only suggest corrections for URLs that were not found; do not apply them")
+    parser.add_argument('--auto-correct-score', type=float, default=AUTO_MIN_SCORE,
+                        help="Trigram similarity a suggested correction needs to be applied automatically")
+    parser.add_argument('--parser', choices=PARSER_ENGINES, default='html.parser',
+                        help="HTML parsing engine: the built-in parser, lxml, or a SoupStrainer-limited parse")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Append-only JSONL record of every scraped URL (default: scraper/checkpoint.jsonl)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Keep the existing checkpoint and only scrape URLs that failed or are missing from it")
+    parser.add_argument('--metrics-dir', default=None,
+                        help="Record run metrics and write metrics.json and metrics.prom to this directory")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Directory of the persistent response cache (default: scraper/cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always download pages in full and do not touch the response cache")
+    parser.add_argument('--cache-max-mb', type=float, default=200,
+                        help="Evict least recently used cache entries beyond this size")
+    parser.add_argument('--cache-max-age-days', type=float, default=30,
+                        help="Evict cache entries not revalidated within this many days")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve pages only from the response cache (implies --fused)")
+    parser.add_argument('--reextract', nargs='?', const='', default=None, metavar='CAPTURE_DIR',
+                        help="Rebuild the outputs from the pages in the response cache (or in the capture "
+                             "archive CAPTURE_DIR) with the current extraction rules, without any request, "
+                             "then exit")
+    parser.add_argument('--capture', nargs='?', const='', default=None, metavar='DIR',
+                        help="Archive every downloaded page, compressed and with its headers, in WARC files "
+                             "keyed by URL (default DIR: scraper/captures; read them with capture.py)")
+    parser.add_argument('--capture-max-mb', type=float, default=64,
+                        help="Start a new capture archive file beyond this size")
+    return parser.parse_args(argv)
+
+def open_cache(args, root_dir):
+    """Open the response cache configured on the command line, or None"""
+    if args.no_cache:
+        return None
+    cache_dir = args.cache_dir or os.path.join(root_dir, 'scraper/cache')
+    return ResponseCache(
+        os.path.join(cache_dir, 'responses.sqlite'),
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        max_age=args.cache_max_age_days * 24 * 3600,
+        offline=args.offline,
+    )
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # Set up logging
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_dir = os.path.join(DEFAULT_ROOT_DIR, 'scraper/logs')
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f'url_validation_{timestamp}.log')
+    
+    # Records are written by a listener thread, off the fetch and parse threads
+    with QueuedLogging(args.log_level, log_file):
+        execute(args, timestamp, log_file)
+
+def execute(args, timestamp, log_file):
+    """Everything main() does once logging is set up"""
+    tree_file_path = "docs/New Series/tree-level6.txt"
+    logging.info(f"Starting URL validation from {tree_file_path}")
     
-    # Ask to proceed with scraping only if we haven't found invalid URLs
-    if len(invalid_urls) > 0:
-        logging.warning("\nPlease fix invalid URLs before proceeding with scraping.")
+    try:
+        scraper = DiscoverJesusScraper(parser_engine=args.parser)
+    except ValueError as e:
+        logging.error(str(e))
         return
-        
-    proceed = input("\nDo you want to proceed with scraping the valid URLs? (y/n): ")
-    if proceed.lower() != 'y':
-        logging.info("Exiting before scraping...")
+    if args.bundles is not None:
+        # public/ of the app, two levels above root_dir (src/data)
+        scraper.bundle_dir = args.bundles or os.path.join(
+            os.path.dirname(os.path.dirname(scraper.root_dir)), 'public/discover-jesus'
+        )
+        scraper.bundle_strategy = args.bundle_strategy
+        scraper.bundle_buckets = args.bundle_buckets
+    if args.search_index is not None:
+        scraper.search_dir = args.search_index or os.path.join(
+            os.path.dirname(os.path.dirname(scraper.root_dir)), 'public/search'
+        )
+    # Corrections applied automatically by earlier runs (see auto_correct)
+    for old_path, correction in load_auto_corrections(
+            os.path.join(scraper.root_dir, 'scraper/auto_corrections.json')).items():
+        scraper.url_corrections.setdefault(old_path, correction["to"])
+    if args.merge is not None:
+        merge_outputs(scraper, args.merge or args.shard_dir or os.path.join(scraper.root_dir, 'scraper/shards'))
+        return
+    if args.shard:
+        args.batch = True
+    if args.incremental:
+        if args.shard:
+            logging.error("--incremental reuses the previous summaries.json and cannot be used with --shard")
+            return
+        if args.sitemap is None:
+            args.sitemap = ''
+    if args.reextract:
+        # Replay a capture archive: the response cache is not needed
+        try:
+            save_outputs(scraper, reextract(scraper, CaptureReader(args.reextract)))
+        finally:
+            if scraper.selector_stats:
+                logging.info(f"Selector paths: {dict(sorted(scraper.selector_stats.items()))}")
         return
+    if args.reextract is not None:
+        if args.no_cache:
+            logging.error("--reextract reads the response cache; drop --no-cache")
+            return
+        # Read the cache as it is: no requests, and nothing pruned on open
+        args.offline = True
+    scraper.cache = open_cache(args, scraper.root_dir)
+    if args.reextract is not None:
+        try:
+            save_outputs(scraper, reextract(scraper))
+        finally:
+            if scraper.selector_stats:
+                logging.info(f"Selector paths: {dict(sorted(scraper.selector_stats.items()))}")
+            scraper.cache.close()
+        return
+    if args.offline:
+        if scraper.cache is None:
+            logging.error("--offline needs the response cache; drop --no-cache")
+            return
+        # There is nothing to HEAD offline, so validate from the cache in the fused pass
+        args.fused = True
+        # ...and no server to be polite to
+        args.fixed_rate = True
+        args.validate_rps = 0
+    if args.fixed_rate:
+        if args.max_rps is None:
+            args.max_rps = 2.0
+    else:
+        # Validation comes first, so start where its fixed limit was and let AIMD
+        # back off from there rather than climb from a crawl
+        max_rate = args.max_rps or 10.0
+        initial_rate = args.initial_rps if args.initial_rps is not None else (args.validate_rps or max_rate)
+        scraper.rate_controller = AdaptiveRateController(
+            initial_rate=initial_rate, max_rate=max_rate,
+            max_concurrency=max(args.validate_workers, args.concurrency or 4),
+        )
+    if args.metrics_dir:
+        scraper.metrics = Metrics()
+    scraper.checkpoint = Checkpoint(
+        args.checkpoint or os.path.join(scraper.root_dir, 'scraper/checkpoint.jsonl'), resume=args.resume
+    )
+    if args.capture is not None:
+        scraper.capture = CaptureWriter(
+            args.capture or os.path.join(scraper.root_dir, 'scraper/captures'),
+            max_bytes=int(args.capture_max_mb * 1024 * 1024),
+        )
+    
+    try:
+        run(args, scraper, tree_file_path, timestamp, log_file)
+    finally:
+        scraper.checkpoint.close()
+        if scraper.capture is not None:
+            # Writes out whatever is still queued
+            try:
+                scraper.capture.close()
+                logging.info(f"Captured {scraper.capture} to {scraper.capture.capture_dir}")
+            except OSError as e:
+                logging.error(f"Capture archive incomplete: {str(e)}")
+        if scraper.rate_controller is not None:
+            logging.info(f"Adaptive rate at exit: {scraper.rate_controller.snapshot()}")
+        if scraper.selector_stats:
+            logging.info(f"Selector paths: {dict(sorted(scraper.selector_stats.items()))}")
+        if scraper.cache is not None:
+            logging.info(f"Response cache: {dict(scraper.cache.stats)}")
+            for result, count in scraper.cache.stats.items():
+                scraper.metrics.inc('scraper_cache_total', count, result=result)
+            scraper.cache.close()
+        if args.metrics_dir:
+            write_metrics(scraper.metrics, args.metrics_dir)
+
+def run(args, scraper, tree_file_path, timestamp, log_file):
+    """Extract, validate and scrape the URLs for one run of main()"""
+    index = None
+    if args.sitemap is not None:
+        try:
+            index = scraper.discover_sitemap(args.sitemap or None)
+        except (requests.RequestException, ValueError) as e:
+            logging.warning(f"Could not read the sitemap ({e}); falling back to the generated URLs")
+    urls = load_urls(args, scraper, tree_file_path)
+    all_urls = urls
+    total = len(urls)
+    indexed_urls = None
+    if args.shard:
+        indexed_urls = select_shard(urls, *args.shard)
+        urls = [url for _, url in indexed_urls]
+        logging.info(f"Shard {args.shard[0]}/{args.shard[1]}: {len(urls)} of {total} URLs")
+    plan = None
+    if index is not None and not args.shard:
+        plan = plan_scrape(args, scraper, urls, index)
+        urls = plan.to_scrape
+        if plan.reused and not urls:
+            logging.info("No page changed since the last run")
+            emit_results(args, scraper, indexed_urls, total, list(plan.merge([])))
+            return
+    logging.info(f"Found {len(urls)} URLs to validate")
+    
+    if args.fused:
+        # One GET per URL: validate and parse in the same pass, no confirmation prompt
+        logging.info("\nValidating and scraping URLs in a single pass...")
+        validation_results, valid_urls, invalid_urls, summaries = validate_and_scrape(
+            scraper, urls, workers=args.validate_workers, max_rps=args.validate_rps, resume=args.resume
+        )
+        if invalid_urls:
+            corrected, fixed = auto_correct(args, scraper, urls, all_urls, validation_results, valid_urls, invalid_urls)
+            if corrected:
+                # Each corrected page in the place of the URL it corrects
+                position = {url: i for i, url in enumerate(valid_urls)}
+                summaries = sorted(summaries + fixed,
+                                   key=lambda summary: position.get(summary["sourceUrl"], len(position)))
+                scraper.save_progress(summaries)
+                indexed_urls, plan = correct_run(corrected, indexed_urls, plan)
+        write_validation_reports(scraper, urls, validation_results, run_valid_urls(plan, valid_urls), invalid_urls,
+                                 timestamp, log_file)
+        if invalid_urls:
+            logging.warning("\nSome URLs are invalid; only the valid pages were scraped.")
+        if plan is not None:
+            summaries = list(plan.merge(summaries))
+        emit_results(args, scraper, indexed_urls, total, summaries)
+        return
+    
+    # First, validate all URLs without scraping
+    logging.info("\nValidating URLs...")
+    validation_results, valid_urls, invalid_urls = validate_urls(
+        scraper, urls, workers=args.validate_workers, max_rps=args.validate_rps
+    )
+    if invalid_urls:
+        corrected, _ = auto_correct(args, scraper, urls, all_urls, validation_results, valid_urls, invalid_urls)
+        indexed_urls, plan = correct_run(corrected, indexed_urls, plan)
+    write_validation_reports(scraper, urls, validation_results, run_valid_urls(plan, valid_urls), invalid_urls,
+                             timestamp, log_file)
+    
+    if len(valid_urls) == 0:
+        logging.error("\nNo valid URLs found. Please check the URL generation logic.")
+        if args.shard:
+            # An empty shard still has to be there for the merge
+            emit_results(args, scraper, indexed_urls, total, [])
+        return
+    
+    if args.batch:
+        if invalid_urls:
+            logging.warning("\nSome URLs are invalid; only the valid pages will be scraped.")
+    else:
+        # Ask to proceed with scraping only if we haven't found invalid URLs
+        if len(invalid_urls) > 0:
+            logging.warning("\nPlease fix invalid URLs before proceeding with scraping.")
+            return
+            
+        proceed = input("\nDo you want to proceed with scraping the valid URLs? (y/n): ")
+        if proceed.lower() != 'y':
+            logging.info("Exiting before scraping...")
+            return
     
     logging.info("\nStarting full scrape...")
-    summaries = scraper.scrape_all(valid_urls)
+    pipeline = None
+    if args.parse_workers:
+        pipeline = ScrapePipeline(
+            scraper, fetchers=args.concurrency or 4, parse_workers=args.parse_workers, max_rps=args.max_rps,
+            fetch_queue=args.fetch_queue, parse_backlog=args.parse_backlog,
+        )
+    if args.stream and not args.shard:
+        summaries = scraper.scrape_stream(
+            valid_urls, concurrency=args.concurrency, max_rps=args.max_rps, resume=args.resume,
+            pipeline=pipeline, chunk_size=args.chunk_size,
+        )
+        if plan is not None:
+            summaries = plan.merge(summaries)
+        save_outputs_streaming(scraper, summaries)
+        return
     
-    # Save as TypeScript file
-    output_path = "src/data/discoverJesusSummaries.ts"
-    scraper.save_to_typescript(summaries, output_path)
-    print(f"\nSaved {len(summaries)} summaries to {output_path}")
+    summaries = scraper.scrape_all(
+        valid_urls, concurrency=args.concurrency, max_rps=args.max_rps, resume=args.resume, pipeline=pipeline
+    )
+    if plan is not None:
+        summaries = list(plan.merge(summaries))
     
-    # Save raw data as JSON
-    summaries_path = os.path.join(scraper.root_dir, 'scraper/summaries.json')
-    with open(summaries_path, 'w', encoding='utf-8') as f:
-        json.dump(summaries, f, indent=2)
-    print("Saved raw data to scraper/summaries.json")
+    emit_results(args, scraper, indexed_urls, total, summaries)
+
+def plan_scrape(args, scraper, urls, index):
+    """
+    The IncrementalPlan of a run with a sitemap: with --incremental, pages whose
+    lastmod has not moved since they were last scraped keep their summary from
+    scraper/summaries.json instead of being fetched again
+    """
+    previous = None
+    if args.incremental:
+        try:
+            with open(os.path.join(scraper.root_dir, 'scraper/summaries.json'), encoding='utf-8') as f:
+                previous = {summary["sourceUrl"]: summary for summary in json.load(f)}
+        except FileNotFoundError:
+            logging.info("No previous summaries; scraping every page")
+    state = ScrapeState(os.path.join(scraper.root_dir, 'scraper/sitemap_state.json'))
+    plan = IncrementalPlan(urls, index, state, previous)
+    if args.incremental:
+        logging.info(f"Incremental: {len(plan.to_scrape)} new or changed pages, {len(plan.reused)} unchanged")
+    return plan
+
+def correct_run(corrected, indexed_urls, plan):
+    """
+    Apply auto-corrections ({url: corrected url}) to a shard's (input index, url)
+    list and to the incremental plan, so each corrected page is written in the
+    place of the URL it corrects
+    """
+    if not corrected:
+        return indexed_urls, plan
+    if indexed_urls is not None:
+        indexed_urls = [(position, corrected.get(url, url)) for position, url in indexed_urls]
+    if plan is not None:
+        plan.urls = apply_corrections(plan.urls, corrected)
+    return indexed_urls, plan
+
+def run_valid_urls(plan, valid_urls):
+    """
+    The list for valid_urls.json: an incremental run only validates the pages that
+    changed, so the unchanged ones it reuses are added back
+    """
+    if plan is None:
+        return valid_urls
+    return plan.valid_urls(valid_urls)
+
+def emit_results(args, scraper, indexed_urls, total, summaries):
+    """Write the output files, or this shard's partial result in a sharded run"""
+    if args.shard:
+        save_shard(args, scraper, indexed_urls, total, summaries)
+    else:
+        save_outputs(scraper, summaries)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
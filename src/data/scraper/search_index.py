@@ -0,0 +1,274 @@
+"""
+Full-text search index built at export time, so the app can search every
+summary without scanning the text on each keystroke.
+
+Text is normalized (NFKD, accents and case dropped), split on anything that is
+not a letter or digit, stripped of stop words and stemmed with a small table of
+suffix rules. BM25 scores are computed here, with the title and short summary
+weighted above the full summary (BM25F-style), and quantized to 1..255.
+
+Output, in `public/search/` by default:
+- index.json: the tokenizer settings (stop words and stem rules, so the app
+  tokenizes queries exactly as the index was built), the document table and
+  the shard file of each term prefix
+- terms-<prefix>.<hash>.json: {term: postings} for the terms starting with
+  <prefix>. Postings are a flat list [doc delta, weight, doc delta, weight, ...]
+  over increasing document numbers, so the numbers stay small.
+
+SearchIndex reads the files back and answers queries the way
+src/utils/searchIndex.ts does.
+"""
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from outputs import compact_json, remove_stale, write_content_addressed, write_if_changed
+
+SEARCH_INDEX = 'index.json'
+
+STOPWORDS = frozenset((
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+    'can', 'could', 'did', 'do', 'for', 'from', 'had', 'has', 'have', 'he', 'her', 'him', 'his', 'how', 'i',
+    'if', 'in', 'into', 'is', 'it', 'its', 'more', 'most', 'not', 'of', 'on', 'one', 'or', 'our', 'she', 'so',
+    'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they', 'this', 'those', 'to',
+    'was', 'we', 'were', 'what', 'when', 'which', 'who', 'will', 'with', 'would', 'you', 'your',
+))
+
+# Passes of [suffix, replacement, shortest stem left, endings the rule skips];
+# in each pass the first rule that applies wins. Deliberately light (no
+# dictionary), so the TypeScript side can apply the same table.
+STEM_PASSES = (
+    (
+        ('sses', 'ss', 2, ()),
+        ('ies', 'y', 2, ()),
+        ('ings', '', 3, ()),
+        ('ing', '', 3, ()),
+        ('edly', '', 3, ()),
+        ('ed', '', 3, ()),
+        ('ness', '', 3, ()),
+        ('ly', '', 3, ()),
+        ('s', '', 3, ('ss', 'us', 'is')),
+    ),
+    (
+        ('e', '', 3, ()),
+    ),
+)
+
+# Term frequency weight of each field
+FIELD_BOOSTS = {'title': 3.0, 'short': 2.0, 'full': 1.0}
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lower case without accents: 'Jésus' -> 'jesus'"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.category(c).startswith('M')).lower()
+
+
+def stem(word):
+    for rules in STEM_PASSES:
+        for suffix, replacement, min_stem, skip in rules:
+            if (word.endswith(suffix) and len(word) - len(suffix) >= min_stem
+                    and not any(word.endswith(ending) for ending in skip)):
+                word = word[:-len(suffix)] + replacement
+                break
+    return word
+
+
+def words(text):
+    """Normalized words of a text, stop words and single characters included"""
+    return _TOKEN.findall(normalize(text))
+
+
+def tokenize(text):
+    """Index terms of a text"""
+    return [stem(word) for word in words(text) if len(word) > 1 and word not in STOPWORDS]
+
+
+class SearchIndexWriter:
+    """
+    Collects documents (fed one summary at a time like the other writers, plus
+    any extra documents) and writes the sharded index on close(). Only the term
+    counts of each document are kept, not its text.
+    """
+
+    def __init__(self, out_dir, prefix_length=1):
+        self.out_dir = out_dir
+        self.prefix_length = max(1, prefix_length)
+        # [id, title, kind] per document number
+        self.documents = []
+        self._numbers = {}
+        # Per document: weighted term frequencies and weighted length
+        self._frequencies = []
+        self._lengths = []
+        self.meta = None
+        self.written = []
+        self.removed = []
+
+    def add_document(self, doc_id, kind, title, short='', full=''):
+        """Add (or replace) a document with the text of its three fields"""
+        frequencies = Counter()
+        length = 0.0
+        for field, text in (('title', title), ('short', short), ('full', full)):
+            terms = tokenize(text or '')
+            boost = FIELD_BOOSTS[field]
+            for term in terms:
+                frequencies[term] += boost
+            length += boost * len(terms)
+        record = [doc_id, title, kind]
+        if doc_id in self._numbers:
+            number = self._numbers[doc_id]
+            self.documents[number] = record
+            self._frequencies[number] = frequencies
+            self._lengths[number] = length
+            return
+        self._numbers[doc_id] = len(self.documents)
+        self.documents.append(record)
+        self._frequencies.append(frequencies)
+        self._lengths.append(length)
+
+    def write(self, summary):
+        """Add a scraped DiscoverJesus summary"""
+        if not (summary["shortSummary"] or summary["fullSummary"]):
+            return
+        self.add_document(summary["id"], 'discover-jesus', summary.get("title") or summary["id"],
+                          summary["shortSummary"], summary["fullSummary"])
+
+    def _postings(self):
+        """term -> [(document number, BM25 score)] in document order"""
+        count = len(self.documents)
+        average = (sum(self._lengths) / count) if count else 0.0
+        document_frequency = Counter()
+        for frequencies in self._frequencies:
+            document_frequency.update(frequencies.keys())
+        postings = defaultdict(list)
+        for number, frequencies in enumerate(self._frequencies):
+            norm = K1 * (1 - B + B * self._lengths[number] / average) if average else K1
+            for term, tf in frequencies.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                postings[term].append((number, idf * tf * (K1 + 1) / (tf + norm)))
+        return postings
+
+    def close(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        postings = self._postings()
+        top = max((score for entries in postings.values() for _, score in entries), default=1.0)
+        scale = top / 255
+
+        shards = defaultdict(dict)
+        for term in sorted(postings):
+            flat = []
+            previous = 0
+            for number, score in postings[term]:
+                flat.extend((number - previous, max(1, round(score / scale))))
+                previous = number
+            shards[term[:self.prefix_length]][term] = flat
+
+        files = {}
+        for prefix in sorted(shards):
+            file_name, written = write_content_addressed(
+                self.out_dir, f"terms-{prefix}", compact_json(shards[prefix]).encode('utf-8')
+            )
+            files[prefix] = file_name
+            if written:
+                self.written.append(file_name)
+
+        self.meta = {
+            'version': 1,
+            'prefixLength': self.prefix_length,
+            'scale': scale,
+            'stopwords': sorted(STOPWORDS),
+            'stemPasses': [[list(rule[:3]) + [list(rule[3])] for rule in rules] for rules in STEM_PASSES],
+            'documents': self.documents,
+            'terms': len(postings),
+            'shards': files,
+        }
+        write_if_changed(os.path.join(self.out_dir, SEARCH_INDEX), compact_json(self.meta).encode('utf-8'))
+        self.removed = remove_stale(self.out_dir, set(files.values()))
+
+    def discard(self):
+        """Nothing is written before close()"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __str__(self):
+        return (f"{len(self.documents)} documents, {self.meta['terms']} terms in {len(self.meta['shards'])} shards, "
+                f"{len(self.written)} written, {len(self.removed)} removed")
+
+
+def add_urantia_papers(writer, path):
+    """Add the Urantia paper summaries (src/data/json/urantia_summaries.json) to a SearchIndexWriter"""
+    with open(path, encoding='utf-8') as f:
+        papers = json.load(f)
+    for paper in papers:
+        writer.add_document(f"paper/{paper['paper_number']}", 'urantia-paper', paper['title'],
+                            paper.get('episode_card', ''), paper.get('episode_page', ''))
+    return len(papers)
+
+
+class SearchIndex:
+    """
+    Reads an index written by SearchIndexWriter, loading each shard the first
+    time a query needs it. Every query term must match (AND); the last one also
+    matches as a prefix, for search-as-you-type.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        with open(os.path.join(out_dir, SEARCH_INDEX), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._shards = {}
+
+    def _shard(self, prefix):
+        if prefix not in self._shards:
+            file_name = self.meta['shards'].get(prefix)
+            shard = {}
+            if file_name:
+                with open(os.path.join(self.out_dir, file_name), encoding='utf-8') as f:
+                    shard = json.load(f)
+            self._shards[prefix] = shard
+        return self._shards[prefix]
+
+    def _scores(self, terms):
+        """document number -> quantized score summed over `terms`"""
+        scores = defaultdict(int)
+        for term in terms:
+            flat = self._shard(term[:self.meta['prefixLength']]).get(term, ())
+            number = 0
+            for i in range(0, len(flat), 2):
+                number += flat[i]
+                scores[number] += flat[i + 1]
+        return scores
+
+    def search(self, query, limit=10, prefix=True):
+        """[(document id, title, kind, score)] best first"""
+        raw = [word for word in words(query) if len(word) > 1 and word not in STOPWORDS]
+        if not raw:
+            return []
+        per_word = []
+        for position, word in enumerate(raw):
+            terms = {stem(word)}
+            if prefix and position == len(raw) - 1 and len(word) >= self.meta['prefixLength']:
+                terms.update(term for term in self._shard(word[:self.meta['prefixLength']])
+                             if term.startswith(word))
+            per_word.append(self._scores(terms))
+        matches = set(per_word[0]).intersection(*per_word[1:])
+        ranked = sorted(matches, key=lambda number: (-sum(scores[number] for scores in per_word), number))
+        return [
+            (*self.meta['documents'][number], round(sum(scores[number] for scores in per_word) * self.meta['scale'], 3))
+            for number in ranked[:limit]
+        ]
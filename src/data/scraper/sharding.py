@@ -0,0 +1,103 @@
+"""
+Split a crawl across machines and merge the partial results.
+
+A URL belongs to shard `sha1(url) % count`, so the split depends only on the URL
+and the shard count, never on the machine, the Python hash seed or the order of
+the input. Each shard writes shard-<index>-of-<count>.json with the position of
+every URL in the full input list (an auto-corrected page takes the position of
+the URL it corrects); merge_shards puts the results back in that order, so the
+merged output is byte-identical to an unsharded run whatever the number of shards.
+"""
+import glob
+import hashlib
+import json
+import os
+
+
+def parse_shard(text):
+    """Parse 'i/n' (0 <= i < n) into (index, count)"""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/n, got '{text}'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..{count - 1}, got '{text}'")
+    return index, count
+
+
+def shard_of(url, count):
+    """Stable shard number of a URL"""
+    digest = hashlib.sha1(url.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def select_shard(urls, index, count):
+    """[(input index, url)] of the URLs that belong to shard `index` of `count`"""
+    return [(position, url) for position, url in enumerate(urls) if shard_of(url, count) == index]
+
+
+def shard_path(shard_dir, index, count):
+    return os.path.join(shard_dir, f"shard-{index}-of-{count}.json")
+
+
+def write_shard(path, index, count, total, indexed_urls, summaries):
+    """
+    Write one shard's partial result: every URL of the shard with its input index
+    and its summary (None for pages that were invalid, empty or failed)
+    """
+    by_url = {summary["sourceUrl"]: summary for summary in summaries}
+    shard = {
+        "shard": index,
+        "count": count,
+        "total": total,
+        "results": [
+            {"index": position, "url": url, "summary": by_url.get(url)}
+            for position, url in indexed_urls
+        ],
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(shard, f, indent=2)
+
+
+def merge_shards(shard_dir):
+    """
+    Combine every shard file in a directory into the summaries list of an
+    unsharded run. Raises ValueError if shards are missing, repeated or were
+    cut from different URL lists.
+    """
+    paths = sorted(glob.glob(os.path.join(shard_dir, 'shard-*-of-*.json')))
+    if not paths:
+        raise ValueError(f"No shard files in {shard_dir}")
+
+    shards = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            shard = json.load(f)
+        key = (shard["count"], shard["total"])
+        if shards and key != next(iter(shards.values()))[0]:
+            raise ValueError(f"{path} was cut from a different URL list or shard count")
+        shards[shard["shard"]] = (key, shard)
+
+    count, total = next(iter(shards.values()))[0]
+    missing = sorted(set(range(count)) - set(shards))
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(map(str, missing))} of {count} in {shard_dir}")
+
+    results = {}
+    for _, shard in shards.values():
+        for result in shard["results"]:
+            results[result["index"]] = result
+    if sorted(results) != list(range(total)):
+        raise ValueError(f"Shards cover {len(results)} of {total} URLs")
+
+    # A page can be in two places (an auto-corrected URL that is also in the list);
+    # an unsharded run keeps it at the first
+    summaries = []
+    seen = set()
+    for position in range(total):
+        summary = results[position]["summary"]
+        if summary and summary["sourceUrl"] not in seen:
+            seen.add(summary["sourceUrl"])
+            summaries.append(summary)
+    return summaries
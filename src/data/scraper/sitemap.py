@@ -0,0 +1,235 @@
+"""
+Discovery from the site's sitemaps.
+
+fetch_sitemaps reads /sitemap.xml (a <sitemapindex> of child sitemaps, or a
+plain <urlset>) once per run into a SitemapIndex: every /<category>/<slug> page
+the site lists, with its <lastmod>. URLs generated from the tree are resolved
+against it, so a guess in the wrong category is corrected and a guess for a
+page that does not exist is dropped without a 404 round trip. The index is
+saved to scraper/sitemap_index.json.
+
+ScrapeState remembers the lastmod each page had when it was last scraped, so an
+incremental run only re-scrapes pages whose lastmod has moved and reuses the
+previous summaries of the others.
+"""
+import gzip
+import json
+import os
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+_MAX_SITEMAPS = 1000
+
+
+def _local(tag):
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap(content):
+    """
+    Parse one sitemap document (bytes, optionally gzipped) into (kind, entries),
+    kind being 'sitemapindex' or 'urlset' and entries a list of (loc, lastmod or None)
+    """
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    root = ET.fromstring(content)
+    kind = _local(root.tag)
+    if kind not in ('sitemapindex', 'urlset'):
+        raise ValueError(f"Not a sitemap: <{kind}>")
+    entries = []
+    for element in root:
+        loc = lastmod = None
+        for child in element:
+            name = _local(child.tag)
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = (child.text or '').strip() or None
+        if loc:
+            entries.append((loc, lastmod))
+    return kind, entries
+
+
+def page_path(url):
+    """'category/slug' of a page URL, or None for anything else (home page, feeds, ...)"""
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if len(parts) != 2:
+        return None
+    return f"{parts[0]}/{parts[1]}"
+
+
+class SitemapIndex:
+    """Pages listed in the sitemaps: path -> (url, lastmod), and slug -> paths"""
+
+    def __init__(self, pages=None, sources=()):
+        # 'category/slug' -> {'url': ..., 'lastmod': ...}
+        self.pages = dict(pages or {})
+        self.sources = list(sources)
+        self._by_slug = {}
+        for path in self.pages:
+            self._by_slug.setdefault(path.split('/', 1)[1], []).append(path)
+
+    def add(self, url, lastmod):
+        path = page_path(url)
+        if path is None:
+            return
+        if path not in self.pages:
+            self._by_slug.setdefault(path.split('/', 1)[1], []).append(path)
+        self.pages[path] = {'url': url, 'lastmod': lastmod}
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, path):
+        return path in self.pages
+
+    def lastmod(self, url):
+        entry = self.pages.get(page_path(url))
+        return entry['lastmod'] if entry else None
+
+    def resolve(self, path):
+        """
+        The listed path for a generated 'category/slug': the path itself, the same
+        slug under the one other category that lists it, or None if the site has
+        no such page
+        """
+        if path in self.pages:
+            return path
+        candidates = self._by_slug.get(path.split('/', 1)[-1], [])
+        if len(candidates) == 1:
+            return candidates[0]
+        return None
+
+    def to_dict(self):
+        return {'sources': self.sources, 'pages': dict(sorted(self.pages.items()))}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['pages'], data.get('sources', ()))
+
+
+def fetch_sitemaps(fetch, root_url):
+    """
+    Build a SitemapIndex from root_url and every sitemap it points to.
+    `fetch(url)` returns the body of a URL as bytes (and raises on failure).
+    """
+    index = SitemapIndex()
+    queue = [root_url]
+    seen = set()
+    while queue:
+        url = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        if len(seen) > _MAX_SITEMAPS:
+            raise ValueError(f"More than {_MAX_SITEMAPS} sitemaps under {root_url}")
+        kind, entries = parse_sitemap(fetch(url))
+        index.sources.append(url)
+        if kind == 'sitemapindex':
+            queue.extend(loc for loc, _ in entries)
+        else:
+            for loc, lastmod in entries:
+                index.add(loc, lastmod)
+    return index
+
+
+class ScrapeState:
+    """
+    url -> lastmod of the page when it was last scraped successfully, saved as
+    JSON. A page needs scraping when it was never scraped, or its lastmod is
+    unknown or different now.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.scraped = json.load(f)
+        except FileNotFoundError:
+            self.scraped = {}
+
+    def is_current(self, url, lastmod):
+        return lastmod is not None and self.scraped.get(url) == lastmod
+
+    def update(self, lastmods):
+        """Replace the state with url -> lastmod of the pages that have a summary now"""
+        self.scraped = dict(sorted(lastmods.items()))
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(f"{self.path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.scraped, f, indent=2)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class IncrementalPlan:
+    """
+    Which of a run's URLs to scrape, and the summaries to reuse for the others.
+    With `previous` (url -> summary of the last run), a page is reused when its
+    sitemap lastmod is the one it had when it was last scraped; without it every
+    URL is scraped. Either way, merge() records the lastmod of every page that
+    ends up with a summary, as the baseline of the next incremental run.
+    """
+
+    def __init__(self, urls, index, state, previous=None):
+        self.urls = list(urls)
+        self.index = index
+        self.state = state
+        self.to_scrape = []
+        self.reused = {}
+        for url in self.urls:
+            summary = (previous or {}).get(url)
+            if summary is not None and state.is_current(url, index.lastmod(url)):
+                self.reused[url] = summary
+            else:
+                self.to_scrape.append(url)
+
+    def valid_urls(self, validated):
+        """
+        Every valid URL of the run in input order: the reused pages (valid when they
+        were last scraped) and `validated`, the ones checked this run. URLs that are
+        not in the input (e.g. auto-corrected ones) come last.
+        """
+        checked = set(validated)
+        valid = [url for url in self.urls if url in self.reused or url in checked]
+        listed = set(valid)
+        return valid + [url for url in validated if url not in listed]
+
+    def merge(self, scraped):
+        """
+        Yield the summaries of every URL in input order (reused or from `scraped`)
+        and save the scrape state once they have all been consumed
+        """
+        lastmods = {}
+        for summary in merge_in_order(self.urls, self.reused, scraped):
+            lastmod = self.index.lastmod(summary["sourceUrl"])
+            if lastmod is not None:
+                lastmods[summary["sourceUrl"]] = lastmod
+            yield summary
+        self.state.update(lastmods)
+
+
+def merge_in_order(urls, reused, scraped):
+    """
+    Yield the summaries of `urls` in order, taking each from `reused` or from
+    `scraped` (an iterable of the new summaries, in the order of their URLs)
+    """
+    scraped = iter(scraped)
+    pending = next(scraped, None)
+    for url in urls:
+        if url in reused:
+            yield reused[url]
+        elif pending is not None and pending["sourceUrl"] == url:
+            yield pending
+            pending = next(scraped, None)
+    # Anything left over (e.g. a sourceUrl that does not match its request URL)
+    while pending is not None:
+        yield pending
+        pending = next(scraped, None)
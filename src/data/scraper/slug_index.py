@@ -0,0 +1,140 @@
+"""
+Character-trigram index over the known-good page paths, used to suggest (and,
+when the match is unambiguous, apply) a correction for a URL that failed
+validation: `pilate-s-last-appeal-and-surrender` -> `pilates-last-appeal-and-surrender`.
+
+Slugs are compared on their trigrams (padded like PostgreSQL's pg_trgm, so the
+start and end of a slug weigh more) with the Jaccard similarity of the two sets.
+The index maps each trigram to the slugs that contain it. A slug scoring at
+least `min_score` against a query of n trigrams must share one of the query's
+n - ceil(min_score * n) + 1 rarest trigrams (prefix filtering), so a lookup only
+reads those posting lists and scores the few slugs found there.
+"""
+import heapq
+import json
+import math
+import os
+from collections import defaultdict
+from itertools import chain
+from urllib.parse import urlparse
+
+# A match is applied automatically when it scores at least this much...
+AUTO_MIN_SCORE = 0.6
+# ...and beats the runner-up by this margin
+AUTO_MIN_MARGIN = 0.1
+# Candidates scoring less than this are not worth showing
+MIN_SCORE = 0.2
+
+
+def trigrams(slug):
+    """Set of character trigrams of a slug, padded with two spaces in front and one behind"""
+    padded = f"  {slug.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_path(path):
+    """('category', 'slug') of 'category/slug' (category '' for a bare slug)"""
+    category, _, slug = path.strip('/').rpartition('/')
+    return category, slug
+
+
+class SlugIndex:
+    """Top-k trigram similarity search over 'category/slug' paths"""
+
+    def __init__(self, paths=()):
+        self.paths = []
+        self._grams = []
+        self._postings = defaultdict(list)
+        self._known = set()
+        for path in paths:
+            self.add(path)
+
+    def add(self, path):
+        path = path.strip('/')
+        if path in self._known or not split_path(path)[1]:
+            return
+        self._known.add(path)
+        grams = trigrams(split_path(path)[1])
+        position = len(self.paths)
+        self.paths.append(path)
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings[gram].append(position)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path.strip('/') in self._known
+
+    def search(self, path, k=5, min_score=MIN_SCORE):
+        """
+        [(path, score)] of the k known paths whose slug is most similar to the slug
+        of `path` (and scores at least min_score), best first. On equal scores a
+        path in the same category wins, then the paths in sorted order, so the
+        result does not depend on the order the paths were added in.
+        """
+        category, slug = split_path(path)
+        grams = sorted(trigrams(slug), key=lambda gram: len(self._postings.get(gram, ())))
+        prefix = len(grams) - math.ceil(min_score * len(grams)) + 1
+        query = set(grams)
+        # ...and have between min_score * n and n / min_score trigrams itself
+        shortest, longest = min_score * len(query), len(query) / min_score
+        scored = []
+        for position in set(chain.from_iterable(self._postings.get(gram, ()) for gram in grams[:prefix])):
+            if not shortest <= len(self._grams[position]) <= longest:
+                continue
+            overlap = len(query & self._grams[position])
+            score = overlap / (len(query) + len(self._grams[position]) - overlap)
+            if score >= min_score:
+                scored.append((-score, split_path(self.paths[position])[0] != category, self.paths[position]))
+        return [(found, round(-score, 3)) for score, _, found in heapq.nsmallest(k, scored)]
+
+    @staticmethod
+    def confident(candidates, min_score=AUTO_MIN_SCORE, min_margin=AUTO_MIN_MARGIN):
+        """The best candidate if it is safe to apply without review, else None"""
+        if not candidates or candidates[0][1] < min_score:
+            return None
+        if len(candidates) > 1 and candidates[0][1] - candidates[1][1] < min_margin:
+            return None
+        return candidates[0][0]
+
+
+def url_path(url):
+    return urlparse(url).path.strip('/')
+
+
+def known_paths(root_dir, sitemap=None):
+    """
+    Paths of the pages known to exist: the last run's valid_urls.json and
+    summaries.json, and the sitemap index when one was read
+    """
+    paths = []
+    try:
+        with open(os.path.join(root_dir, 'scraper/valid_urls.json'), encoding='utf-8') as f:
+            paths.extend(url_path(url) for url in json.load(f))
+    except FileNotFoundError:
+        pass
+    try:
+        with open(os.path.join(root_dir, 'scraper/summaries.json'), encoding='utf-8') as f:
+            paths.extend(url_path(summary["sourceUrl"]) for summary in json.load(f))
+    except FileNotFoundError:
+        pass
+    if sitemap is not None:
+        paths.extend(sitemap.pages)
+    return paths
+
+
+def apply_corrections(urls, corrections):
+    """
+    `urls` with each corrected URL ({url: corrected url}) in the place of the URL
+    it corrects, keeping only the first occurrence of a URL
+    """
+    seen = set()
+    corrected = []
+    for url in urls:
+        url = corrections.get(url, url)
+        if url not in seen:
+            seen.add(url)
+            corrected.append(url)
+    return corrected
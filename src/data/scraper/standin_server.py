@@ -0,0 +1,268 @@
+"""
+Local stand-in for discoverjesus.com used by the scraper benchmarks.
+
+Serves either a fixed set of pages (path -> HTML), the pages of a capture
+archive (see capture.py) or a directory of saved .html files (matched on the
+last path segment), or a synthetic page for any
+/<category>/<slug> path (shaped by `synthetic_options`, see synthetic_page). Pages carry an ETag (unless
+`etags` is off) and, with `last_modified` (an HTTP date), a Last-Modified header; conditional requests
+are answered with 304 Not Modified.
+
+With `sitemap_entries` ([(path, lastmod)]) it also serves /sitemap.xml, a
+sitemap index over /sitemap-<n>.xml files of `sitemap_page_size` URLs each,
+built on every request so a test can move a lastmod between runs. `sitemaps`
+serves fixed documents instead (path -> XML text, e.g. a saved sitemap file).
+
+Faults can be injected to exercise the scraper's error handling:
+- latency (+ uniform jitter) on every request
+- a fraction of requests answered with 429 (with Retry-After) or 503
+- permanent 301 redirects from one path to another
+"""
+import glob
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape
+
+from capture import CaptureReader
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def sitemap_xml(kind, entries):
+    """A <urlset> (kind 'url') or <sitemapindex> (kind 'sitemap') of (loc, lastmod) entries"""
+    root = 'urlset' if kind == 'url' else 'sitemapindex'
+    items = ''.join(
+        f"<{kind}><loc>{escape(loc)}</loc>{f'<lastmod>{escape(lastmod)}</lastmod>' if lastmod else ''}</{kind}>\n"
+        for loc, lastmod in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<{root} xmlns="{SITEMAP_NS}">\n{items}</{root}>\n'
+
+
+def synthetic_page(path, boilerplate=0, paragraphs=0):
+    """
+    Build a page with the same structure as a DiscoverJesus entry.
+    `boilerplate` adds that many navigation links around the entry so page size
+    and node count get closer to the real WordPress pages; `paragraphs` adds that
+    many paragraphs to the full summary.
+    """
+    slug = path.rstrip('/').split('/')[-1] or 'index'
+    title = slug.replace('-', ' ').title()
+    nav = ''.join(
+        f'<li class="menu-item"><a href="/topic/item-{i}">Menu item {i}</a></li>\n' for i in range(boilerplate)
+    )
+    extra = ''.join(
+        f'<p>Paragraph {i} about {title}: the full summary of a real entry runs to several '
+        f'paragraphs of narrative, each a few hundred characters long, like this one.</p>\n'
+        for i in range(paragraphs)
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>{title} | Discover Jesus</title></head>
+<body>
+<nav class="site-navigation"><ul>
+{nav}</ul></nav>
+<article class="entry">
+<h1 class="entry-title">{title}</h1>
+<div class="entry-subtitle">A short summary of {title}.</div>
+<div class="summary-section">
+<p>{title} is described at length in the full summary section.</p>
+<p>This page is served by the local stand-in server.</p>
+{extra}</div>
+</article>
+</body>
+</html>
+"""
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def _respond(self, include_body):
+        standin = self.server.standin
+        delay, fault = standin.plan_request()
+        if delay:
+            time.sleep(delay)
+
+        path = self.path.split('?', 1)[0]
+        if fault == 429:
+            self._send(429, b'Too Many Requests', 'text/plain', include_body,
+                       {'Retry-After': str(standin.retry_after)})
+            return
+        if fault == 503:
+            self._send(503, b'Service Unavailable', 'text/plain', include_body)
+            return
+        sitemap = standin.sitemap_for(path)
+        if sitemap is not None:
+            self._send(200, sitemap.encode('utf-8'), 'application/xml; charset=utf-8', include_body)
+            return
+        if path in standin.redirects:
+            self._send(301, b'', 'text/plain', include_body, {'Location': standin.redirects[path]})
+            return
+
+        html = standin.page_for(path)
+        if html is None:
+            self._send(404, b'Not Found', 'text/plain', include_body)
+            return
+        body = html.encode('utf-8')
+        validators = {}
+        if standin.etags:
+            validators['ETag'] = '"%s"' % hashlib.md5(body).hexdigest()
+        if standin.last_modified:
+            validators['Last-Modified'] = standin.last_modified
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if 'If-None-Match' in self.headers:
+            not_modified = self.headers['If-None-Match'] == validators.get('ETag')
+        else:
+            not_modified = standin.last_modified is not None and \
+                self.headers.get('If-Modified-Since') == standin.last_modified
+        if not_modified:
+            self._send(304, b'', 'text/html; charset=utf-8', False, validators)
+            return
+        self._send(200, body, 'text/html; charset=utf-8', include_body, validators)
+
+    def _send(self, status, body, content_type, include_body, headers=None):
+        self.server.standin.count_status(status)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+class StandInServer:
+    """Threaded HTTP server that stands in for discoverjesus.com on localhost"""
+
+    def __init__(self, pages=None, latency=0.0, jitter=0.0, rate_429=0.0, rate_503=0.0,
+                 retry_after=1, redirects=None, pages_by_slug=None, seed=0, host='127.0.0.1', port=0,
+                 synthetic_options=None, sitemap_entries=None, sitemap_page_size=1000, sitemaps=None,
+                 etags=True, last_modified=None):
+        self.pages = pages
+        self.pages_by_slug = pages_by_slug
+        # synthetic_page keyword arguments for the pages generated on the fly
+        self.synthetic_options = dict(synthetic_options or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.retry_after = retry_after
+        # Validators sent with every page
+        self.etags = etags
+        self.last_modified = last_modified
+        # path -> path answered with a 301
+        self.redirects = dict(redirects or {})
+        # [(path, lastmod)] listed by the generated sitemaps, and fixed sitemap documents
+        self.sitemap_entries = list(sitemap_entries) if sitemap_entries is not None else None
+        self.sitemap_page_size = sitemap_page_size
+        self.sitemaps = dict(sitemaps or {})
+        self.requests_served = 0
+        self.status_counts = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self._thread = None
+
+    @classmethod
+    def from_captures(cls, capture_dir, **kwargs):
+        """Serve the pages of a capture archive (e.g. scraper/captures/) at their own paths"""
+        reader = CaptureReader(capture_dir)
+        return cls(pages={urlparse(capture.url).path: capture.text for capture in reader}, **kwargs)
+
+    @classmethod
+    def from_directory(cls, html_dir, **kwargs):
+        """Serve the pages saved in a directory of .html files by their last path segment"""
+        pages_by_slug = {}
+        for path in glob.glob(os.path.join(html_dir, '*.html')):
+            with open(path, encoding='utf-8') as f:
+                pages_by_slug[os.path.splitext(os.path.basename(path))[0]] = f.read()
+        return cls(pages_by_slug=pages_by_slug, **kwargs)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_for(self, path):
+        """Return the HTML for a request path, or None for a 404"""
+        path = path.split('?', 1)[0]
+        if self.pages_by_slug is not None:
+            return self.pages_by_slug.get(path.rstrip('/').split('/')[-1])
+        if self.pages is None:
+            return synthetic_page(path, **self.synthetic_options)
+        return self.pages.get(path)
+
+    def sitemap_for(self, path):
+        """Return the XML of a sitemap path, or None if it is not one"""
+        if path in self.sitemaps:
+            return self.sitemaps[path]
+        if self.sitemap_entries is None:
+            return None
+        entries = list(self.sitemap_entries)
+        size = max(1, self.sitemap_page_size)
+        pages = [entries[start:start + size] for start in range(0, len(entries), size)] or [[]]
+        if path == '/sitemap.xml':
+            return sitemap_xml('sitemap', [
+                (f"{self.base_url}/sitemap-{number}.xml", max((lastmod or '' for _, lastmod in page), default='') or None)
+                for number, page in enumerate(pages, 1)
+            ])
+        if path.startswith('/sitemap-') and path.endswith('.xml'):
+            number = path[len('/sitemap-'):-len('.xml')]
+            if number.isdigit() and 1 <= int(number) <= len(pages):
+                return sitemap_xml('url', [
+                    (f"{self.base_url}/{page_path.lstrip('/')}", lastmod)
+                    for page_path, lastmod in pages[int(number) - 1]
+                ])
+        return None
+
+    def plan_request(self):
+        """Count a request and decide its delay and injected fault (429, 503 or None)"""
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.rate_503:
+            return delay, 503
+        return delay, None
+
+    def count_status(self, status):
+        with self._lock:
+            self.status_counts[status] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
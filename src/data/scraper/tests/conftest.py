@@ -0,0 +1,26 @@
+"""Shared fixtures for the scraper tests"""
+import os
+import sys
+
+import pytest
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scraper modules import each other as top-level modules
+if SCRAPER_DIR not in sys.path:
+    sys.path.insert(0, SCRAPER_DIR)
+
+from standin_server import StandInServer  # noqa: E402
+
+
+@pytest.fixture
+def root_dir(tmp_path):
+    """Scratch root_dir for the scraper's output"""
+    return str(tmp_path)
+
+
+@pytest.fixture
+def server():
+    """Stand-in for discoverjesus.com serving a synthetic page for any /<category>/<slug>"""
+    with StandInServer(synthetic_options={'paragraphs': 2}) as standin:
+        yield standin
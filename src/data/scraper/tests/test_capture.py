@@ -0,0 +1,80 @@
+import os
+
+import pytest
+import requests
+
+from capture import INDEX_FILE, CaptureReader, CaptureWriter, archive_files
+
+N = 5
+
+
+def response(i):
+    resp = requests.Response()
+    resp.status_code = 200 if i % 2 else 404
+    resp.reason = 'OK' if i % 2 else 'Not Found'
+    resp.url = f"https://discoverjesus.com/person/page-{i}"
+    # A body that looks like a header block must come back unchanged
+    resp._content = f"<p>Page {i} – ünïcode</p>\r\n\r\nHTTP/1.1 200 OK\r\n".encode('utf-8') * (i + 1)
+    resp.headers.update({'Content-Type': 'text/html; charset=utf-8', 'ETag': f'"v{i}"',
+                         'Content-Encoding': 'gzip', 'Content-Length': '1'})
+    return resp
+
+
+def write(capture_dir, **options):
+    responses = {f"https://discoverjesus.com/person/page-{i}": response(i) for i in range(N)}
+    with CaptureWriter(capture_dir, **options) as writer:
+        for url, resp in responses.items():
+            writer.add(url, resp)
+    assert writer.records == N
+    return responses
+
+
+def expected_headers(resp):
+    return [('Content-Type', 'text/html; charset=utf-8'), ('ETag', resp.headers['ETag']),
+            ('Content-Length', str(len(resp.content)))]
+
+
+def check(reader, responses):
+    assert reader.urls() == sorted(responses)
+    for url in responses:
+        capture = reader.get(url)
+        assert capture.body == responses[url].content
+        assert capture.headers == expected_headers(responses[url])
+        assert (capture.status, capture.reason) == (responses[url].status_code, responses[url].reason)
+        replayed = capture.to_response()
+        assert replayed.text == responses[url].text
+        assert replayed.headers['ETag'] == responses[url].headers['ETag']
+
+
+def truncate_last_record(capture_dir):
+    name = archive_files(capture_dir)[-1]
+    path = os.path.join(capture_dir, name)
+    last = [entry for entry in CaptureReader(capture_dir).index.values() if entry['file'] == name]
+    last = max(last, key=lambda entry: entry['offset'])
+    with open(path, 'r+b') as f:
+        f.truncate(last['offset'] + last['length'] // 2)
+    return last['url']
+
+
+@pytest.mark.parametrize('options', [{}, {'batch_size': 1}, {'batch_size': 2, 'max_bytes': 1}])
+def test_round_trip(tmp_path, options):
+    responses = write(str(tmp_path), **options)
+    check(CaptureReader(str(tmp_path)), responses)
+    os.remove(tmp_path / INDEX_FILE)
+    check(CaptureReader(str(tmp_path)), responses)
+
+
+@pytest.mark.parametrize('drop_index', [False, True])
+def test_truncated_last_record_is_dropped(tmp_path, drop_index):
+    responses = write(str(tmp_path))
+    del responses[truncate_last_record(str(tmp_path))]
+    if drop_index:
+        os.remove(tmp_path / INDEX_FILE)
+
+    reader = CaptureReader(str(tmp_path))
+    assert len(reader) == N - 1
+    check(reader, responses)
+    # Rebuilding from the archive recovers the same records
+    reader.rebuild()
+    check(reader, responses)
+    check(CaptureReader(str(tmp_path)), responses)
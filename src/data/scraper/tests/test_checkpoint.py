@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+from checkpoint import COMPLETED, ERROR, Checkpoint
+from scrape_discover_jesus import DiscoverJesusScraper, open_cache, parse_args, run
+
+
+def scraper_for(server, root_dir, resume=False):
+    scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+    scraper.checkpoint = Checkpoint(os.path.join(root_dir, 'scraper', 'checkpoint.jsonl'), resume=resume)
+    return scraper
+
+
+def test_load_keeps_last_record_and_ignores_torn_line(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = Checkpoint(path)
+    checkpoint.record('a', error=ValueError('boom'))
+    checkpoint.record('a', summary={"id": "a", "shortSummary": "s", "fullSummary": ""})
+    checkpoint.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "b", "status": "o')
+    records = Checkpoint.load(path)
+    assert list(records) == ['a']
+    assert records['a']['status'] in COMPLETED
+
+
+def test_resume_after_torn_last_line(server, root_dir):
+    urls = [f"{server.base_url}/person/page-{i}" for i in range(20)]
+    first = scraper_for(server, root_dir)
+    try:
+        expected = first.scrape_all(urls, concurrency=4)
+    finally:
+        first.checkpoint.close()
+
+    # A run killed after 12 pages, half way through writing the 13th record
+    path = os.path.join(root_dir, 'scraper', 'checkpoint.jsonl')
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    done = {json.loads(line)['url'] for line in lines[:12]}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:12])
+        f.write(lines[12][:len(lines[12]) // 2])
+
+    scraper = scraper_for(server, root_dir, resume=True)
+    served = server.requests_served
+    try:
+        summaries = scraper.scrape_all(urls, concurrency=4, resume=True)
+    finally:
+        scraper.checkpoint.close()
+
+    assert summaries == expected
+    # Only the pages without a whole record were fetched again
+    assert server.requests_served - served == len(urls) - len(done)
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert {record['url'] for record in records} == set(urls)
+    assert all(record['status'] != ERROR for record in records)
+
+
+def run_fused(server, root_dir, urls_path, *extra):
+    args = parse_args(['--batch', '--fixed-rate', '--max-rps', '0', '--validate-rps', '0', '--concurrency', '4',
+                       '--fused', '--urls', urls_path, *extra])
+    scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+    scraper.checkpoint = Checkpoint(os.path.join(root_dir, 'scraper', 'checkpoint.jsonl'), resume=args.resume)
+    scraper.cache = open_cache(args, root_dir)
+    if args.offline:
+        args.validate_rps = 0
+    try:
+        run(args, scraper, None, 'test', 'test.log')
+    finally:
+        scraper.checkpoint.close()
+        if scraper.cache is not None:
+            scraper.cache.close()
+    # Written under root_dir whatever the working directory
+    assert os.path.exists(os.path.join(root_dir, 'scraper', 'logs', 'url_summary_test.log'))
+    with open(os.path.join(root_dir, 'scraper', 'summaries.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('mode', ['--fused', '--offline'])
+def test_fused_resume_skips_completed_urls(server, root_dir, mode):
+    urls = [f"{server.base_url}/person/page-{i}" for i in range(20)]
+    urls_path = os.path.join(root_dir, 'urls.json')
+    with open(urls_path, 'w', encoding='utf-8') as f:
+        json.dump(urls, f)
+    expected = run_fused(server, root_dir, urls_path)
+
+    path = os.path.join(root_dir, 'scraper', 'checkpoint.jsonl')
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    done = {json.loads(line)['url'] for line in lines[:12]}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:12])
+        f.write(lines[12][:len(lines[12]) // 2])
+
+    served = server.requests_served
+    extra = ['--offline'] if mode == '--offline' else ['--no-cache']
+    assert run_fused(server, root_dir, urls_path, '--resume', *extra) == expected
+    if mode == '--fused':
+        assert server.requests_served - served == len(urls) - len(done)
+    else:
+        assert server.requests_served == served
+    # The checkpoint was kept, and only the URLs without a whole record were added to it
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['url'] for record in records[:12]] == [json.loads(line)['url'] for line in lines[:12]]
+    assert sorted(record['url'] for record in records[12:]) == sorted(set(urls) - done)
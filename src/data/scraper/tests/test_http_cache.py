@@ -0,0 +1,103 @@
+import os
+import time
+from collections import Counter
+
+import pytest
+import requests
+
+from http_cache import CacheMiss, ResponseCache
+from standin_server import StandInServer
+
+LAST_MODIFIED = 'Sat, 17 Oct 2026 08:00:00 GMT'
+
+
+def open_cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path / 'cache' / 'responses.sqlite'), **kwargs)
+
+
+@pytest.mark.parametrize('validators', [{'etags': True}, {'etags': False, 'last_modified': LAST_MODIFIED}],
+                         ids=['etag', 'last-modified'])
+def test_revalidation_reuses_the_cached_body(tmp_path, validators):
+    with StandInServer(synthetic_options={'paragraphs': 2}, **validators) as server, requests.Session() as session:
+        url = f"{server.base_url}/person/andrew"
+        cache = open_cache(tmp_path)
+        first = cache.fetch(session, url)
+        assert first.status_code == 200 and not getattr(first, 'from_cache', False)
+
+        again = cache.fetch(session, url)
+        assert again.from_cache and again.status_code == 200
+        assert again.text == first.text
+        assert server.status_counts == {200: 1, 304: 1}
+        assert cache.stats == Counter(miss=1, revalidated=1)
+        cache.close()
+
+
+def test_changed_page_replaces_the_entry(tmp_path):
+    pages = {'/person/andrew': '<html>old</html>'}
+    with StandInServer(pages=pages) as server, requests.Session() as session:
+        url = f"{server.base_url}/person/andrew"
+        cache = open_cache(tmp_path)
+        cache.fetch(session, url)
+        pages['/person/andrew'] = '<html>new</html>'
+        response = cache.fetch(session, url)
+        assert response.status_code == 200 and response.text == '<html>new</html>'
+        assert cache.get(url).content == b'<html>new</html>'
+        # Failures are passed through and leave the cached copy alone
+        del pages['/person/andrew']
+        assert cache.fetch(session, url).status_code == 404
+        assert cache.get(url).content == b'<html>new</html>'
+        cache.close()
+
+
+def test_offline_serves_the_cache_and_raises_cache_miss(tmp_path, server):
+    with requests.Session() as session:
+        cache = open_cache(tmp_path)
+        cached = cache.fetch(session, f"{server.base_url}/person/andrew")
+        cache.close()
+
+        served = server.requests_served
+        offline = open_cache(tmp_path, offline=True)
+        assert offline.fetch(session, f"{server.base_url}/person/andrew").text == cached.text
+        with pytest.raises(CacheMiss):
+            offline.fetch(session, f"{server.base_url}/person/peter")
+        # A CacheMiss is a RequestException, so the scraper treats it as a failed request
+        assert issubclass(CacheMiss, requests.RequestException)
+        assert server.requests_served == served
+        assert offline.stats == Counter(hit=1, miss=1)
+        offline.close()
+
+
+def test_eviction_by_size_drops_least_recently_used(tmp_path, server):
+    with requests.Session() as session:
+        cache = open_cache(tmp_path, max_bytes=0)
+        urls = [f"{server.base_url}/person/page-{i}" for i in range(6)]
+        for url in urls:
+            cache.fetch(session, url)
+            time.sleep(0.01)
+        # Read the first page again, so the second is now the least recently used
+        cache.get(urls[0])
+        size = cache.total_bytes()
+        cache.max_bytes = size - 1
+        assert cache.prune() == 1
+        assert cache.urls() == sorted(set(urls) - {urls[1]})
+        cache.max_bytes = size // 2
+        cache.prune()
+        assert cache.total_bytes() <= size // 2
+        assert urls[0] in cache.urls()
+        assert cache.stats['evicted'] >= 2
+        cache.close()
+
+
+def test_expired_entries_are_evicted_on_open(tmp_path, server):
+    with requests.Session() as session:
+        cache = open_cache(tmp_path)
+        cache.fetch(session, f"{server.base_url}/person/andrew")
+        cache.close()
+        assert open_cache(tmp_path, offline=True).urls() == [f"{server.base_url}/person/andrew"]
+
+        time.sleep(0.05)
+        expired = open_cache(tmp_path, max_age=0.01)
+        assert expired.urls() == []
+        assert expired.stats['evicted'] == 1
+        expired.close()
+        assert os.path.exists(str(tmp_path / 'cache' / 'responses.sqlite'))
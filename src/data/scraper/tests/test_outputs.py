@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from outputs import JsonArrayWriter, TypeScriptWriter, read_ts_entries
+
+
+def summary(entry_id, short='Short summary', full='Full summary'):
+    return {"id": entry_id, "title": entry_id.split('/')[-1], "shortSummary": short, "fullSummary": full,
+            "sourceUrl": f"https://discoverjesus.com/{entry_id}"}
+
+
+def write_ts(path, summaries):
+    with TypeScriptWriter(path) as ts:
+        for item in summaries:
+            ts.write(item)
+    return ts.report
+
+
+@pytest.fixture
+def ts_path(tmp_path):
+    return str(tmp_path / 'src' / 'data' / 'discoverJesusSummaries.ts')
+
+
+def test_unchanged_module_is_not_rewritten(ts_path):
+    summaries = [summary('person/b'), summary('event/a'), summary('topic/empty', short='', full='')]
+    first = write_ts(ts_path, summaries)
+    assert first.written and first.added == ['event/a', 'person/b']
+    os.utime(ts_path, (1, 1))
+
+    # Same summaries in another order: same bytes, so the file is left alone
+    report = write_ts(ts_path, list(reversed(summaries)))
+    assert not report.written and not report.changed
+    assert report.unchanged == 2
+    assert os.stat(ts_path).st_mtime == 1
+    assert not os.path.exists(f"{ts_path}.tmp")
+
+
+def test_changes_are_reported_and_written(ts_path):
+    write_ts(ts_path, [summary('person/b'), summary('event/a')])
+    report = write_ts(ts_path, [summary('person/b', full='Edited'), summary('group/c')])
+    assert report.written
+    assert (report.added, report.removed, report.modified, report.unchanged) == (['group/c'], ['event/a'],
+                                                                                 ['person/b'], 0)
+    assert [entry_id for entry_id, _ in read_ts_entries(ts_path)] == ['group/c', 'person/b']
+
+
+def test_failed_write_leaves_previous_module(ts_path):
+    write_ts(ts_path, [summary('person/b')])
+    with open(ts_path, 'rb') as f:
+        before = f.read()
+    with pytest.raises(RuntimeError):
+        with TypeScriptWriter(ts_path) as ts:
+            ts.write(summary('person/c'))
+            raise RuntimeError('scrape died')
+    with open(ts_path, 'rb') as f:
+        assert f.read() == before
+    assert not os.path.exists(f"{ts_path}.tmp")
+
+
+def test_json_array_writer_matches_json_dump(tmp_path):
+    items = [summary('person/b'), {"nested": {"list": [1, 2], "text": "Jésus"}}]
+    path = str(tmp_path / 'summaries.json')
+    with JsonArrayWriter(path) as writer:
+        for item in items:
+            writer.write(item)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == json.dumps(items, indent=2)
@@ -0,0 +1,79 @@
+import pytest
+
+from parsing import PARSER_ENGINES, extract_summary, installed_engines
+from standin_server import synthetic_page
+
+URL = 'https://discoverjesus.com/person/mary-mother-of-jesus'
+
+RICH_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta property="og:image" content="/wp-content/uploads/mary.jpg"></head>
+<body>
+<nav><a href="/topic/menu">Menu</a><a href="https://www.urantia.org/urantia-book/paper-122">Paper 122</a></nav>
+<article class="entry">
+<h1 class="entry-title">Mary, Mother of Jesus</h1>
+<div class="entry-subtitle">The mother of Jesus of Nazareth.</div>
+<div class="summary-section">
+<p>Mary was chosen as the mother of Jesus (122:5.1). See also Paper 123.</p>
+<p>Her husband was <a href="/person/joseph-father-of-jesus">Joseph</a>, and she was present at
+<a href="/event/the-wedding-at-cana/">the wedding at Cana</a>.</p>
+<p>Back to <a href="/person/mary-mother-of-jesus">this page</a>.</p>
+</div>
+</article>
+</body>
+</html>
+"""
+
+# No entry-title, subtitle or summary-section classes: every field comes from a fallback
+FALLBACK_PAGE = """<!DOCTYPE html>
+<html>
+<body>
+<h1>Mary, Mother of Jesus</h1>
+<p class="hero-subtitle">The mother of Jesus of Nazareth.</p>
+<main class="site-content">
+<p>First paragraph.</p>
+<p>Second paragraph.</p>
+<p>Third paragraph.</p>
+<p>Fourth paragraph, past the three the fallback keeps.</p>
+</main>
+<img class="attachment-large wp-post-image" src="/wp-content/uploads/mary.jpg">
+</body>
+</html>
+"""
+
+PAGES = {
+    'rich': RICH_PAGE,
+    'fallback': FALLBACK_PAGE,
+    'synthetic': synthetic_page('/person/mary-mother-of-jesus', boilerplate=20, paragraphs=3),
+}
+
+
+@pytest.mark.parametrize('engine', PARSER_ENGINES[1:])
+@pytest.mark.parametrize('page', sorted(PAGES))
+def test_engines_extract_the_same_fields(page, engine):
+    if engine not in installed_engines():
+        pytest.skip(f"the {engine} parser is not installed")
+    assert extract_summary(PAGES[page], URL, engine=engine) == extract_summary(PAGES[page], URL)
+
+
+def test_rich_page_fields():
+    summary, paths = extract_summary(RICH_PAGE, URL)
+    assert summary["id"] == 'person/mary-mother-of-jesus'
+    assert summary["title"] == 'Mary, Mother of Jesus'
+    assert summary["shortSummary"] == 'The mother of Jesus of Nazareth.'
+    assert summary["imageUrl"] == 'https://discoverjesus.com/wp-content/uploads/mary.jpg'
+    # Links into the Urantia Book count too, in document order
+    assert summary["urantiaReferences"] == ['122', '122:5.1', '123']
+    assert summary["related"] == ['person/joseph-father-of-jesus', 'event/the-wedding-at-cana']
+    assert summary["sourceUrl"] == URL
+    assert paths["title"] == paths["shortSummary"] == paths["fullSummary"] == 'primary'
+
+
+def test_fallback_page_fields():
+    summary, paths = extract_summary(FALLBACK_PAGE, URL, engine='strainer')
+    assert summary["title"] == 'Mary, Mother of Jesus'
+    assert summary["shortSummary"] == 'The mother of Jesus of Nazareth.'
+    assert 'Third paragraph.' in summary["fullSummary"]
+    assert 'Fourth paragraph' not in summary["fullSummary"]
+    assert summary["imageUrl"] == 'https://discoverjesus.com/wp-content/uploads/mary.jpg'
+    assert paths["title"] == paths["shortSummary"] == paths["fullSummary"] == 'fallback'
@@ -0,0 +1,28 @@
+from metrics import Metrics
+from pipeline import ScrapePipeline
+from scrape_discover_jesus import DiscoverJesusScraper
+
+
+def parse_histograms(metrics):
+    return {name_labels: histogram for name_labels, histogram in metrics.histograms.items()
+            if name_labels[0] == 'scraper_parse_seconds'}
+
+
+def test_pipeline_records_parse_time(server, root_dir):
+    urls = [f"{server.base_url}/person/page-{i}" for i in range(6)]
+    sequential = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+    sequential.metrics = Metrics()
+    expected = sequential.scrape_all(urls, concurrency=2)
+
+    scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+    scraper.metrics = Metrics()
+    scraped = ScrapePipeline(scraper, fetchers=2, parse_workers=2).run(urls)
+
+    assert [scraped[url] for url in urls] == expected
+    # Timed in the parser processes, recorded under the same name and labels as a sequential run
+    histograms = parse_histograms(scraper.metrics)
+    assert list(histograms) == list(parse_histograms(sequential.metrics)) == \
+        [('scraper_parse_seconds', (('engine', 'html.parser'),))]
+    histogram = histograms['scraper_parse_seconds', (('engine', 'html.parser'),)]
+    assert histogram.count == len(urls)
+    assert histogram.sum > 0
@@ -0,0 +1,120 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+from rate_limit import AdaptiveRateController, DeferredRetryQueue, TokenBucket, parse_retry_after
+from scrape_discover_jesus import DiscoverJesusScraper
+from standin_server import StandInServer
+
+
+def controller(**kwargs):
+    options = dict(initial_rate=4.0, max_rate=8.0, initial_concurrency=8, max_concurrency=16)
+    options.update(kwargs)
+    return AdaptiveRateController(**options)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= parse_retry_after(later) <= 30
+    assert parse_retry_after(email.utils.formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_halves_on_overload(status):
+    limiter = controller()
+    limiter.on_response(status, 0.01)
+    assert limiter.rate == 2.0
+    assert limiter.concurrency == 4
+
+
+def test_one_burst_of_errors_counts_once():
+    limiter = controller(cooldown=60)
+    for _ in range(5):
+        limiter.on_response(429, 0.01)
+    limiter.on_error()
+    assert limiter.rate == 2.0
+
+
+def test_never_drops_below_min_rate():
+    limiter = controller(initial_rate=0.3, min_rate=0.2, cooldown=0)
+    for _ in range(5):
+        limiter.on_response(429, 0.01)
+    assert limiter.rate == 0.2
+    assert limiter.concurrency == 1
+
+
+def test_grows_on_fast_successes_up_to_max_rate():
+    limiter = controller()
+    for _ in range(200):
+        limiter.on_response(200, 0.01)
+    assert limiter.rate == 8.0
+    assert limiter.concurrency == 16
+
+
+def test_rising_latency_cuts_the_rate():
+    limiter = controller()
+    limiter.on_response(200, 0.01)
+    rate = limiter.rate
+    for _ in range(10):
+        limiter.on_response(200, 0.5)
+    assert limiter.rate <= rate / 2
+
+
+def test_retry_after_pauses_every_request():
+    limiter = controller(initial_rate=8.0)
+    limiter.on_response(429, 0.01, retry_after=5)
+    assert 4.5 < limiter.reserve() <= 5
+
+
+def test_token_bucket_spreads_reservations():
+    bucket = TokenBucket(10, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+    assert TokenBucket(0).reserve() == 0.0
+
+
+def test_deferred_retry_queue_orders_by_time():
+    retries = DeferredRetryQueue()
+    retries.push('later', 60)
+    retries.push('now', 0)
+    assert retries.pop_ready() == 'now'
+    assert retries.pop_ready() is None
+    assert 59 < retries.next_ready_in() <= 60
+    assert len(retries) == 1
+
+
+def test_retry_delay_honours_retry_after(root_dir):
+    scraper = DiscoverJesusScraper(root_dir=root_dir)
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '3'
+    assert scraper.retry_delay(requests.HTTPError(response=response), attempt=0) == 3.0
+    response.status_code = 404
+    assert scraper.retry_delay(requests.HTTPError(response=response), attempt=0) is None
+    assert scraper.retry_delay(requests.ConnectionError(), attempt=2) == 4
+
+
+def test_scrape_backs_off_and_recovers_from_429s(root_dir):
+    urls_count = 8
+    with StandInServer(rate_429=0.25, retry_after=1, seed=1) as server:
+        scraper = DiscoverJesusScraper(base_url=server.base_url, root_dir=root_dir)
+        scraper.rate_controller = controller(initial_rate=8.0, cooldown=0.5)
+        # Enough attempts that no page runs out of them on an unlucky run of 429s
+        scraper.max_attempts = 6
+        start = time.perf_counter()
+        summaries = scraper.scrape_all([f"{server.base_url}/person/page-{i}" for i in range(urls_count)],
+                                       concurrency=4)
+        elapsed = time.perf_counter() - start
+        throttled = server.status_counts[429]
+    assert len(summaries) == urls_count
+    assert throttled
+    # Every 429 carried Retry-After: 1, so the retries waited for it
+    assert elapsed >= 1
+    assert scraper.rate_controller.rate < 8.0
@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+from conftest import SCRAPER_DIR
+from search_index import SEARCH_INDEX, SearchIndex, SearchIndexWriter, stem, tokenize
+
+# Shared with src/__tests__/utils/searchIndex.test.ts, which runs the same queries
+# through the TypeScript client against these files
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(SCRAPER_DIR)), '__tests__', 'fixtures', 'search-index')
+QUERIES = [
+    'jesus',
+    'mother jesus',
+    'jesus nazareth',
+    'JÉSUS Nazareth',
+    'weddings',
+    'wed',
+    'pray',
+    'carpenter naz',
+    'worship prayers',
+    'the of and',
+    'mary wine',
+    'happiness',
+]
+
+
+def load_documents():
+    with open(os.path.join(FIXTURE_DIR, 'documents.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build(out_dir, documents):
+    with SearchIndexWriter(out_dir) as writer:
+        for document in documents:
+            writer.add_document(document["id"], document["kind"], document["title"], document["short"],
+                                document["full"])
+    return writer
+
+
+def results(index):
+    return {query: [list(result) for result in index.search(query)] for query in QUERIES}
+
+
+def index_files(directory):
+    return sorted(name for name in os.listdir(directory) if name == SEARCH_INDEX or name.startswith('terms-'))
+
+
+def test_tokenize():
+    assert tokenize("The Mother of Jésus, at Nazareth's well") == ['mother', 'jesus', 'nazareth', 'well']
+    assert [stem(word) for word in ('blessings', 'classes', 'happiness', 'apostles', 'discus', 'taught')] == \
+        ['bless', 'class', 'happi', 'apostl', 'discus', 'taught']
+
+
+def test_postings_round_trip(tmp_path):
+    writer = build(str(tmp_path), load_documents())
+    index = SearchIndex(str(tmp_path))
+    scale = index.meta['scale']
+    for term, postings in writer._postings().items():
+        decoded = index._scores([term])
+        assert sorted(decoded) == [number for number, _ in postings]
+        for number, score in postings:
+            assert decoded[number] == max(1, round(score / scale))
+
+
+def test_and_semantics_and_last_word_prefix(tmp_path):
+    build(str(tmp_path), load_documents())
+    found = {query: [result[0] for result in found] for query, found in results(SearchIndex(str(tmp_path))).items()}
+    # Every word must match
+    assert found['mother jesus'] == ['person/mary-mother-of-jesus', 'event/the-wedding-at-cana']
+    assert found['mary wine'] == []
+    # The last word also matches as a prefix, the others only as whole (stemmed) words
+    assert set(found['wed']) == {'event/the-wedding-at-cana', 'person/mary-mother-of-jesus'}
+    assert found['carpenter naz'] == ['person/joseph-father-of-jesus']
+    # Accents, case, stop words and stemming are handled like in the index
+    assert found['JÉSUS Nazareth'] == found['jesus nazareth'] == ['person/mary-mother-of-jesus',
+                                                                 'person/joseph-father-of-jesus']
+    assert found['weddings'][0] == 'event/the-wedding-at-cana'
+    assert found['the of and'] == []
+
+
+def test_rewrite_is_a_no_op_and_prunes_stale_shards(tmp_path):
+    documents = load_documents()
+    first = build(str(tmp_path), documents)
+    assert first.written
+    second = build(str(tmp_path), documents)
+    assert second.written == [] and second.removed == []
+    third = build(str(tmp_path), documents[:1])
+    assert third.removed
+    assert set(index_files(str(tmp_path))) == {SEARCH_INDEX, *SearchIndex(str(tmp_path)).meta['shards'].values()}
+
+
+def test_fixture_is_current(tmp_path):
+    """The files the TypeScript test reads are what the writer produces now"""
+    build(str(tmp_path), load_documents())
+    expected = results(SearchIndex(str(tmp_path)))
+    if os.environ.get('UPDATE_SEARCH_FIXTURE'):
+        for name in index_files(FIXTURE_DIR):
+            os.remove(os.path.join(FIXTURE_DIR, name))
+        for name in index_files(str(tmp_path)):
+            with open(os.path.join(str(tmp_path), name), 'rb') as src, \
+                    open(os.path.join(FIXTURE_DIR, name), 'wb') as dst:
+                dst.write(src.read())
+        with open(os.path.join(FIXTURE_DIR, 'expected.json'), 'w', encoding='utf-8') as f:
+            json.dump(expected, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        pytest.skip("Search index fixture rewritten")
+
+    assert index_files(FIXTURE_DIR) == index_files(str(tmp_path)), \
+        "Run UPDATE_SEARCH_FIXTURE=1 python -m pytest tests/test_search_index.py"
+    for name in index_files(str(tmp_path)):
+        with open(os.path.join(str(tmp_path), name), 'rb') as new, open(os.path.join(FIXTURE_DIR, name), 'rb') as old:
+            assert new.read() == old.read(), name
+    with open(os.path.join(FIXTURE_DIR, 'expected.json'), encoding='utf-8') as f:
+        assert json.load(f) == expected
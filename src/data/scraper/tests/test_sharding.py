@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from checkpoint import Checkpoint
+from scrape_discover_jesus import DiscoverJesusScraper, merge_outputs, parse_args, run
+from sharding import merge_shards, parse_shard, select_shard, shard_of, write_shard
+from standin_server import StandInServer, synthetic_page
+
+TARGET = '/event/pilates-last-appeal-and-surrender'
+BROKEN = '/event/pilate-s-last-appeal-and-surrender'
+PATHS = [f"/person/page-{i}" for i in range(6)] + [BROKEN] + [f"/topic/page-{i}" for i in range(6)] + [TARGET]
+
+
+@pytest.fixture
+def site():
+    """Every page of PATHS except the broken slug, which auto-correct maps to TARGET"""
+    pages = {path: synthetic_page(path, paragraphs=2) for path in PATHS if path != BROKEN}
+    with StandInServer(pages=pages) as standin:
+        yield standin
+
+
+def scrape(base_url, root_dir, *extra, known_before=True):
+    """One run of run() over PATHS at base_url, writing into root_dir"""
+    os.makedirs(os.path.join(root_dir, 'scraper', 'logs'), exist_ok=True)
+    urls_path = os.path.join(root_dir, 'urls.json')
+    with open(urls_path, 'w', encoding='utf-8') as f:
+        json.dump([base_url + path for path in PATHS], f)
+    if known_before:
+        # What a previous run found, so the slug index knows the corrected page
+        with open(os.path.join(root_dir, 'scraper', 'valid_urls.json'), 'w', encoding='utf-8') as f:
+            json.dump([base_url + TARGET], f)
+    args = parse_args(['--batch', '--no-cache', '--fixed-rate', '--max-rps', '0', '--validate-rps', '0',
+                       '--concurrency', '4', '--urls', urls_path, *extra])
+    scraper = DiscoverJesusScraper(base_url=base_url, root_dir=root_dir)
+    scraper.checkpoint = Checkpoint(os.path.join(root_dir, 'scraper', 'checkpoint.jsonl'))
+    try:
+        run(args, scraper, None, 'test', 'test.log')
+    finally:
+        scraper.checkpoint.close()
+    return scraper
+
+
+def read(root_dir, path):
+    with open(os.path.join(root_dir, path), 'rb') as f:
+        return f.read()
+
+
+def test_parse_shard():
+    assert parse_shard('2/3') == (2, 3)
+    for text in ('3/3', '-1/3', '0/0', 'a/b', '1'):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+
+
+def test_select_shard_partitions_by_url_only():
+    urls = [f"https://discoverjesus.com/person/page-{i}" for i in range(200)]
+    shards = [select_shard(urls, index, 4) for index in range(4)]
+    assert sorted(position for shard in shards for position, _ in shard) == list(range(len(urls)))
+    # The same URL lands in the same shard whatever the order of the input
+    reordered = dict((url, shard_of(url, 4)) for url in reversed(urls))
+    assert all(reordered[url] == index for index, shard in enumerate(shards) for _, url in shard)
+
+
+@pytest.mark.parametrize('fused', [False, True])
+@pytest.mark.parametrize('count', [1, 3])
+# Without a previous run, the shard of BROKEN only learns that TARGET exists by checking it
+@pytest.mark.parametrize('known_before', [True, False])
+def test_merge_is_byte_identical_to_unsharded_run(site, root_dir, fused, count, known_before):
+    extra = ['--fused'] if fused else []
+    whole = os.path.join(root_dir, 'whole')
+    sharded = os.path.join(root_dir, 'sharded')
+    scrape(site.base_url, whole, *extra, known_before=known_before)
+    for index in range(count):
+        scrape(site.base_url, sharded, *extra, '--shard', f"{index}/{count}",
+               '--shard-dir', os.path.join(sharded, 'shards'), known_before=known_before)
+    merge_outputs(DiscoverJesusScraper(base_url=site.base_url, root_dir=sharded), os.path.join(sharded, 'shards'))
+
+    summaries = read(whole, 'scraper/summaries.json')
+    assert read(sharded, 'scraper/summaries.json') == summaries
+    assert read(sharded, 'src/data/discoverJesusSummaries.ts') == read(whole, 'src/data/discoverJesusSummaries.ts')
+    # The corrected page sits where the broken URL was, and only once
+    order = [summary["sourceUrl"][len(site.base_url):] for summary in json.loads(summaries)]
+    assert order == [TARGET if path == BROKEN else path for path in PATHS[:-1]]
+    with open(os.path.join(whole, 'scraper', 'invalid_urls.json'), encoding='utf-8') as f:
+        assert json.load(f) == {}
+
+
+def test_merge_rejects_missing_and_mismatched_shards(tmp_path):
+    urls = [f"https://discoverjesus.com/person/page-{i}" for i in range(10)]
+    write_shard(str(tmp_path / 'shard-0-of-2.json'), 0, 2, len(urls), select_shard(urls, 0, 2), [])
+    with pytest.raises(ValueError, match='Missing shard'):
+        merge_shards(str(tmp_path))
+    write_shard(str(tmp_path / 'shard-1-of-2.json'), 1, 2, len(urls) + 1, select_shard(urls, 1, 2), [])
+    with pytest.raises(ValueError, match='different URL list'):
+        merge_shards(str(tmp_path))
@@ -0,0 +1,109 @@
+import random
+import string
+
+from scrape_discover_jesus import suggest_corrections
+from slug_index import AUTO_MIN_SCORE, SlugIndex, apply_corrections, split_path, trigrams
+
+BROTHERS = [f"person/{name}-brother-of-jesus" for name in ('james', 'jude', 'simon', 'joseph')]
+PAGES = BROTHERS + ['event/pilates-last-appeal-and-surrender', 'person/andrew', 'topic/andrew']
+
+
+class FakeScraper:
+    base_url = 'https://discoverjesus.com'
+
+
+def jaccard(a, b):
+    a, b = trigrams(split_path(a)[1]), trigrams(split_path(b)[1])
+    return len(a & b) / len(a | b)
+
+
+def not_found(*paths):
+    return {f"{FakeScraper.base_url}/{path}": {"status_code": 404} for path in paths}
+
+
+def test_exact_match():
+    assert SlugIndex(PAGES).search('event/pilates-last-appeal-and-surrender')[0] == \
+        ('event/pilates-last-appeal-and-surrender', 1.0)
+
+
+def test_near_miss_is_confident():
+    candidates = SlugIndex(PAGES).search('event/pilate-s-last-appeal-and-surrender')
+    assert candidates == [('event/pilates-last-appeal-and-surrender', 0.865)]
+    assert SlugIndex.confident(candidates) == 'event/pilates-last-appeal-and-surrender'
+
+
+def test_close_runner_up_blocks_the_correction():
+    # Scores 0.607 against james, 0.571 against jude: above AUTO_MIN_SCORE but within the margin
+    candidates = SlugIndex(PAGES).search('person/amos-brother-of-jesus')
+    assert [path for path, _ in candidates[:2]] == BROTHERS[:2]
+    assert candidates[0][1] >= AUTO_MIN_SCORE
+    assert SlugIndex.confident(candidates) is None
+
+
+def test_tie_prefers_the_same_category_then_sorts():
+    assert SlugIndex(['topic/andrew', 'person/andrew']).search('person/andrew') == \
+        [('person/andrew', 1.0), ('topic/andrew', 1.0)]
+    assert SlugIndex.confident(SlugIndex(PAGES).search('group/andrew')) is None
+    # Insertion order does not matter
+    assert SlugIndex(reversed(PAGES)).search('group/andrew') == SlugIndex(PAGES).search('group/andrew')
+
+
+def test_prefix_filter_finds_everything_above_the_cutoff():
+    """The prefix-filtered search returns exactly what scoring every path would"""
+    rng = random.Random(0)
+    words = ['jesus', 'mary', 'brother', 'of', 'the', 'last', 'appeal', 'temple', 'cana', 'wedding']
+    paths = sorted({f"event/{'-'.join(rng.sample(words, rng.randint(1, 4)))}" for _ in range(300)})
+    index = SlugIndex(paths)
+    for _ in range(200):
+        slug = '-'.join(rng.sample(words, rng.randint(1, 4)))
+        slug = ''.join(c for c in slug if rng.random() > 0.1) or 'x'
+        for min_score in (0.2, 0.5, AUTO_MIN_SCORE, 0.8):
+            expected = {path for path in paths if jaccard(path, f"event/{slug}") >= min_score}
+            found = index.search(f"event/{slug}", k=len(paths), min_score=min_score)
+            assert {path for path, _ in found} == expected
+            assert all(round(jaccard(path, f"event/{slug}"), 3) == score for path, score in found)
+
+
+def test_search_skips_slugs_outside_the_length_bounds():
+    index = SlugIndex(['person/' + 'a' * 40, 'person/ab'])
+    assert index.search('person/a', min_score=0.5) == []
+    assert index.search('person/' + string.ascii_lowercase, min_score=0.9) == []
+
+
+def test_unvalidated_guesses_are_not_offered():
+    invalid = not_found('person/jame-brother-of-jesus', 'person/amos-brother-of-jesus')
+    known = SlugIndex(PAGES[1:] + ['person/amos-brother-of-jesus'])
+    asked = []
+
+    def verify(paths):
+        asked.append(paths)
+        return set()
+
+    corrections = suggest_corrections(FakeScraper, invalid, known, unverified={'person/amos-brother-of-jesus'},
+                                      verify=verify)
+    # The other shard's URL did not exist, so it is neither a candidate nor a correction
+    entry = invalid[f"{FakeScraper.base_url}/person/jame-brother-of-jesus"]
+    candidates = [candidate["url"] for candidate in entry["candidates"]]
+    assert f"{FakeScraper.base_url}/person/amos-brother-of-jesus" not in candidates
+    assert asked == [['person/amos-brother-of-jesus']]
+    assert corrections == {f"{FakeScraper.base_url}/person/jame-brother-of-jesus":
+                           f"{FakeScraper.base_url}/person/jude-brother-of-jesus"}
+
+
+def test_verified_candidates_rank_like_known_ones():
+    invalid = not_found('person/jame-brother-of-jesus')
+    verified = suggest_corrections(FakeScraper, invalid, SlugIndex(PAGES), unverified={BROTHERS[0]},
+                                   verify=lambda paths: set(paths))
+    unsharded = suggest_corrections(FakeScraper, not_found('person/jame-brother-of-jesus'), SlugIndex(PAGES))
+    assert verified == unsharded == {f"{FakeScraper.base_url}/person/jame-brother-of-jesus":
+                                     f"{FakeScraper.base_url}/{BROTHERS[0]}"}
+
+
+def test_only_404s_get_candidates():
+    invalid = {f"{FakeScraper.base_url}/person/andrw": {"status_code": 500}}
+    assert suggest_corrections(FakeScraper, invalid, SlugIndex(PAGES)) == {}
+    assert "candidates" not in invalid[f"{FakeScraper.base_url}/person/andrw"]
+
+
+def test_apply_corrections_keeps_first_occurrence():
+    assert apply_corrections(['a', 'b', 'c', 'd'], {'b': 'd'}) == ['a', 'd', 'c']
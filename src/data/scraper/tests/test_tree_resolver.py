@@ -0,0 +1,117 @@
+import os
+from collections import Counter
+
+import pytest
+
+from scrape_discover_jesus import DiscoverJesusScraper
+from tree_resolver import (
+    DOCX_TXT, DUPLICATE, NO_HYPHEN, NOT_ENTRY, UNKNOWN_CATEGORY, TreeEntry, TreeResolver,
+)
+
+BASE_URL = 'https://discoverjesus.com'
+
+TREE = [
+    '.',
+    '├── Series 1',
+    '│   ├── Person - Andrew.mp3',
+    '├── Person - Andrew1.mp3',
+    '├── Person - Andrew2.mp3',
+    '├── Person - Andrew.docx',
+    '├── Event – The Wedding at Cana.mp3',
+    '├── Martha of Bethany.mp3',
+    '├── Person - Mary of Bethany2.mp3',
+    '├── Person - Mary of Bethany.txt',
+    "├── Topic - Women's Corps.mp3",
+    "├── Jesus' Return - Second Coming.mp3",
+    '├── Jesus Return Second Coming.mp3',
+    "├── Person - Jesus' Personal Ministry As He Passed By.mp3",
+    '├── Establishing Jesus Ancestry.mp3',
+    '├── Baptism of Jesus.mp3',
+    '├── The Birth of John the Baptist.mp3',
+    '├── Philosophy of Living.mp3',
+    '├── Resurrection Morning.mp3',
+    '├── Groups - The Twelve Apostles.mp3',
+    '├── Relationship - Jesus and John.mp3',
+    '├── Object - The Crown of Thorns3.mp3',
+    '├── Objects of Worship.mp3',
+    '├── Place - Jerusalem.mp3',
+    '├── Reflections.mp3',
+    '└── Event - The Wedding at Cana.mp3',
+    '└── Person – Peter_the Apostle.mp3',
+]
+
+# What the original line-by-line extract_urls_from_tree returned for TREE, repeats included
+BASELINE_URLS = [
+    f"{BASE_URL}/person/andrew",
+    f"{BASE_URL}/person/andrew",
+    f"{BASE_URL}/event/the-wedding-at-cana",
+    f"{BASE_URL}/person/martha-of-bethany",
+    f"{BASE_URL}/person/mary-of-bethany",
+    f"{BASE_URL}/topic/womens-corps",
+    f"{BASE_URL}/person/jesus-return-the-masters-second-coming",
+    f"{BASE_URL}/person/jesus-ministry-as-he-passed-by",
+    f"{BASE_URL}/topic/establishing-jesus-ancestry",
+    f"{BASE_URL}/person/baptism-of-jesus",
+    f"{BASE_URL}/person/the-birth-of-john-the-baptist",
+    f"{BASE_URL}/topic/philosophy-of-living",
+    f"{BASE_URL}/event/resurrection-morning",
+    f"{BASE_URL}/group/the-twelve-apostles",
+    f"{BASE_URL}/relationship/jesus-and-john",
+    f"{BASE_URL}/object/the-crown-of-thorns",
+    f"{BASE_URL}/object/s-of-worship",
+    f"{BASE_URL}/event/the-wedding-at-cana",
+    f"{BASE_URL}/person/peter-the-apostle",
+]
+
+
+@pytest.fixture
+def resolver():
+    return TreeResolver(BASE_URL, DiscoverJesusScraper().url_corrections)
+
+
+def test_same_urls_as_the_baseline_without_repeats(resolver):
+    assert list(resolver.iter_urls(TREE)) == list(dict.fromkeys(BASELINE_URLS))
+    assert resolver.counts == Counter({'url': 17, NOT_ENTRY: 2, DOCX_TXT: 2, NO_HYPHEN: 2, UNKNOWN_CATEGORY: 2,
+                                       DUPLICATE: 2})
+
+
+def test_extract_urls_from_tree_file(root_dir):
+    with open(os.path.join(root_dir, 'tree.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(TREE) + '\n')
+    scraper = DiscoverJesusScraper(root_dir=root_dir)
+    assert scraper.extract_urls_from_tree('tree.txt') == list(dict.fromkeys(BASELINE_URLS))
+    # Counts are reset on every pass
+    assert list(scraper.iter_tree_urls('tree.txt')) == list(dict.fromkeys(BASELINE_URLS))
+    assert scraper.resolver.counts['url'] == 17
+
+
+@pytest.mark.parametrize('filename, category, title', [
+    ('Martha of Bethany.mp3', 'person', 'martha-of-bethany'),
+    ('Event - Mary of Bethany Anoints Jesus.mp3', 'person', 'mary-of-bethany'),
+    ('Person - Andrew.mp3', 'person', 'Andrew'),
+    ('Event – The Wedding at Cana.mp3', 'event', 'The Wedding at Cana'),
+    ('Baptism of Jesus.mp3', 'person', 'Baptism of Jesus'),
+    ('Resurrection Morning.mp3', 'event', 'Resurrection Morning'),
+    ('Philosophy of Living.mp3', 'topic', 'Philosophy of Living'),
+    ('Objects of Worship.mp3', 'object', 's of Worship'),
+])
+def test_categories(resolver, filename, category, title):
+    entry = resolver.resolve_line(f"├── {filename}")
+    assert (entry.category, entry.title, entry.skip_reason) == (category, title, None)
+
+
+def test_category_correction(resolver):
+    # Inferred as a person, then moved to the category the site files it under
+    assert resolver.resolve_line('├── Establishing Jesus Ancestry.mp3').url == \
+        f"{BASE_URL}/topic/establishing-jesus-ancestry"
+    # Only the title is corrected
+    assert resolver.resolve_line('├── Person - Jesus Return Second Coming.mp3').url == \
+        f"{BASE_URL}/person/jesus-return-the-masters-second-coming"
+
+
+def test_variants_are_marked_as_duplicates(resolver):
+    entries = list(resolver.iter_entries(['├── Person - Andrew.mp3', '├── Person - Andrew1.mp3',
+                                          '└── Person - Andrew2.mp3']))
+    assert [entry.skip_reason for entry in entries] == [None, DUPLICATE, DUPLICATE]
+    assert resolver.skipped == entries[1:]
+    assert entries[1] == TreeEntry(2, 'Person - Andrew1.mp3', 'person', 'Andrew', None, DUPLICATE)
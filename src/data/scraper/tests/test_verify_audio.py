@@ -0,0 +1,51 @@
+import json
+import os
+
+from conftest import SCRAPER_DIR
+from verify_audio import MISSING_IN_R2, AudioAsset, is_cosmic, load_assets, main, upload_problem
+
+DATA_DIR = os.path.dirname(SCRAPER_DIR)
+SYNCH_DIR = os.path.join(os.path.dirname(os.path.dirname(DATA_DIR)), 'synch-r2')
+EPISODES = os.path.join(DATA_DIR, 'json/episodes.json')
+COSMIC_MAPPING = os.path.join(DATA_DIR, 'json/cosmic-series-mappings.json')
+COSMIC_URLS = os.path.join(SYNCH_DIR, 'cosmic-series-urls.json')
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_offline_output_matches_the_shell_script(tmp_path):
+    """What check-faulty-urls.sh runs by default reproduces the committed url-check-results.json"""
+    output = str(tmp_path / 'url-check-results.json')
+    main(['--offline', '--no-cache', '--output', output])
+    assert read(output) == read(os.path.join(SYNCH_DIR, 'url-check-results.json'))
+
+
+def test_upload_problem():
+    asset = AudioAsset('cosmic-1-1', 'cosmic-1', 'cosmic-1-1.mp3', 'https://r2.example/cosmic-1-1.mp3')
+    uploaded = {"exactUrl": asset.url, "originalKey": "cosmic-1-1.mp3", "status": "uploaded"}
+    assert upload_problem(asset, {"cosmic-1-1.mp3": uploaded}) is None
+    assert upload_problem(asset, {"cosmic-1-1.mp3": {**uploaded, "status": "not_uploaded_yet"}}) == \
+        {"type": MISSING_IN_R2, "url": asset.url}
+    assert upload_problem(asset, {"cosmic-1-1.mp3": {**uploaded, "exactUrl": None}})["type"] == MISSING_IN_R2
+    assert upload_problem(asset, {})["type"] == MISSING_IN_R2
+
+
+def test_offline_lists_what_it_could_not_check(tmp_path):
+    output = str(tmp_path / 'url-check-results.json')
+    main(['--offline', '--no-cache', '--no-listing', '--detailed', '--output', output])
+    with open(output, encoding='utf-8') as f:
+        results = json.load(f)
+
+    assets = load_assets(EPISODES, COSMIC_MAPPING, COSMIC_URLS)
+    faulty, unchecked = results["faultyUrls"], results["unchecked"]
+    # With nothing to go on but the upload record, every other file is reported, not dropped
+    for asset in assets:
+        if is_cosmic(asset):
+            assert asset.key not in unchecked
+            assert faulty[asset.key]["type"] in (MISSING_IN_R2, 'incorrect_format')
+        else:
+            assert asset.key in faulty or unchecked[asset.key] == asset.url
+    assert not set(faulty) & set(unchecked)
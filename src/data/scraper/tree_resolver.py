@@ -0,0 +1,166 @@
+"""
+Resolve tree-level6.txt entries (MP3 file names) to DiscoverJesus URLs.
+
+The resolver is built once from the URL corrections and the category rules,
+with every regex compiled up front, and streams the tree: URLs are yielded
+lazily and de-duplicated (several MP3 variants that only differ by a trailing
+number map to the same page). Entries that do not produce a URL come back with
+a structured skip reason instead of being silently dropped.
+
+When a SitemapIndex is attached, every generated path is checked against the
+pages the site lists: a slug filed under the wrong category is moved to the one
+the sitemap has, and a page the sitemap does not list is skipped.
+"""
+import re
+from collections import Counter, namedtuple
+
+# Reasons an entry does not produce a URL
+NOT_ENTRY = 'not_entry'
+DOCX_TXT = 'docx_txt'
+NO_HYPHEN = 'no_hyphen'
+UNKNOWN_CATEGORY = 'unknown_category'
+DUPLICATE = 'duplicate'
+NOT_IN_SITEMAP = 'not_in_sitemap'
+SKIP_REASONS = (NOT_ENTRY, DOCX_TXT, NO_HYPHEN, UNKNOWN_CATEGORY, DUPLICATE, NOT_IN_SITEMAP)
+
+CATEGORY_PREFIXES = ('Person', 'Event', 'Topic', 'Group', 'Relationship', 'Object')
+
+# Words used to guess the category of a file name without a "Category - " prefix
+INFERRED_CATEGORIES = (
+    ('Person', ('Jesus', 'Mary', 'Joseph', 'John', 'Peter', 'Paul')),
+    ('Event', ('Baptism', 'Birth', 'Death', 'Resurrection')),
+    ('Topic', ('Establishing', 'Concepts', 'History', 'Philosophy')),
+)
+
+# Names that need an explicit title because the tree spells them differently
+SPECIAL_TITLES = (
+    ('Martha of Bethany', 'Person', 'martha-of-bethany'),
+    ('Mary of Bethany', 'Person', 'mary-of-bethany'),
+)
+
+TreeEntry = namedtuple('TreeEntry', 'line_number filename category title url skip_reason')
+
+
+class TreeResolver:
+    """Turns tree-level6.txt lines into URLs using precompiled rules"""
+
+    _ENTRY_PREFIXES = ('├── ', '└── ')
+    _DIGITS = '0123456789'
+    # Replacing each non-word character with '-' and then collapsing runs of '-'
+    # is the same as replacing each run of non-word characters (which includes '-')
+    _NON_WORD_RUN = re.compile(r'\W+')
+    _SEPARATORS = (' - ', ' – ')
+    _CATEGORY_SLUG = re.compile(r'(person|event|topic|group|relationship|object)')
+
+    def __init__(self, base_url, url_corrections):
+        self.base_url = base_url
+        # Kept by reference so later edits to the corrections map are picked up
+        self.url_corrections = url_corrections
+        # Optional sitemap.SitemapIndex the generated paths are resolved against
+        self.sitemap = None
+        self._inferred = [
+            (category, re.compile('|'.join(re.escape(word) for word in words)))
+            for category, words in INFERRED_CATEGORIES
+        ]
+        self.counts = Counter()
+        self.skipped = []
+        # cleaned file name -> (category, title, url, skip_reason) for the current pass;
+        # MP3 variants that only differ by a trailing number resolve once
+        self._resolved = {}
+
+    def sanitize(self, text):
+        """Sanitize text to match the website's URL pattern with corrections"""
+        text = text.lower().replace("'", "").replace('"', '')
+        text = text.replace('–', '-').replace('—', '-').replace('_', '-')
+        text = self._NON_WORD_RUN.sub('-', text).strip('-')
+        return self.url_corrections.get(text, text)
+
+    def split_category(self, filename):
+        """Return (category, title) for a cleaned file name, or (None, None)"""
+        category = title = None
+        for separator in self._SEPARATORS:
+            if separator in filename:
+                category, title = filename.split(separator, 1)
+                break
+
+        for needle, special_category, special_title in SPECIAL_TITLES:
+            if needle in filename:
+                return special_category, special_title
+
+        if not category:
+            for prefix in CATEGORY_PREFIXES:
+                if filename.startswith(prefix):
+                    return prefix, filename[len(prefix):].strip()
+            for inferred, pattern in self._inferred:
+                if pattern.search(filename):
+                    return inferred, filename
+        return category, title
+
+    def resolve_line(self, line, line_number=0):
+        """Resolve one tree line to a TreeEntry (url set, or skip_reason set)"""
+        line = line.strip()
+        if not line.startswith(self._ENTRY_PREFIXES):
+            return TreeEntry(line_number, None, None, None, None, NOT_ENTRY)
+
+        filename = line[4:].strip()
+        if filename.endswith(('.docx', '.txt')):
+            return TreeEntry(line_number, filename, None, None, None, DOCX_TXT)
+
+        # Remove the .mp3 extension and number suffix
+        cleaned = filename.replace('.mp3', '').rstrip(self._DIGITS)
+        resolved = self._resolved.get(cleaned)
+        if resolved is None:
+            resolved = self._resolved[cleaned] = self._resolve_name(cleaned)
+        return TreeEntry(line_number, filename, *resolved)
+
+    def _resolve_name(self, cleaned):
+        """(category, title, url, skip_reason) for a file name without extension and number suffix"""
+        category, title = self.split_category(cleaned)
+        if not category:
+            return None, None, None, NO_HYPHEN
+
+        match = self._CATEGORY_SLUG.match(category.strip().lower())
+        if not match:
+            return category, title, None, UNKNOWN_CATEGORY
+        category = match.group(1)
+
+        url_title = self.sanitize(title)
+        path = f"{category}/{url_title}"
+        # Check if this specific URL needs category correction
+        path = self.url_corrections.get(path, path)
+        if self.sitemap is not None:
+            listed = self.sitemap.resolve(path)
+            if listed is None:
+                return category, title, None, NOT_IN_SITEMAP
+            path = listed
+        return category, title, f"{self.base_url}/{path}", None
+
+    def iter_entries(self, lines):
+        """
+        Yield a TreeEntry per line; repeated URLs are marked as duplicates.
+        `counts` and `skipped` are reset at the start of every pass.
+        """
+        self.counts.clear()
+        self.skipped.clear()
+        self._resolved.clear()
+        seen = set()
+        for line_number, line in enumerate(lines, 1):
+            entry = self.resolve_line(line, line_number)
+            if entry.url is not None:
+                if entry.url in seen:
+                    entry = entry._replace(url=None, skip_reason=DUPLICATE)
+                else:
+                    seen.add(entry.url)
+            if entry.skip_reason:
+                self.counts[entry.skip_reason] += 1
+                if entry.skip_reason != NOT_ENTRY:
+                    self.skipped.append(entry)
+            else:
+                self.counts['url'] += 1
+            yield entry
+
+    def iter_urls(self, lines):
+        """Lazily yield each unique URL"""
+        for entry in self.iter_entries(lines):
+            if entry.url is not None:
+                yield entry.url
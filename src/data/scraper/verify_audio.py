@@ -0,0 +1,463 @@
+"""
+Concurrent check of the audio files the app plays, replacing the one-URL-at-a-time
+synch-r2/check-faulty-urls.sh.
+
+Every episode in src/data/json/episodes.json is resolved to the URL the app builds
+for it (see getEpisodesForSeries in src/utils/episodeUtils.ts) and checked:
+- format: a cosmic episode's audioUrl must be cosmic-<series>-<episode>.mp3
+- listing: a file in the bucket listed by synch-r2/r2-objects.json (written by
+  list-r2-objects.sh) is found there without a request. Only files missing from
+  the listing, which may be older than the bucket, are requested
+- uploads: offline, a cosmic episode's file is missing unless
+  synch-r2/cosmic-series-urls.json gives it an exactUrl and it has been uploaded,
+  the check the shell script made
+- network: every other URL gets a HEAD (or a 1-byte range GET where HEAD is not
+  allowed), many in flight at once, through the scraper's per-thread sessions and
+  retry handling. Results are cached with their ETag / Last-Modified: a file that
+  checked out within --max-age-hours is not requested again, and an older one is
+  revalidated with a conditional request
+
+The results go to synch-r2/url-check-results.json in the shell script's format,
+one entry per faulty episode of the series it checked (cosmic-1 to cosmic-14):
+{"faultyUrls": {"cosmic-1-1": {"type": "incorrect_format", "currentUrl": ..., "expectedPattern": ...}}}
+--detailed checks every series and adds the URL and the HTTP status or error of
+each problem. Episodes nothing could settle (offline, with no listing, upload
+record or cache entry for their file) are listed under "unchecked" rather than
+left out.
+
+--offline makes no requests, like the shell script; check-faulty-urls.sh passes
+it unless given --online.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import quote, unquote, urlparse
+
+import requests
+
+from async_fetch import AsyncFetcher
+from outputs import write_if_changed
+from scrape_discover_jesus import DiscoverJesusScraper, raise_if_retryable
+
+# Same buckets as src/config/audio.ts
+JESUS_AUDIO_BASE_URL = 'https://pub-111d6f5663274cc5aefdcc72206eec40.r2.dev'
+URANTIA_AUDIO_BASE_URL = 'https://pub-69ae36e16d64438e9bb56350459d5c7d.r2.dev'
+
+# Result types; the first two are the ones check-faulty-urls.sh reported
+INCORRECT_FORMAT = 'incorrect_format'
+MISSING_IN_R2 = 'missing_in_r2'
+EMPTY_IN_R2 = 'empty_in_r2'
+HTTP_ERROR = 'http_error'
+UNREACHABLE = 'unreachable'
+NO_AUDIO_URL = 'no_audio_url'
+
+# Where each result came from
+LISTING = 'listing'
+UPLOADS = 'uploads'
+CACHE = 'cache'
+NETWORK = 'network'
+UNCHECKED = 'unchecked'
+
+# Statuses of a file that is there (206 answers the range GET, 304 a revalidation)
+PRESENT_STATUSES = frozenset((200, 206, 304))
+MISSING_STATUSES = frozenset((404, 410))
+# HEAD refused: fall back to a range GET
+HEAD_REFUSED_STATUSES = frozenset((405, 501))
+
+# Characters encodeURIComponent leaves alone (besides letters, digits and _.-)
+URI_COMPONENT_SAFE = "!'()*~"
+
+_COSMIC_SERIES = re.compile(r'^cosmic-\d+$')
+
+
+class AudioAsset:
+    """One episode's audio file: results key, audioUrl from episodes.json and the URL the app plays"""
+
+    __slots__ = ('key', 'series', 'audio_url', 'url')
+
+    def __init__(self, key, series, audio_url, url):
+        self.key = key
+        self.series = series
+        self.audio_url = audio_url
+        self.url = url
+
+
+def resolve_audio_url(series, episode, cosmic_mapping, cosmic_urls, jesus_base, urantia_base):
+    """URL the app plays for an episode of episodes.json, or None when it has no audioUrl"""
+    audio_url = episode.get("audioUrl")
+    if not audio_url:
+        return None
+    if series.startswith('jesus-'):
+        return f"{jesus_base}/{quote(audio_url, safe=URI_COMPONENT_SAFE)}"
+    if series == 'urantia-papers':
+        return f"{urantia_base}/{audio_url}"
+    if series.startswith('cosmic-'):
+        key = f"{series}-{episode['id']}"
+        exact = (cosmic_urls.get(f"{key}.mp3") or {}).get("exactUrl")
+        if exact:
+            return exact
+        mapping = cosmic_mapping.get(key)
+        if mapping and mapping.get("filename"):
+            return f"{urantia_base}/{mapping['filename']}"
+        return f"{urantia_base}/{audio_url}"
+    return f"{jesus_base}/{audio_url}"
+
+
+def load_assets(episodes_path, cosmic_mapping_path, cosmic_urls_path,
+                jesus_base=JESUS_AUDIO_BASE_URL, urantia_base=URANTIA_AUDIO_BASE_URL):
+    """AudioAsset of every episode, in episodes.json order"""
+    with open(episodes_path, encoding='utf-8') as f:
+        episodes = json.load(f)
+    cosmic_mapping = _load_json(cosmic_mapping_path).get("cosmicSeriesMapping", {})
+    cosmic_urls = _load_json(cosmic_urls_path).get("cosmicSeriesUrls", {})
+    assets = []
+    for series, data in episodes.items():
+        for episode in data.get("episodes", []):
+            url = resolve_audio_url(series, episode, cosmic_mapping, cosmic_urls, jesus_base, urantia_base)
+            assets.append(AudioAsset(f"{series}-{episode['id']}", series, episode.get("audioUrl"), url))
+    return assets
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def is_cosmic(asset):
+    return bool(_COSMIC_SERIES.match(asset.series))
+
+
+def format_problem(asset):
+    """The incorrect_format entry for a cosmic episode whose audioUrl breaks the naming rule, else None"""
+    if not is_cosmic(asset):
+        return None
+    expected = f"{asset.key}.mp3"
+    if asset.audio_url == expected:
+        return None
+    return {"currentUrl": asset.audio_url, "expectedPattern": expected, "type": INCORRECT_FORMAT}
+
+
+def upload_problem(asset, cosmic_urls):
+    """
+    The missing_in_r2 entry for a cosmic episode that cosmic-series-urls.json does
+    not give an uploaded exactUrl, else None
+    """
+    entry = cosmic_urls.get(f"{asset.key}.mp3") or cosmic_urls.get(asset.key) or {}
+    if entry.get("exactUrl") and entry.get("status") != 'not_uploaded_yet':
+        return None
+    return {"type": MISSING_IN_R2, "url": asset.url}
+
+
+class R2Listing:
+    """Object listing of one bucket (`aws s3api list-objects-v2` JSON) served at `base_url`"""
+
+    def __init__(self, path, base_url):
+        self.base_url = base_url.rstrip('/')
+        with open(path, encoding='utf-8') as f:
+            listing = json.load(f)
+        self.objects = {item["Key"]: item for item in listing.get("Contents", [])}
+
+    def covers(self, url):
+        return url.startswith(f"{self.base_url}/")
+
+    def get(self, url):
+        """The listed object behind a URL of this bucket, or None"""
+        if not self.covers(url):
+            return None
+        return self.objects.get(unquote(urlparse(url).path[len(urlparse(self.base_url).path) + 1:]))
+
+
+class AudioCheckCache:
+    """
+    url -> {status, etag, lastModified, size, checkedAt} of the last check, saved
+    as JSON. Only files that were there are reused; failures are always checked
+    again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = _load_json(path)
+        self._lock = threading.Lock()
+
+    def fresh(self, url, max_age):
+        """The cached check of a file that was there within max_age seconds (None: any age), else None"""
+        entry = self.entries.get(url)
+        if entry is None or entry["status"] not in PRESENT_STATUSES:
+            return None
+        if max_age is not None and time.time() - entry["checkedAt"] > max_age:
+            return None
+        return entry
+
+    def conditional_headers(self, url):
+        entry = self.entries.get(url)
+        headers = {}
+        if entry is None or entry["status"] not in PRESENT_STATUSES:
+            return headers
+        if entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry.get("lastModified"):
+            headers['If-Modified-Since'] = entry["lastModified"]
+        return headers
+
+    def record(self, url, status, etag=None, last_modified=None, size=None):
+        with self._lock:
+            if status == 304 and url in self.entries:
+                # Not modified: keep the validators and size, restart the clock
+                self.entries[url]["checkedAt"] = round(time.time(), 3)
+                return
+            self.entries[url] = {
+                "status": status,
+                "etag": etag,
+                "lastModified": last_modified,
+                "size": size,
+                "checkedAt": round(time.time(), 3),
+            }
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            data = json.dumps(dict(sorted(self.entries.items())), indent=2)
+        write_if_changed(self.path, data.encode('utf-8'))
+
+
+def response_size(response):
+    """Size of the file from Content-Range (range GET) or Content-Length (HEAD), else None"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length')
+    if response.status_code == 200 and length and length.isdigit():
+        return int(length)
+    return None
+
+
+def range_get(session, url, headers, timeout):
+    """GET only the first byte of a file"""
+    response = session.get(url, headers={**headers, 'Range': 'bytes=0-0'}, stream=True,
+                           allow_redirects=True, timeout=timeout)
+    # A server that ignores Range would send the whole file: do not read it
+    response.close()
+    return response
+
+
+def check_audio_url(scraper, cache, url, method='head', timeout=10):
+    """
+    HEAD (or range GET) one audio URL, revalidating a cached check when there is one.
+    Returns the response; network errors and retryable statuses are raised so the
+    caller can retry later.
+    """
+    headers = cache.conditional_headers(url) if cache is not None else {}
+    start = time.perf_counter()
+    try:
+        if method == 'head':
+            response = scraper.session.head(url, headers=headers, allow_redirects=True, timeout=timeout)
+            if response.status_code in HEAD_REFUSED_STATUSES:
+                response = range_get(scraper.session, url, headers, timeout)
+        else:
+            response = range_get(scraper.session, url, headers, timeout)
+    except requests.RequestException:
+        if scraper.rate_controller is not None:
+            scraper.rate_controller.on_error()
+        raise
+    elapsed = time.perf_counter() - start
+    scraper.adapt_rate(response, elapsed)
+    scraper.metrics.observe('scraper_request_seconds', elapsed, source='audio')
+    scraper.metrics.inc('scraper_responses_total', method=response.request.method, status=response.status_code)
+    raise_if_retryable(url, response)
+    if cache is not None:
+        cache.record(url, response.status_code, response.headers.get('ETag'),
+                     response.headers.get('Last-Modified'), response_size(response))
+    return response
+
+
+def status_problem(url, status, size=None):
+    """The faultyUrls entry for a checked URL, or None when the file is there and not empty"""
+    if status in PRESENT_STATUSES:
+        if size == 0:
+            return {"type": EMPTY_IN_R2, "url": url}
+        return None
+    if status in MISSING_STATUSES:
+        return {"type": MISSING_IN_R2, "url": url, "status": status}
+    return {"type": HTTP_ERROR, "url": url, "status": status}
+
+
+def verify_assets(scraper, assets, listing=None, cache=None, offline=False, max_age=None,
+                  workers=16, max_rps=None, method='head', timeout=10, cosmic_urls=None):
+    """
+    Check every asset. Returns (faulty, unchecked, sources): the faultyUrls mapping
+    in asset order, key -> URL of the assets nothing settled (offline, with nothing
+    to go on), and how many assets were settled by the listing, the upload record
+    (cosmic_urls, offline only), the cache, a request or not at all.
+    """
+    # url -> faultyUrls entry (None when fine) of the URLs settled without a request
+    settled = {}
+    sources = {}
+    # key -> faultyUrls entry (None when uploaded) of the cosmic episodes settled by cosmic_urls
+    uploaded = {}
+    to_request = []
+    for asset in assets:
+        url = asset.url
+        if url is not None and offline and cosmic_urls is not None and is_cosmic(asset):
+            uploaded[asset.key] = upload_problem(asset, cosmic_urls)
+            continue
+        if url is None or url in sources:
+            continue
+        if listing is not None and listing.covers(url):
+            item = listing.get(url)
+            if item is not None:
+                settled[url], sources[url] = status_problem(url, 200, item.get("Size")), LISTING
+                continue
+            if offline:
+                settled[url], sources[url] = {"type": MISSING_IN_R2, "url": url}, LISTING
+                continue
+        entry = cache.fresh(url, None if offline else max_age) if cache is not None else None
+        if entry is not None:
+            settled[url], sources[url] = status_problem(url, entry["status"], entry.get("size")), CACHE
+        elif offline:
+            settled[url], sources[url] = None, UNCHECKED
+        else:
+            sources[url] = NETWORK
+            to_request.append(url)
+
+    if to_request:
+        fetcher = AsyncFetcher(per_host=workers, max_rps=max_rps, burst=workers,
+                               retry_delay=scraper.retry_delay, max_attempts=scraper.max_attempts)
+        results = fetcher.run(to_request, lambda url: check_audio_url(scraper, cache, url, method, timeout))
+        for result in results:
+            if result.ok:
+                response = result.value
+                size = response_size(response)
+                if response.status_code == 304 and cache is not None:
+                    size = cache.entries[result.url].get("size")
+                settled[result.url] = status_problem(result.url, response.status_code, size)
+            elif getattr(result.error, 'response', None) is not None:
+                settled[result.url] = status_problem(result.url, result.error.response.status_code)
+            else:
+                settled[result.url] = {"type": UNREACHABLE, "url": result.url, "error": str(result.error)}
+
+    faulty = {}
+    unchecked = {}
+    counts = Counter()
+    for asset in assets:
+        # As in the shell script, a format problem is reported ahead of a missing file
+        problem = format_problem(asset)
+        if asset.url is None:
+            problem = problem or {"type": NO_AUDIO_URL}
+            counts[UNCHECKED] += 1
+        elif asset.key in uploaded:
+            problem = problem or uploaded[asset.key]
+            counts[UPLOADS] += 1
+        else:
+            problem = problem or settled[asset.url]
+            counts[sources[asset.url]] += 1
+            if problem is None and sources[asset.url] == UNCHECKED:
+                unchecked[asset.key] = asset.url
+        if problem is not None:
+            faulty[asset.key] = problem
+    return faulty, unchecked, counts
+
+
+def brief_problem(problem):
+    """A faultyUrls entry as check-faulty-urls.sh wrote it, without the URL, status or error"""
+    if problem["type"] == INCORRECT_FORMAT:
+        return problem
+    return {"type": problem["type"]}
+
+
+def write_results(faulty, path, unchecked=None):
+    """Write url-check-results.json (as formatted by jq) and return whether it changed"""
+    results = {"faultyUrls": faulty}
+    if unchecked:
+        results["unchecked"] = unchecked
+    data = json.dumps(results, indent=2, ensure_ascii=False) + '\n'
+    return write_if_changed(path, data.encode('utf-8'))
+
+
+def parse_args(argv=None, root_dir=None):
+    root_dir = root_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.dirname(os.path.dirname(root_dir))
+    synch_dir = os.path.join(project_root, 'synch-r2')
+    parser = argparse.ArgumentParser(description="Check that every episode's audio file is in R2")
+    parser.add_argument('--episodes', default=os.path.join(root_dir, 'json/episodes.json'))
+    parser.add_argument('--cosmic-mapping', default=os.path.join(root_dir, 'json/cosmic-series-mappings.json'))
+    parser.add_argument('--cosmic-urls', default=os.path.join(synch_dir, 'cosmic-series-urls.json'))
+    parser.add_argument('--listing', default=os.path.join(synch_dir, 'r2-objects.json'),
+                        help="Bucket listing from list-r2-objects.sh (default: synch-r2/r2-objects.json)")
+    parser.add_argument('--no-listing', action='store_true', help="Request every file, listed or not")
+    parser.add_argument('--output', default=os.path.join(synch_dir, 'url-check-results.json'))
+    parser.add_argument('--cache', default=os.path.join(root_dir, 'scraper/cache/audio_checks.json'),
+                        help="Results of earlier checks, with their validators")
+    parser.add_argument('--no-cache', action='store_true', help="Neither read nor write the check cache")
+    parser.add_argument('--max-age-hours', type=float, default=24.0,
+                        help="Reuse a cached check this recent without a request (default: 24)")
+    parser.add_argument('--offline', action='store_true',
+                        help="No requests: settle what the listing, the cosmic upload record and the cache can, "
+                             "list the rest as unchecked")
+    parser.add_argument('--detailed', action='store_true',
+                        help="Check every series, not only the cosmic ones the shell script checked, and report "
+                             "the URL and status of each problem")
+    parser.add_argument('--workers', type=int, default=16, help="Requests in flight per host (default: 16)")
+    parser.add_argument('--max-rps', type=float, default=None, help="Requests per second ceiling (default: none)")
+    parser.add_argument('--method', choices=('head', 'range'), default='head',
+                        help="HEAD (falling back to a range GET where refused) or always a 1-byte range GET")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Seconds per request (default: 10)")
+    parser.add_argument('--jesus-base', default=JESUS_AUDIO_BASE_URL, help=argparse.SUPPRESS)
+    parser.add_argument('--urantia-base', default=URANTIA_AUDIO_BASE_URL, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    start = time.perf_counter()
+
+    assets = load_assets(args.episodes, args.cosmic_mapping, args.cosmic_urls, args.jesus_base, args.urantia_base)
+    if not args.detailed:
+        assets = [asset for asset in assets if is_cosmic(asset)]
+    cosmic_urls = _load_json(args.cosmic_urls).get("cosmicSeriesUrls", {})
+    listing = None
+    if not args.no_listing:
+        try:
+            # list-r2-objects.sh lists the bucket of the Jesus series
+            listing = R2Listing(args.listing, args.jesus_base)
+            logging.info(f"Bucket listing: {len(listing.objects)} objects in {args.listing}")
+        except FileNotFoundError:
+            logging.warning(f"No bucket listing at {args.listing}; every file will be requested")
+    cache = None if args.no_cache else AudioCheckCache(args.cache)
+    # Only for its sessions and retry settings; its directories are made under root_dir, not the CWD
+    scraper = None if args.offline else DiscoverJesusScraper()
+
+    logging.info(f"Checking {len(assets)} episodes ({len({a.url for a in assets if a.url})} distinct audio URLs)")
+    try:
+        faulty, unchecked, sources = verify_assets(
+            scraper, assets, listing=listing, cache=cache, offline=args.offline,
+            max_age=args.max_age_hours * 3600, workers=args.workers, max_rps=args.max_rps,
+            method=args.method, timeout=args.timeout, cosmic_urls=cosmic_urls,
+        )
+    finally:
+        if cache is not None:
+            cache.save()
+
+    if not args.detailed:
+        faulty = {key: brief_problem(problem) for key, problem in faulty.items()}
+    write_results(faulty, args.output, unchecked)
+    logging.info(f"Settled by: {dict(sorted(sources.items()))} in {time.perf_counter() - start:.2f}s")
+    logging.info(f"Results saved to: {args.output}")
+    logging.info(f"Found {len(faulty)} issues")
+    for problem_type, count in sorted(Counter(p["type"] for p in faulty.values()).items()):
+        logging.info(f"  {count} {problem_type}")
+    if unchecked:
+        logging.warning(f"{len(unchecked)} episodes left unchecked (run with --online to request them)")
+    return faulty
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import type { DiscoverJesusSummary } from '../data/discoverJesusSummaries';
+
+/**
+ * Lazy loader for the Discover Jesus summary bundles written by the Python
+ * scraper (`scrape_discover_jesus.py --bundles`). Instead of parsing every
+ * summary up front, a page fetches the small manifest once, then only the
+ * bundle that holds the id it needs. Bundle file names contain a hash of their
+ * content, so they can be cached for as long as the manifest points at them.
+ *
+ * Not used by any page yet: episodes.ts and episodeUtils.ts build the episode
+ * list synchronously at import time from the bundled summaries, and the bundles
+ * (an opt-in scraper output) are not published under public/.
+ */
+
+export const DEFAULT_BUNDLE_BASE = '/discover-jesus';
+
+interface BundleInfo {
+  name: string;
+  file: string;
+  count: number;
+  bytes: number;
+}
+
+export interface BundleManifest {
+  version: number;
+  strategy: 'category' | 'hash';
+  bundles: BundleInfo[];
+  // Entry id -> index into bundles
+  ids: Record<string, number>;
+}
+
+type Bundle = Record<string, Omit<DiscoverJesusSummary, 'id'>>;
+
+const manifests = new Map<string, Promise<BundleManifest>>();
+const bundles = new Map<string, Promise<Bundle>>();
+
+async function fetchJson<T>(url: string): Promise<T> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  return response.json() as Promise<T>;
+}
+
+// Cache the promise, not the result, so concurrent callers share one request;
+// a failed request is dropped from the cache so the next call can retry it
+function cached<T>(cache: Map<string, Promise<T>>, url: string): Promise<T> {
+  let promise = cache.get(url);
+  if (!promise) {
+    promise = fetchJson<T>(url).catch((error) => {
+      cache.delete(url);
+      throw error;
+    });
+    cache.set(url, promise);
+  }
+  return promise;
+}
+
+/**
+ * Loads (once) the manifest mapping every summary id to its bundle
+ * @param base URL the bundles are served from
+ */
+export function loadBundleManifest(base: string = DEFAULT_BUNDLE_BASE): Promise<BundleManifest> {
+  return cached(manifests, `${base}/manifest.json`);
+}
+
+/**
+ * Loads one summary, fetching only the bundle it lives in
+ * @param id Summary id, e.g. "person/andrew"
+ * @param base URL the bundles are served from
+ * @returns The summary, or undefined if the id is not in the manifest
+ */
+export async function loadDiscoverJesusSummary(
+  id: string,
+  base: string = DEFAULT_BUNDLE_BASE
+): Promise<DiscoverJesusSummary | undefined> {
+  const manifest = await loadBundleManifest(base);
+  const index = manifest.ids[id];
+  if (index === undefined) return undefined;
+
+  const bundle = await cached(bundles, `${base}/${manifest.bundles[index].file}`);
+  const record = bundle[id];
+  return record ? { id, ...record } : undefined;
+}
+
+/**
+ * Starts fetching the bundle of an id without waiting for it, e.g. on link hover
+ */
+export function prefetchDiscoverJesusSummary(id: string, base: string = DEFAULT_BUNDLE_BASE): void {
+  loadDiscoverJesusSummary(id, base).catch(() => undefined);
+}
+
+/**
+ * Forgets every loaded manifest and bundle (for tests, or after a redeploy)
+ */
+export function clearDiscoverJesusBundleCache(): void {
+  manifests.clear();
+  bundles.clear();
+}
@@ -0,0 +1,175 @@
+/**
+ * Client for the full-text search index written by the Python scraper
+ * (`scrape_discover_jesus.py --search-index`, see search_index.py).
+ *
+ * BM25 scores are precomputed, so a query only fetches the shard of each of its
+ * terms (by their first letter), adds up the scores and sorts. The tokenizer
+ * settings ship in index.json, so queries are tokenized exactly like the index.
+ *
+ * Not used by any page yet: the index is an opt-in scraper output and is not
+ * published under public/ (it would be served from DEFAULT_SEARCH_BASE).
+ */
+
+export const DEFAULT_SEARCH_BASE = '/search';
+
+// [suffix, replacement, shortest stem left, endings the rule skips]
+type StemRule = [string, string, number, string[]];
+
+interface SearchMeta {
+  version: number;
+  prefixLength: number;
+  scale: number;
+  stopwords: string[];
+  stemPasses: StemRule[][];
+  // [id, title, kind] per document number
+  documents: [string, string, string][];
+  terms: number;
+  shards: Record<string, string>;
+}
+
+// term -> [doc delta, weight, doc delta, weight, ...]
+type Shard = Record<string, number[]>;
+
+export interface SearchResult {
+  id: string;
+  title: string;
+  kind: string;
+  score: number;
+}
+
+interface LoadedIndex {
+  meta: SearchMeta;
+  stopwords: Set<string>;
+}
+
+const indexes = new Map<string, Promise<LoadedIndex>>();
+const shards = new Map<string, Promise<Shard>>();
+
+async function fetchJson<T>(url: string): Promise<T> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  return response.json() as Promise<T>;
+}
+
+function cached<T>(cache: Map<string, Promise<T>>, key: string, load: () => Promise<T>): Promise<T> {
+  let promise = cache.get(key);
+  if (!promise) {
+    promise = load().catch((error) => {
+      cache.delete(key);
+      throw error;
+    });
+    cache.set(key, promise);
+  }
+  return promise;
+}
+
+function loadIndex(base: string): Promise<LoadedIndex> {
+  return cached(indexes, base, async () => {
+    const meta = await fetchJson<SearchMeta>(`${base}/index.json`);
+    return { meta, stopwords: new Set(meta.stopwords) };
+  });
+}
+
+function loadShard(base: string, meta: SearchMeta, prefix: string): Promise<Shard> {
+  const file = meta.shards[prefix];
+  if (!file) return Promise.resolve({});
+  return cached(shards, `${base}/${file}`, () => fetchJson<Shard>(`${base}/${file}`));
+}
+
+/**
+ * Lower case words without accents, like search_index.words
+ */
+function words(text: string): string[] {
+  return text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase().match(/[a-z0-9]+/g) ?? [];
+}
+
+function stem(word: string, passes: StemRule[][]): string {
+  for (const rules of passes) {
+    for (const [suffix, replacement, minStem, skip] of rules) {
+      if (
+        word.endsWith(suffix) &&
+        word.length - suffix.length >= minStem &&
+        !skip.some((ending) => word.endsWith(ending))
+      ) {
+        word = word.slice(0, word.length - suffix.length) + replacement;
+        break;
+      }
+    }
+  }
+  return word;
+}
+
+function addScores(scores: Map<number, number>, postings: number[] | undefined): void {
+  if (!postings) return;
+  let doc = 0;
+  for (let i = 0; i < postings.length; i += 2) {
+    doc += postings[i];
+    scores.set(doc, (scores.get(doc) ?? 0) + postings[i + 1]);
+  }
+}
+
+/**
+ * Searches the summaries. Every word of the query must match; the last one also
+ * matches as a prefix, so results update as the user types.
+ * @param query Text typed by the user
+ * @param limit Maximum number of results
+ * @param base URL the index is served from
+ */
+export async function searchSummaries(
+  query: string,
+  limit: number = 10,
+  base: string = DEFAULT_SEARCH_BASE
+): Promise<SearchResult[]> {
+  const { meta, stopwords } = await loadIndex(base);
+  const raw = words(query).filter((word) => word.length > 1 && !stopwords.has(word));
+  if (raw.length === 0) return [];
+
+  const perWord = await Promise.all(
+    raw.map(async (word, position) => {
+      const shard = await loadShard(base, meta, word.slice(0, meta.prefixLength));
+      const terms = new Set([stem(word, meta.stemPasses)]);
+      if (position === raw.length - 1) {
+        for (const term of Object.keys(shard)) {
+          if (term.startsWith(word)) terms.add(term);
+        }
+      }
+      // Stemming only strips suffixes, so the stem lives in the same shard as the word
+      const scores = new Map<number, number>();
+      for (const term of terms) {
+        addScores(scores, shard[term]);
+      }
+      return scores;
+    })
+  );
+
+  const matches: [number, number][] = [];
+  for (const [doc, firstScore] of perWord[0]) {
+    let score = firstScore;
+    let matchesAll = true;
+    for (const scores of perWord.slice(1)) {
+      const wordScore = scores.get(doc);
+      if (wordScore === undefined) {
+        matchesAll = false;
+        break;
+      }
+      score += wordScore;
+    }
+    if (matchesAll) matches.push([doc, score]);
+  }
+  // Best first, ties in document order (same as SearchIndex.search in Python)
+  matches.sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+  return matches.slice(0, limit).map(([doc, score]) => {
+    const [id, title, kind] = meta.documents[doc];
+    return { id, title, kind, score: score * meta.scale };
+  });
+}
+
+/**
+ * Forgets the loaded index and shards (for tests, or after a redeploy)
+ */
+export function clearSearchIndexCache(): void {
+  indexes.clear();
+  shards.clear();
+}